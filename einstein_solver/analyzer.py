@@ -1,36 +1,34 @@
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
 import json
 import asyncio
+import codecs
+import email.utils
+import random
+import threading
+import time
 import aiohttp
-from typing import Optional, Dict, Any
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Callable, Optional, Dict, Any, List, Sequence, Tuple
+from .cache import DEFAULT_RESPONSE_CACHE_PATH, ResponseCache, response_key
+from .instrumentation import correlation, record, span
 from .utils import MetricData, APIConfig
 
-class LLMAnalyzer(QThread):
-    """Handles LLM analysis in a separate thread to keep UI responsive"""
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
-    
-    def __init__(self, metric_data: MetricData, api_config: APIConfig, analysis_type: str):
-        super().__init__()
-        self.metric_data = metric_data
-        self.api_config = api_config
-        self.analysis_type = analysis_type
-        self._should_stop = False
-    
-    def stop(self):
-        """Stop the analysis"""
-        self._should_stop = True
-    
-    def get_prompt(self) -> str:
-        """Generate appropriate prompt based on analysis type"""
-        base_prompt = f"""You are a physics expert specialized in general relativity. 
+ANALYSIS_TYPES = ('validate', 'interpret', 'suggest')
+
+# Receives each piece of a streamed analysis as it arrives
+ChunkCallback = Callable[[str], None]
+
+def build_prompt(metric_data: MetricData, analysis_type: str) -> str:
+    """Generate appropriate prompt based on analysis type"""
+    base_prompt = f"""You are a physics expert specialized in general relativity. 
         Analyzing this metric tensor:
-        {json.dumps(self.metric_data.components, indent=2)}
-        Coordinates: {', '.join(self.metric_data.coordinates)}
+        {json.dumps(metric_data.components, indent=2)}
+        Coordinates: {', '.join(metric_data.coordinates)}
         """
-        
-        prompts = {
-            "validate": base_prompt + """
+    
+    prompts = {
+        "validate": base_prompt + """
                 Please analyze for:
                 1. Signature consistency
                 2. Symmetry requirements
@@ -40,7 +38,7 @@ class LLMAnalyzer(QThread):
                 
                 Provide your analysis in a clear, structured format.
                 """,
-            "interpret": base_prompt + """
+        "interpret": base_prompt + """
                 Please interpret this metric tensor and explain:
                 1. What type of spacetime it represents
                 2. Its physical significance
@@ -50,7 +48,7 @@ class LLMAnalyzer(QThread):
                 
                 Provide your interpretation in clear, physics-focused language.
                 """,
-            "suggest": base_prompt + """
+        "suggest": base_prompt + """
                 Please suggest:
                 1. Possible modifications to explore
                 2. Additional terms to consider
@@ -60,60 +58,457 @@ class LLMAnalyzer(QThread):
                 
                 Provide practical, physics-based suggestions.
                 """
-        }
-        
-        return prompts.get(self.analysis_type, base_prompt)
+    }
     
-    async def _make_api_request(self, session: aiohttp.ClientSession, attempt: int = 1) -> Dict[str, Any]:
-        """Make API request with retry logic"""
-        try:
-            async with session.post(
-                f"{self.api_config.api_url}/analyze",
-                json={
-                    "prompt": self.get_prompt(),
-                    "metric_data": self.metric_data.to_json(),
-                    "analysis_type": self.analysis_type
-                },
-                headers=self.api_config.get_headers(),
-                timeout=self.api_config.timeout
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                elif response.status == 429 and attempt < self.api_config.max_retries:
-                    # Rate limit hit, wait and retry
-                    await asyncio.sleep(2 ** attempt)
-                    return await self._make_api_request(session, attempt + 1)
+    return prompts.get(analysis_type, base_prompt)
+
+# Responses that mean "slow down and try again"
+RETRY_STATUSES = (429, 503)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header given as seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+def _status_error(response: aiohttp.ClientResponse) -> aiohttp.ClientResponseError:
+    """Error for a response that ends the request, whatever its status"""
+    return aiohttp.ClientResponseError(
+        response.request_info, response.history, status=response.status,
+        message=response.reason or "", headers=response.headers
+    )
+
+class RateLimiter:
+    """Token bucket shared by every request to one API in this process
+
+    Requests take a token each; tokens refill at ``rate`` per second up to
+    ``burst``. Requests that find the bucket empty reserve a future token
+    and sleep until it is due, so concurrent callers are spaced out instead
+    of bursting. ``pause`` holds back all callers, e.g. for a Retry-After.
+    The bucket is guarded by a thread lock because services on different
+    event loops share it.
+    """
+    _limiters: Dict[str, 'RateLimiter'] = {}
+    _limiters_lock = threading.Lock()
+    
+    def __init__(self, rate: float, burst: int = 1, backoff_base: float = 1.0,
+                 backoff_max: float = 30.0):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.throttled = 0
+        self.retried = 0
+        self.waited = 0.0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def for_config(cls, api_config: APIConfig) -> 'RateLimiter':
+        """Process-wide limiter for the config's API URL"""
+        with cls._limiters_lock:
+            limiter = cls._limiters.get(api_config.api_url)
+            if limiter is None:
+                limiter = cls._limiters[api_config.api_url] = cls(
+                    api_config.rate_limit, api_config.rate_burst,
+                    api_config.backoff_base, api_config.backoff_max
+                )
+            return limiter
+    
+    def _reserve(self) -> float:
+        """Take a token, returning how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, self._paused_until - now)
+            if self.rate > 0:
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self.rate)
+            self.waited += wait
+            return wait
+    
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        wait = self._reserve()
+        if wait > 0:
+            record('llm_rate_wait', seconds=round(wait, 6))
+            await asyncio.sleep(wait)
+    
+    def pause(self, seconds: float):
+        """Hold back all requests for ``seconds``, plus jitter so they do not resume together"""
+        with self._lock:
+            until = time.monotonic() + seconds + random.uniform(0, self.backoff_base)
+            self._paused_until = max(self._paused_until, until)
+    
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for a retry after ``attempt`` tries"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+    
+    def record_throttled(self):
+        with self._lock:
+            self.throttled += 1
+    
+    def record_retry(self):
+        with self._lock:
+            self.retried += 1
+    
+    def stats(self) -> Dict[str, float]:
+        """Counters of throttled responses, retries and seconds spent waiting"""
+        with self._lock:
+            return {'throttled': self.throttled, 'retried': self.retried,
+                    'waited': round(self.waited, 3)}
+
+class _InFlight:
+    """A request shared by every caller asking for the same analysis"""
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.chunks: List[str] = []
+        self.listeners: List[ChunkCallback] = []
+
+    def add_chunk(self, chunk: str):
+        self.chunks.append(chunk)
+        for listener in self.listeners:
+            listener(chunk)
+
+    def listen(self, on_chunk: ChunkCallback):
+        # Late joiners first get everything streamed so far
+        if self.chunks:
+            on_chunk("".join(self.chunks))
+        self.listeners.append(on_chunk)
+
+class AnalysisService(QObject):
+    """Long-lived LLM client with one event loop thread and one pooled HTTP session
+
+    Every analysis goes through the same ``aiohttp`` connection pool, so only
+    the first request to the API pays for connection and TLS setup. The
+    analysis types requested for a metric are sent concurrently, at most
+    ``api_config.max_concurrent`` at a time, and each result is emitted as
+    soon as it arrives.
+
+    With a ``ResponseCache`` answers are reused across runs, and identical
+    requests made while one is still in flight share that single call.
+
+    With ``api_config.stream`` the endpoint is asked to stream, and text is
+    emitted through ``partial_text`` as it arrives, either as server-sent
+    events or as a chunked plain-text body.
+    """
+    partial_text = pyqtSignal(str, str)
+    result_ready = pyqtSignal(str, str)
+    error = pyqtSignal(str, str)
+    all_finished = pyqtSignal(dict)
+    
+    _shared: Dict[Tuple[str, Optional[str]], 'AnalysisService'] = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, api_config: APIConfig, cache: Optional[ResponseCache] = None):
+        super().__init__()
+        self.api_config = api_config
+        self.cache = cache
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="analysis-event-loop", daemon=True
+        )
+        self._thread.start()
+    
+    @classmethod
+    def shared(cls, api_config: APIConfig) -> 'AnalysisService':
+        """Process-wide service for an API endpoint and key"""
+        key = (api_config.api_url, api_config.api_key)
+        with cls._shared_lock:
+            service = cls._shared.get(key)
+            if service is None or service.closed:
+                cache = ResponseCache(DEFAULT_RESPONSE_CACHE_PATH, ttl=api_config.cache_ttl)
+                service = cls._shared[key] = cls(api_config, cache)
+            return service
+    
+    @property
+    def closed(self) -> bool:
+        return self._loop.is_closed()
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Only called from the event loop thread, so no locking is needed
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.api_config.max_concurrent)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.api_config.max_concurrent)
+        return self._session
+    
+    async def _read_stream(self, response: aiohttp.ClientResponse,
+                           on_chunk: Callable[[str], None]) -> str:
+        """Collect a streamed body, passing each piece of text on as it arrives"""
+        parts = []
+        if response.content_type == 'text/event-stream':
+            async for raw_line in response.content:
+                line = raw_line.decode('utf-8').rstrip('\r\n')
+                if not line.startswith('data:'):
+                    continue
+                data = line[5:].lstrip()
+                if data == '[DONE]':
+                    break
+                try:
+                    event = json.loads(data)
+                except json.JSONDecodeError:
+                    chunk = data
                 else:
-                    response.raise_for_status()
-                    
-        except asyncio.TimeoutError:
-            if attempt < self.api_config.max_retries:
-                return await self._make_api_request(session, attempt + 1)
-            raise
-    
-    async def analyze(self) -> str:
-        """Perform the analysis"""
+                    if isinstance(event, dict):
+                        chunk = event.get('delta', event.get('analysis', ''))
+                    else:
+                        chunk = str(event)
+                if chunk:
+                    parts.append(chunk)
+                    on_chunk(chunk)
+        else:
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            async for data in response.content.iter_any():
+                chunk = decoder.decode(data)
+                if chunk:
+                    parts.append(chunk)
+                    on_chunk(chunk)
+            chunk = decoder.decode(b'', final=True)
+            if chunk:
+                parts.append(chunk)
+                on_chunk(chunk)
+        return "".join(parts)
+    
+    async def _make_api_request(self, session: aiohttp.ClientSession, payload: Dict[str, Any],
+                                on_chunk: Callable[[str], None]) -> str:
+        """Make API request with rate limiting and retries, returning the analysis text"""
+        headers = self.api_config.get_headers()
+        if payload.get("stream"):
+            headers['Accept'] = 'text/event-stream, text/plain, application/json'
+        limiter = RateLimiter.for_config(self.api_config)
+        analysis_type = payload.get("analysis_type")
+        if payload.get("stream"):
+            # A long generation may stream for well past ``timeout``; only stalls count
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.api_config.timeout,
+                                            sock_read=self.api_config.timeout)
+        else:
+            timeout = aiohttp.ClientTimeout(total=self.api_config.timeout)
+        streamed = []
+
+        def forward(chunk: str) -> None:
+            streamed.append(chunk)
+            on_chunk(chunk)
+
+        attempt = 1
+        while True:
+            await limiter.acquire()
+            retry_after = None
+            with span('llm_request', analysis_type=analysis_type, attempt=attempt) as fields:
+                try:
+                    async with session.post(
+                        f"{self.api_config.api_url}/analyze",
+                        json=payload,
+                        headers=headers,
+                        timeout=timeout
+                    ) as response:
+                        fields['status'] = response.status
+                        if 200 <= response.status < 300:
+                            if response.status == 204:
+                                return 'No analysis provided'
+                            if response.content_type == 'application/json':
+                                result = await response.json()
+                                return result.get('analysis', 'No analysis provided')
+                            return await self._read_stream(response, forward)
+                        if response.status not in RETRY_STATUSES:
+                            raise _status_error(response)
+                        limiter.record_throttled()
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        record('llm_throttled', analysis_type=analysis_type,
+                               status=response.status, retry_after=retry_after)
+                        if attempt >= self.api_config.max_retries:
+                            raise _status_error(response)
+                except asyncio.TimeoutError:
+                    fields['status'] = 'timeout'
+                    # Listeners already show part of this answer; a retry would repeat it
+                    if streamed or attempt >= self.api_config.max_retries:
+                        raise
+
+            if retry_after is not None:
+                # Hold back every client of this API, not just this request
+                limiter.pause(retry_after)
+                delay = retry_after
+            else:
+                delay = limiter.backoff(attempt)
+                await asyncio.sleep(delay)
+            limiter.record_retry()
+            record('llm_retry', analysis_type=analysis_type, attempt=attempt,
+                   delay=round(delay, 3))
+            attempt += 1
+    
+    async def _fetch(self, key: str, payload: Dict[str, Any], entry: _InFlight) -> str:
+        session = self._get_session()
+        async with self._semaphore:
+            text = await self._make_api_request(session, payload, entry.add_chunk)
+        if self.cache is not None:
+            self.cache.put(key, text)
+        return text
+    
+    async def _analyze_one(self, metric_data: MetricData, analysis_type: str,
+                           on_chunk: Optional[ChunkCallback] = None) -> str:
+        # Tasks copy the context, so the request and cache records share this ID
+        with correlation():
+            return await self._analyze_cached(metric_data, analysis_type, on_chunk)
+    
+    async def _analyze_cached(self, metric_data: MetricData, analysis_type: str,
+                              on_chunk: Optional[ChunkCallback]) -> str:
+        prompt = build_prompt(metric_data, analysis_type)
+        key = response_key(prompt, analysis_type, self.api_config.api_url)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        entry = self._in_flight.get(key)
+        if entry is None or entry.task.done():
+            payload = {
+                "prompt": prompt,
+                "metric_data": metric_data.to_dict(),
+                "analysis_type": analysis_type
+            }
+            if self.api_config.stream:
+                payload["stream"] = True
+            entry = self._in_flight[key] = _InFlight()
+            entry.task = asyncio.get_running_loop().create_task(self._fetch(key, payload, entry))
+            entry.task.add_done_callback(
+                lambda _: self._in_flight.pop(key) if self._in_flight.get(key) is entry else None
+            )
+        if on_chunk is not None:
+            entry.listen(on_chunk)
+        entry.waiters += 1
         try:
-            async with aiohttp.ClientSession() as session:
-                result = await self._make_api_request(session)
-                return result.get('analysis', 'No analysis provided')
-                
-        except Exception as e:
-            raise RuntimeError(f"Analysis failed: {str(e)}")
+            return await asyncio.shield(entry.task)
+        finally:
+            entry.waiters -= 1
+            if on_chunk is not None and on_chunk in entry.listeners:
+                entry.listeners.remove(on_chunk)
+            # Cancel the shared request only once nobody is waiting for it
+            if entry.waiters == 0 and not entry.task.done():
+                entry.task.cancel()
+    
+    async def _analyze_many(self, metric_data: MetricData,
+                            analysis_types: List[str]) -> Dict[str, str]:
+        async def run(analysis_type: str) -> Tuple[str, Optional[str]]:
+            try:
+                text = await self._analyze_one(
+                    metric_data, analysis_type,
+                    lambda chunk: self.partial_text.emit(analysis_type, chunk)
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.error.emit(analysis_type, f"Analysis failed: {str(e)}")
+                return analysis_type, None
+            self.result_ready.emit(analysis_type, text)
+            return analysis_type, text
+        
+        with correlation():
+            pairs = await asyncio.gather(*(run(t) for t in analysis_types))
+        results = {analysis_type: text for analysis_type, text in pairs if text is not None}
+        self.all_finished.emit(results)
+        return results
+    
+    def submit(self, metric_data: MetricData, analysis_type: str,
+               on_chunk: Optional[ChunkCallback] = None) -> Future:
+        """Start one analysis; the future resolves to its text
+
+        ``on_chunk`` is called from the event loop thread with streamed text.
+        Cancelling the future aborts the request and closes its connection.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._analyze_one(metric_data, analysis_type, on_chunk), self._loop
+        )
+    
+    def analyze(self, metric_data: MetricData,
+                analysis_types: Sequence[str] = ANALYSIS_TYPES) -> Future:
+        """Run several analyses concurrently, emitting ``result_ready`` as each completes
+
+        The returned future resolves to a dict of the successful results and
+        can be cancelled to abort the requests still running.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._analyze_many(metric_data, list(analysis_types)), self._loop
+        )
+    
+    def close(self):
+        """Close the session and stop the event loop thread"""
+        if self.closed:
+            return
+        
+        async def shutdown():
+            if self._session is not None:
+                await self._session.close()
+        
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=5)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            if self.cache is not None:
+                self.cache.close()
+
+class LLMAnalyzer(QThread):
+    """Handles LLM analysis in a separate thread to keep UI responsive
+    
+    Requests go through the shared ``AnalysisService`` for the API config, so
+    consecutive analyses reuse pooled connections.
+    """
+    partial = pyqtSignal(str)
+    finished = pyqtSignal(str)
+    error = pyqtSignal(str)
+    
+    def __init__(self, metric_data: MetricData, api_config: APIConfig, analysis_type: str,
+                 service: Optional[AnalysisService] = None):
+        super().__init__()
+        self.metric_data = metric_data
+        self.api_config = api_config
+        self.analysis_type = analysis_type
+        self.service = service
+        self._should_stop = False
+    
+    def stop(self):
+        """Stop the analysis"""
+        self._should_stop = True
+    
+    def get_prompt(self) -> str:
+        """Generate appropriate prompt based on analysis type"""
+        return build_prompt(self.metric_data, self.analysis_type)
     
     def run(self):
-        """Run the analysis in a separate thread"""
+        """Run the analysis on the shared service, waiting in this thread"""
         try:
             if self._should_stop:
                 return
-                
-            # Create event loop for async operations
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
             
-            # Run analysis
-            result = loop.run_until_complete(self.analyze())
+            service = self.service or AnalysisService.shared(self.api_config)
+            future = service.submit(self.metric_data, self.analysis_type, self.partial.emit)
+            while not future.done():
+                if self._should_stop:
+                    future.cancel()
+                    return
+                time.sleep(0.05)
             
+            result = future.result()
             if self._should_stop:
                 return
                 
@@ -122,48 +517,11 @@ class LLMAnalyzer(QThread):
             
         except Exception as e:
             if not self._should_stop:
-                self.error.emit(str(e))
-        finally:
-            loop.close()
+                self.error.emit(f"Analysis failed: {str(e)}")
 
-class ResultsAnalyzer:
-    """Analyzes calculation results for physical significance"""
-    def __init__(self, metric_data: MetricData):
-        self.metric_data = metric_data
-    
-    def analyze_signature(self) -> str:
-        """Analyze metric signature"""
-        try:
-            # Implementation would go here
-            # This is a placeholder that would need real implementation
-            return "Metric signature analysis not implemented"
-        except Exception as e:
-            return f"Signature analysis failed: {str(e)}"
-    
-    def analyze_symmetries(self) -> str:
-        """Analyze metric symmetries"""
-        try:
-            # Implementation would go here
-            # This is a placeholder that would need real implementation
-            return "Symmetry analysis not implemented"
-        except Exception as e:
-            return f"Symmetry analysis failed: {str(e)}"
-    
-    def analyze_singularities(self) -> str:
-        """Analyze potential singularities"""
-        try:
-            # Implementation would go here
-            # This is a placeholder that would need real implementation
-            return "Singularity analysis not implemented"
-        except Exception as e:
-            return f"Singularity analysis failed: {str(e)}"
-    
-    def get_full_analysis(self) -> str:
-        """Get complete analysis of results"""
-        analyses = [
-            ("Signature Analysis", self.analyze_signature()),
-            ("Symmetry Analysis", self.analyze_symmetries()),
-            ("Singularity Analysis", self.analyze_singularities())
-        ]
-        
-        return "\n\n".join(f"{title}:\n{content}" for title, content in analyses)
+def __getattr__(name: str) -> Any:
+    # ResultsAnalyzer moved to results_analysis; loading it here would pull in sympy
+    if name == 'ResultsAnalyzer':
+        from .results_analysis import ResultsAnalyzer
+        return ResultsAnalyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .cache import DEFAULT_CACHE_PATH, ResultCache
+from .utils import MetricData, TimeLimitExceeded, time_limit
+
+@dataclass
+class BatchResult:
+    """Outcome of solving a single metric in a batch"""
+    index: int
+    status: str
+    elapsed: float
+    results: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    name: Optional[str] = None
+    # Results file written for this record, if any
+    results_file: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Convert result to dictionary"""
+        data = {
+            'index': self.index,
+            'status': self.status,
+            'elapsed': round(self.elapsed, 6),
+            'results': self.results,
+            'error': self.error
+        }
+        if self.name is not None:
+            data['name'] = self.name
+        if self.results_file is not None:
+            data['results_file'] = self.results_file
+        return data
+
+def load_records(path: Path) -> List[dict]:
+    """Load metric records from a JSON file (object or list) or a JSONL file"""
+    text = Path(path).read_text()
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        return list(json.loads(text))
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [data]
+
+# One cache connection per worker process, opened on first use
+_worker_caches: Dict[str, ResultCache] = {}
+
+def _get_worker_cache(cache_path: Optional[str]) -> Optional[ResultCache]:
+    if cache_path is None:
+        return None
+    if cache_path not in _worker_caches:
+        _worker_caches[cache_path] = ResultCache(Path(cache_path))
+    return _worker_caches[cache_path]
+
+def results_file_name(index: int, name: Optional[str] = None) -> str:
+    """File name for a record's results: its index, plus its name made path-safe"""
+    from .result_file import SUFFIX
+
+    stem = f"{index:06d}"
+    if name:
+        stem += "-" + re.sub(r'[^\w.-]+', '_', name)
+    return stem + SUFFIX
+
+def _solve_job(index: int, record: dict, timeout: Optional[float],
+               cache_path: Optional[str] = None, backend: str = 'native',
+               simplify_budget: Optional[float] = None,
+               compact: bool = False, results_dir: Optional[str] = None) -> BatchResult:
+    """Solve one record inside a worker process"""
+    # Imported here so the parent process does not pay for the math stack
+    from .engine import solve_metric, serialize_results
+    from .result_file import save_results
+
+    name = record.get('name')
+    start = time.perf_counter()
+    try:
+        # Only enforced on POSIX, where SIGALRM is available
+        with time_limit(timeout):
+            metric_data = MetricData.from_dict(record)
+            solved = solve_metric(metric_data, cache=_get_worker_cache(cache_path),
+                                  backend=backend, simplify_budget=simplify_budget,
+                                  simplify_workers=1)
+            results = serialize_results(solved, compact=compact)
+            results_file = None
+            if results_dir is not None:
+                results_file = str(Path(results_dir) / results_file_name(index, name))
+                save_results(results_file, solved, metric_data)
+        return BatchResult(index, 'ok', time.perf_counter() - start, results, name=name,
+                           results_file=results_file)
+    except TimeLimitExceeded:
+        return BatchResult(index, 'timeout', time.perf_counter() - start,
+                           error=f"Exceeded {timeout}s time limit", name=name)
+    except Exception as e:
+        return BatchResult(index, 'error', time.perf_counter() - start,
+                           error=str(e), name=name)
+
+def run_batch(records: Iterable[dict], max_workers: Optional[int] = None,
+              timeout: Optional[float] = None,
+              cache_path: Optional[Path] = None,
+              backend: str = 'native',
+              simplify_budget: Optional[float] = None,
+              compact: bool = False,
+              results_dir: Optional[Path] = None) -> Iterator[BatchResult]:
+    """Solve records in parallel, yielding results as each job finishes
+
+    ``simplify_budget`` caps the seconds spent simplifying each distinct
+    component (records already fill the worker processes, so a job simplifies
+    its own components in turn) and
+    ``compact`` writes results with shared subexpressions listed once. With
+    ``results_dir`` each solve is also saved there as a results file.
+    """
+    cache_path = str(cache_path) if cache_path is not None else None
+    if results_dir is not None:
+        Path(results_dir).mkdir(parents=True, exist_ok=True)
+        results_dir = str(results_dir)
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_solve_job, index, record, timeout, cache_path, backend,
+                            simplify_budget, compact, results_dir)
+            for index, record in enumerate(records)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for batch solving"""
+    parser = argparse.ArgumentParser(
+        description="Solve Einstein field equations for a file of metrics"
+    )
+    parser.add_argument('input', type=Path,
+                        help="JSON or JSONL file of metric records")
+    parser.add_argument('-o', '--output', type=Path,
+                        help="JSONL file for results (default: stdout)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument('-t', '--timeout', type=float, default=None,
+                        help="Per-metric time limit in seconds")
+    parser.add_argument('--cache', type=Path, default=DEFAULT_CACHE_PATH,
+                        help=f"Result cache database (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Do not read or write the result cache")
+    parser.add_argument('--backend', choices=['native', 'einsteinpy'], default='native',
+                        help="Curvature backend (default: native)")
+    parser.add_argument('--simplify-budget', type=float, default=None,
+                        help="Seconds allowed for simplifying each component "
+                             "(default: unlimited sympy.simplify)")
+    parser.add_argument('--compact', action='store_true',
+                        help="Write results with common subexpressions listed once")
+    parser.add_argument('--save-results', type=Path, default=None, metavar='DIR',
+                        help="Also save each solve as a binary results file in DIR")
+    args = parser.parse_args(argv)
+
+    records = load_records(args.input)
+    cache_path = None if args.no_cache else args.cache
+    out = open(args.output, 'w') if args.output else sys.stdout
+    failures = 0
+    try:
+        for result in run_batch(records, args.workers, args.timeout,
+                                cache_path, args.backend, args.simplify_budget,
+                                args.compact, args.save_results):
+            if result.status != 'ok':
+                failures += 1
+            out.write(json.dumps(result.to_dict()) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Solved {len(records) - failures}/{len(records)} metrics", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,359 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .utils import MetricData, TimeLimitExceeded, time_limit
+
+DEFAULT_REPEATS = 3
+DEFAULT_SAMPLES = 10_000
+DEFAULT_SIMPLIFY_BUDGET = 0.5
+# Seconds allowed for the einsteinpy chain, which takes many minutes on Kerr
+DEFAULT_EINSTEINPY_LIMIT = 60.0
+# A stage regresses when it is this fraction slower than the baseline...
+DEFAULT_THRESHOLD = 0.5
+# ...and slower by at least this many seconds, so timer noise on tiny stages is ignored
+DEFAULT_MIN_SECONDS = 0.02
+DEFAULT_BASELINE_PATH = Path('benchmarks/baseline.json')
+
+# Timed stages, in the order they run; 'einsteinpy' is the same Christoffel to
+# Einstein chain through einsteinpy, comparable to the sum of 'inverse' through
+# 'einstein_tensor'
+BENCHMARK_STAGES = (
+    'parse', 'inverse', 'christoffel_symbols', 'riemann', 'ricci', 'ricci_scalar',
+    'einstein_tensor', 'simplification', 'invariants', 'lambdify', 'numeric', 'einsteinpy'
+)
+
+@dataclass
+class BenchmarkMetric:
+    """A catalogue entry: a metric in LaTeX form plus values for numeric evaluation"""
+    name: str
+    components: List[List[str]]
+    coordinates: List[str]
+    # Values for constants such as M or a
+    parameters: Dict[str, float] = field(default_factory=dict)
+    # Sampling range per coordinate symbol name; others use (0, 1)
+    ranges: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+    def metric_data(self) -> MetricData:
+        return MetricData(self.components, len(self.components), self.coordinates)
+
+def _diagonal(entries: Sequence[str]) -> List[List[str]]:
+    return [[entries[i] if i == j else "0" for j in range(len(entries))]
+            for i in range(len(entries))]
+
+_SPHERICAL = ['t', 'r', '\\theta', '\\phi']
+_SCHWARZSCHILD_RANGES = {'r': (3.0, 20.0), 'theta': (0.2, 2.9)}
+
+CATALOGUE: Dict[str, BenchmarkMetric] = {metric.name: metric for metric in [
+    BenchmarkMetric(
+        'minkowski', _diagonal(['-1', '1', '1', '1']), ['t', 'x', 'y', 'z']
+    ),
+    BenchmarkMetric(
+        'schwarzschild',
+        _diagonal(['-(1-\\frac{2M}{r})', '\\frac{1}{1-\\frac{2M}{r}}',
+                   'r^2', 'r^2\\sin^2\\theta']),
+        _SPHERICAL, {'M': 1.0}, _SCHWARZSCHILD_RANGES
+    ),
+    BenchmarkMetric(
+        'reissner_nordstrom',
+        _diagonal(['-(1-\\frac{2M}{r}+\\frac{Q^2}{r^2})',
+                   '\\frac{1}{1-\\frac{2M}{r}+\\frac{Q^2}{r^2}}',
+                   'r^2', 'r^2\\sin^2\\theta']),
+        _SPHERICAL, {'M': 1.0, 'Q': 0.5}, _SCHWARZSCHILD_RANGES
+    ),
+    BenchmarkMetric(
+        'kerr',
+        [['-(1-\\frac{2Mr}{r^2+a^2\\cos^2\\theta})', '0', '0',
+          '-\\frac{2Mar\\sin^2\\theta}{r^2+a^2\\cos^2\\theta}'],
+         ['0', '\\frac{r^2+a^2\\cos^2\\theta}{r^2-2Mr+a^2}', '0', '0'],
+         ['0', '0', 'r^2+a^2\\cos^2\\theta', '0'],
+         ['-\\frac{2Mar\\sin^2\\theta}{r^2+a^2\\cos^2\\theta}', '0', '0',
+          '(r^2+a^2+\\frac{2Ma^2r\\sin^2\\theta}{r^2+a^2\\cos^2\\theta})\\sin^2\\theta']],
+        _SPHERICAL, {'M': 1.0, 'a': 0.5}, _SCHWARZSCHILD_RANGES
+    ),
+    BenchmarkMetric(
+        'flrw_matter',
+        _diagonal(['-1', '\\frac{t^{\\frac{4}{3}}}{1-kr^2}',
+                   't^{\\frac{4}{3}}r^2', 't^{\\frac{4}{3}}r^2\\sin^2\\theta']),
+        _SPHERICAL, {'k': 1.0}, {'t': (1.0, 2.0), 'r': (0.1, 0.9), 'theta': (0.2, 2.9)}
+    ),
+    BenchmarkMetric(
+        'de_sitter',
+        _diagonal(['-(1-H^2r^2)', '\\frac{1}{1-H^2r^2}', 'r^2', 'r^2\\sin^2\\theta']),
+        _SPHERICAL, {'H': 0.1}, {'r': (0.5, 5.0), 'theta': (0.2, 2.9)}
+    ),
+    BenchmarkMetric(
+        'kaluza_klein_5d',
+        [['-1', '0', '0', '0', '0'],
+         ['0', '1', '0', '0', '0'],
+         ['0', '0', '1+B^2x^2', '0', 'Bx'],
+         ['0', '0', '0', '1', '0'],
+         ['0', '0', 'Bx', '0', '1']],
+        ['t', 'x', 'y', 'z', 'w'], {'B': 0.3}, {'x': (-2.0, 2.0)}
+    ),
+]}
+
+@dataclass
+class BenchmarkResult:
+    """Best-of-repeats stage timings and peak traced memory for one metric"""
+    name: str
+    timings: Dict[str, float] = field(default_factory=dict)
+    peak_memory: int = 0
+    # Stages that ran out of time and so have no timing
+    timed_out: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        data = {
+            'timings': {stage: round(seconds, 6) for stage, seconds in self.timings.items()},
+            # The einsteinpy chain is a comparison point, not part of the solver's time
+            'total': round(sum(seconds for stage, seconds in self.timings.items()
+                               if stage != 'einsteinpy'), 6),
+            'peak_memory': self.peak_memory
+        }
+        if self.timed_out:
+            data['timed_out'] = self.timed_out
+        return data
+
+def _einsteinpy_chain(matrix: Any, coords: Sequence[Any]) -> None:
+    """Christoffels, Riemann, Ricci, scalar and Einstein tensor through einsteinpy"""
+    import sympy as sp
+    from einsteinpy.symbolic import (
+        ChristoffelSymbols, EinsteinTensor, MetricTensor, RicciScalar, RicciTensor,
+        RiemannCurvatureTensor
+    )
+
+    metric_tensor = MetricTensor(matrix.tolist(), coords)
+    christoffels = ChristoffelSymbols.from_metric(metric_tensor)
+    riemann = RiemannCurvatureTensor.from_christoffels(christoffels, metric_tensor)
+    ricci = RicciTensor.from_riemann(riemann, metric_tensor)
+    scalar = RicciScalar.from_riccitensor(ricci, metric_tensor)
+    EinsteinTensor(ricci.tensor() - sp.Rational(1, 2) * metric_tensor.tensor() * scalar.expr,
+                   coords, config="ll", parent_metric=metric_tensor)
+
+def _run_once(metric: BenchmarkMetric, simplify_budget: Optional[float], samples: int,
+              einsteinpy_limit: Optional[float] = DEFAULT_EINSTEINPY_LIMIT) -> Dict[str, float]:
+    """Time each stage once; a stage missing from the result ran out of time
+
+    ``einsteinpy_limit`` of 0 skips the einsteinpy chain.
+    """
+    import numpy as np
+    from .curvature import CurvatureKernel
+    from .engine import coordinate_symbols
+    from .invariants import Invariants
+    from .numeric import GridEvaluator
+    from .parsing import clear_memo
+    from .simplification import simplify_results
+
+    timings: Dict[str, float] = {}
+    clear_memo()
+    start = time.perf_counter()
+    matrix = metric.metric_data().to_matrix()
+    coords = coordinate_symbols(metric.coordinates)
+    timings['parse'] = time.perf_counter() - start
+
+    last = [time.perf_counter()]
+
+    def on_stage(stage: str, value: Any) -> None:
+        now = time.perf_counter()
+        timings[stage] = now - last[0]
+        last[0] = now
+
+    kernel = CurvatureKernel(matrix, coords, simplify=False, on_stage=on_stage)
+    curvature = kernel.result()
+
+    start = time.perf_counter()
+    simplify_results({
+        'christoffel_symbols': curvature.christoffels,
+        'ricci_scalar': curvature.ricci_scalar,
+        'einstein_tensor': curvature.einstein
+    }, budget=simplify_budget, max_workers=1)
+    timings['simplification'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    invariants = Invariants.from_curvature(curvature).as_dict(('kretschmann',))
+    timings['invariants'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    evaluator = GridEvaluator({'ricci_scalar': curvature.ricci_scalar, **invariants},
+                              coords, metric.parameters)
+    timings['lambdify'] = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    points = [rng.uniform(*metric.ranges.get(str(symbol), (0.0, 1.0)), samples)
+              for symbol in coords]
+    start = time.perf_counter()
+    evaluator(*points)
+    timings['numeric'] = time.perf_counter() - start
+
+    if einsteinpy_limit != 0:
+        start = time.perf_counter()
+        try:
+            with time_limit(einsteinpy_limit):
+                _einsteinpy_chain(matrix, coords)
+            timings['einsteinpy'] = time.perf_counter() - start
+        except TimeLimitExceeded:
+            pass
+    return timings
+
+def run_benchmark(metric: BenchmarkMetric, repeats: int = DEFAULT_REPEATS,
+                  simplify_budget: Optional[float] = DEFAULT_SIMPLIFY_BUDGET,
+                  samples: int = DEFAULT_SAMPLES, memory: bool = True,
+                  einsteinpy_limit: Optional[float] = DEFAULT_EINSTEINPY_LIMIT
+                  ) -> BenchmarkResult:
+    """Time every stage of one metric, keeping the fastest of ``repeats`` runs
+
+    Peak memory comes from one extra run under tracemalloc, which slows
+    sympy down too much to use for timing. Once the einsteinpy chain runs
+    past ``einsteinpy_limit`` it is not retried.
+    """
+    result = BenchmarkResult(metric.name)
+    for _ in range(repeats):
+        limit = 0 if result.timed_out else einsteinpy_limit
+        timings = _run_once(metric, simplify_budget, samples, limit)
+        if limit != 0 and 'einsteinpy' not in timings:
+            result.timed_out.append('einsteinpy')
+        for stage, seconds in timings.items():
+            result.timings[stage] = min(seconds, result.timings.get(stage, seconds))
+    if memory:
+        tracemalloc.start()
+        try:
+            # The einsteinpy chain is a comparison point, not part of the solver's footprint
+            _run_once(metric, simplify_budget, samples, einsteinpy_limit=0)
+            result.peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+def _environment() -> Dict[str, str]:
+    import einsteinpy
+    import numpy
+    import sympy
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sympy': sympy.__version__,
+        'einsteinpy': einsteinpy.__version__,
+        'numpy': numpy.__version__
+    }
+
+def run_suite(names: Optional[Sequence[str]] = None, repeats: int = DEFAULT_REPEATS,
+              simplify_budget: Optional[float] = DEFAULT_SIMPLIFY_BUDGET,
+              samples: int = DEFAULT_SAMPLES, memory: bool = True,
+              einsteinpy_limit: Optional[float] = DEFAULT_EINSTEINPY_LIMIT) -> Dict[str, Any]:
+    """Benchmark catalogue metrics and return a JSON-serializable report"""
+    names = list(names or CATALOGUE)
+    unknown = [name for name in names if name not in CATALOGUE]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+    return {
+        'environment': _environment(),
+        'settings': {'repeats': repeats, 'simplify_budget': simplify_budget, 'samples': samples,
+                     'einsteinpy_limit': einsteinpy_limit},
+        'metrics': {
+            name: run_benchmark(CATALOGUE[name], repeats, simplify_budget, samples,
+                                memory, einsteinpy_limit).to_dict()
+            for name in names
+        }
+    }
+
+@dataclass
+class Regression:
+    metric: str
+    stage: str
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        return (f"{self.metric}/{self.stage}: {self.current:.4f} s vs baseline "
+                f"{self.baseline:.4f} s ({self.current / self.baseline:.2f}x)")
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD,
+            min_seconds: float = DEFAULT_MIN_SECONDS) -> List[Regression]:
+    """Stages slower than the baseline by more than ``threshold`` and ``min_seconds``
+
+    Metrics or stages missing from the baseline are not compared.
+    """
+    regressions = []
+    for name, current in report['metrics'].items():
+        reference = baseline.get('metrics', {}).get(name)
+        if reference is None:
+            continue
+        for stage, seconds in current['timings'].items():
+            before = reference['timings'].get(stage)
+            if before is None:
+                continue
+            if seconds > before * (1 + threshold) and seconds - before > min_seconds:
+                regressions.append(Regression(name, stage, before, seconds))
+    return regressions
+
+def merge_baseline(baseline: Dict[str, Any], report: Dict[str, Any]) -> Dict[str, Any]:
+    """The baseline with the report's metrics replaced, keeping metrics that were not run"""
+    merged = dict(report)
+    merged['metrics'] = {**baseline.get('metrics', {}), **report['metrics']}
+    return merged
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for the benchmark suite"""
+    parser = argparse.ArgumentParser(
+        description="Time each solver stage on a catalogue of standard spacetimes"
+    )
+    parser.add_argument('-m', '--metric', action='append', choices=sorted(CATALOGUE),
+                        help="Metric to run (repeatable; default: all)")
+    parser.add_argument('-r', '--repeats', type=int, default=DEFAULT_REPEATS,
+                        help=f"Runs per metric, fastest kept (default: {DEFAULT_REPEATS})")
+    parser.add_argument('-o', '--output', type=Path,
+                        help="JSON file for the report (default: stdout)")
+    parser.add_argument('--baseline', type=Path, default=None,
+                        help="Baseline report to compare against; regressions exit with 1")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help=f"Merge the report into the baseline, replacing the metrics "
+                             f"that were run (default path: {DEFAULT_BASELINE_PATH})")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown fraction per stage (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--simplify-budget', type=float, default=DEFAULT_SIMPLIFY_BUDGET,
+                        help="Seconds allowed for simplifying each component")
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES,
+                        help="Points for the numeric evaluation stage")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip the traced run that measures peak memory")
+    parser.add_argument('--einsteinpy-limit', type=float, default=DEFAULT_EINSTEINPY_LIMIT,
+                        help=f"Seconds allowed for the einsteinpy curvature chain, 0 to skip it "
+                             f"(default: {DEFAULT_EINSTEINPY_LIMIT:g})")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.metric, args.repeats, args.simplify_budget, args.samples,
+                       not args.no_memory, args.einsteinpy_limit)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+    for name, data in report['metrics'].items():
+        timed_out = f"  (timed out: {', '.join(data['timed_out'])})" if 'timed_out' in data else ""
+        print(f"{name:20s} {data['total']:9.3f} s  {data['peak_memory'] / 2**20:8.1f} MiB"
+              f"{timed_out}", file=sys.stderr)
+
+    if args.update_baseline:
+        path = args.baseline or DEFAULT_BASELINE_PATH
+        baseline = json.loads(path.read_text()) if path.exists() else {}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(merge_baseline(baseline, report), indent=2) + "\n")
+        print(f"Baseline written to {path}", file=sys.stderr)
+        return
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Sequence
+
+from .instrumentation import span
+
+if TYPE_CHECKING:
+    import sympy as sp
+
+DEFAULT_CACHE_PATH = Path('cache/results.sqlite3')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+DEFAULT_RESPONSE_CACHE_PATH = Path('cache/analyses.sqlite3')
+DEFAULT_RESPONSE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_RESPONSE_TTL = 7 * 24 * 3600.0
+
+# Bump when the stored payload layout changes so old entries stop matching
+CACHE_FORMAT_VERSION = 1
+
+def metric_key(metric_matrix: 'sp.Matrix', coord_symbols: Sequence['sp.Symbol'],
+               settings: Optional[Mapping[str, Any]] = None) -> str:
+    """Hash the parsed metric and coordinates into a canonical cache key
+
+    The key is computed from the sympy tree rather than the LaTeX source, so
+    the same metric typed differently (spacing, ``\\sin`` vs ``\\sin{}``)
+    maps to the same entry. ``settings`` (backend, simplification...) that
+    change the stored form of the results are part of the key.
+    """
+    import sympy as sp
+
+    canonical = "|".join([
+        f"v{CACHE_FORMAT_VERSION}",
+        f"sympy-{sp.__version__}",
+        sp.srepr(sp.ImmutableMatrix(metric_matrix)),
+        sp.srepr(tuple(coord_symbols)),
+        repr(sorted((settings or {}).items()))
+    ])
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def _encode(value: Any, stage: str) -> bytes:
+    """Sympy results in the results file format, anything else pickled"""
+    # Only reached once something has been solved, so sympy is already loaded
+    from .result_file import dumps, encodable
+
+    if encodable(value):
+        return dumps({stage: value})
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _decode(payload: bytes, stage: str) -> Any:
+    from .result_file import MAGIC, ResultFile
+
+    if payload[:len(MAGIC)] == MAGIC:
+        return ResultFile(payload).stage(stage)
+    return pickle.loads(payload)
+
+class ResultCache:
+    """Persistent LRU cache of solved stages, shared across processes via SQLite
+
+    Sympy stages are stored in the compact results file format (see
+    ``result_file``); other values are pickled.
+    """
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (key, stage)
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)"
+            )
+
+    def get(self, key: str, stage: str) -> Optional[Any]:
+        """Return the cached value for a stage, or None on a miss"""
+        with span('cache', cache='results', stage=stage) as fields:
+            value = self._get(key, stage)
+            fields['hit'] = value is not None
+        return value
+
+    def _get(self, key: str, stage: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM results WHERE key = ? AND stage = ?", (key, stage)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE results SET last_access = ? WHERE key = ? AND stage = ?",
+                    (time.time(), key, stage)
+                )
+        try:
+            value = _decode(row[0], stage)
+        except Exception:
+            # Unreadable entry (e.g. written by an incompatible sympy); treat as a miss
+            self.delete(key, stage)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, stage: str, value: Any) -> None:
+        """Store a stage result and evict least recently used entries over the cap"""
+        payload = _encode(value, stage)
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, stage, payload, len(payload), time.time())
+            )
+            self._evict()
+
+    def delete(self, key: str, stage: Optional[str] = None) -> None:
+        """Remove one stage, or every stage, of a cached metric"""
+        with self._lock, self._conn:
+            if stage is None:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            else:
+                self._conn.execute(
+                    "DELETE FROM results WHERE key = ? AND stage = ?", (key, stage)
+                )
+
+    def clear(self) -> None:
+        """Remove all cached results"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results")
+
+    def total_bytes(self) -> int:
+        """Total size of stored payloads"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, stage, size FROM results ORDER BY last_access ASC"
+        ).fetchall()
+        for key, stage, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute(
+                "DELETE FROM results WHERE key = ? AND stage = ?", (key, stage)
+            )
+            total -= size
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        self._conn.close()
+
+def response_key(prompt: str, analysis_type: str, api_url: str) -> str:
+    """Hash an LLM request into a cache key"""
+    canonical = "\x1f".join([f"v{CACHE_FORMAT_VERSION}", api_url, analysis_type, prompt])
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """Persistent cache of LLM analysis texts with a TTL and LRU size cap"""
+    def __init__(self, path: Path = DEFAULT_RESPONSE_CACHE_PATH,
+                 ttl: Optional[float] = DEFAULT_RESPONSE_TTL,
+                 max_bytes: int = DEFAULT_RESPONSE_MAX_BYTES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached text, or None if missing or older than the TTL"""
+        with span('cache', cache='responses') as fields:
+            text = self._get(key)
+            fields['hit'] = text is not None
+        return text
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT text, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, text: str) -> None:
+        """Store a response and evict least recently used entries over the cap"""
+        size = len(text.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, text, size, now, now)
+            )
+            self._evict(now)
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def _evict(self, now: float) -> None:
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        self._conn.close()
@@ -0,0 +1,140 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Mapping, Sequence, TextIO, Tuple
+import sympy as sp
+from sympy.tensor.array import NDimArray
+
+@dataclass
+class _Stage:
+    kind: str
+    shape: Tuple[int, ...]
+    components: List[sp.Expr]
+    # Names of the components of a 'mapping' stage, such as scalar invariants
+    keys: Tuple[str, ...] = ()
+
+@dataclass
+class CompressedResults:
+    """Result stages sharing one common-subexpression table
+
+    Every component of every stage is rewritten by ``sympy.cse`` against a
+    single list of replacements, so a subexpression repeated across the
+    Christoffels, Ricci and Einstein tensors is stored once. Replacement
+    symbols are Dummies, so they never clash with metric symbols.
+    """
+    replacements: List[Tuple[sp.Symbol, sp.Expr]] = field(default_factory=list)
+    stages: Dict[str, _Stage] = field(default_factory=dict)
+
+    @classmethod
+    def from_results(cls, results: Mapping[str, Any]) -> 'CompressedResults':
+        """Compress a mapping of stage name to sympy expression, Matrix, Array or dict"""
+        layout = []
+        flat: List[sp.Expr] = []
+        for name, value in results.items():
+            keys: Tuple[str, ...] = ()
+            if isinstance(value, Mapping):
+                keys = tuple(value)
+                components = [sp.sympify(v) for v in value.values()]
+                kind, shape = 'mapping', (len(keys),)
+            elif isinstance(value, sp.MatrixBase):
+                kind, shape, components = 'matrix', value.shape, list(value)
+            elif isinstance(value, NDimArray):
+                kind, shape, components = 'array', value.shape, sp.flatten(value)
+            else:
+                kind, shape, components = 'scalar', (), [sp.sympify(value)]
+            layout.append((name, kind, tuple(shape), keys, len(components)))
+            flat.extend(components)
+
+        replacements, reduced = sp.cse(flat, symbols=sp.numbered_symbols('x', cls=sp.Dummy))
+        stages = {}
+        offset = 0
+        for name, kind, shape, keys, count in layout:
+            stages[name] = _Stage(kind, shape, list(reduced[offset:offset + count]), keys)
+            offset += count
+        return cls(list(replacements), stages)
+
+    def _substitutions(self, needed: Sequence[sp.Expr] = ()) -> Dict[sp.Symbol, sp.Expr]:
+        # Replacements only refer to earlier ones, so one forward pass expands them all
+        if needed:
+            wanted = set().union(*(expr.free_symbols for expr in needed))
+            for symbol, value in reversed(self.replacements):
+                if symbol in wanted:
+                    wanted |= value.free_symbols
+        else:
+            wanted = None
+        substitutions: Dict[sp.Symbol, sp.Expr] = {}
+        for symbol, value in self.replacements:
+            if wanted is None or symbol in wanted:
+                substitutions[symbol] = value.xreplace(substitutions)
+        return substitutions
+
+    def _rebuild(self, stage: _Stage, components: List[sp.Expr]) -> Any:
+        if stage.kind == 'matrix':
+            return sp.Matrix(*stage.shape, components)
+        if stage.kind == 'array':
+            return sp.ImmutableDenseNDimArray(components, stage.shape)
+        if stage.kind == 'mapping':
+            return dict(zip(stage.keys, components))
+        return components[0]
+
+    def stage(self, name: str) -> Any:
+        """Expand one stage back to its original sympy form"""
+        stage = self.stages[name]
+        substitutions = self._substitutions(stage.components)
+        return self._rebuild(stage, [c.xreplace(substitutions) for c in stage.components])
+
+    def expand(self) -> Dict[str, Any]:
+        """Expand every stage back to its original sympy form"""
+        substitutions = self._substitutions()
+        return {
+            name: self._rebuild(stage, [c.xreplace(substitutions) for c in stage.components])
+            for name, stage in self.stages.items()
+        }
+
+    def component(self, name: str, index: Tuple[int, ...] = ()) -> sp.Expr:
+        """Expand a single component, substituting only the replacements it needs"""
+        stage = self.stages[name]
+        flat_index = 0
+        for size, i in zip(stage.shape, index):
+            flat_index = flat_index * size + i
+        expr = stage.components[flat_index]
+        return expr.xreplace(self._substitutions([expr]))
+
+    def operation_count(self) -> int:
+        """Total operations in the shared form"""
+        return (sum(sp.count_ops(value) for _, value in self.replacements) +
+                sum(sp.count_ops(c) for stage in self.stages.values() for c in stage.components))
+
+    def to_strings(self) -> Dict[str, Any]:
+        """Plain strings for JSON export, with the shared subexpressions listed once"""
+        data: Dict[str, Any] = {
+            'subexpressions': [f"{symbol} = {value}" for symbol, value in self.replacements]
+        }
+        for name, stage in self.stages.items():
+            data[name] = str(stage.components[0] if stage.kind == 'scalar' else
+                             self._rebuild(stage, stage.components))
+        return data
+
+    def lines(self) -> Iterator[str]:
+        """Readable text: the shared subexpressions, then each nonzero component"""
+        for symbol, value in self.replacements:
+            yield f"{symbol} = {value}"
+        for name, stage in self.stages.items():
+            if stage.kind == 'scalar':
+                yield f"{name} = {stage.components[0]}"
+                continue
+            if stage.kind == 'mapping':
+                for key, expr in zip(stage.keys, stage.components):
+                    yield f"{name}[{key}] = {expr}"
+                continue
+            for flat_index, expr in enumerate(stage.components):
+                if expr == 0:
+                    continue
+                index = []
+                for size in reversed(stage.shape):
+                    index.append(flat_index % size)
+                    flat_index //= size
+                yield f"{name}[{', '.join(str(i) for i in reversed(index))}] = {expr}"
+
+    def write(self, stream: TextIO) -> None:
+        """Write the readable form line by line"""
+        for line in self.lines():
+            stream.write(line + "\n")
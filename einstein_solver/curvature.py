@@ -0,0 +1,455 @@
+from dataclasses import dataclass, field
+from itertools import combinations_with_replacement
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+import sympy as sp
+
+@dataclass
+class CurvatureResult:
+    """Curvature tensors of a metric, using the einsteinpy index conventions
+
+    ``christoffels[i, j, k]`` is Gamma^i_{jk}, ``riemann[a, b, c, d]`` is the
+    fully lowered R_{abcd} with R^a_{bcd} = d_c Gamma^a_{bd} - d_d Gamma^a_{bc} + ...,
+    and ``ricci[b, d]`` is R^a_{bad}.
+    """
+    metric: sp.Matrix
+    inverse: sp.Matrix
+    coordinates: Tuple[sp.Symbol, ...]
+    christoffels: sp.Array
+    riemann: sp.Array
+    ricci: sp.Array
+    ricci_scalar: sp.Expr
+    einstein: sp.Array
+    blocks: List[List[int]] = field(default_factory=list)
+
+def metric_blocks(metric: sp.Matrix) -> List[List[int]]:
+    """Split coordinate indices into blocks that the metric does not couple"""
+    n = metric.rows
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            if metric[i, j] != 0 or metric[j, i] != 0:
+                parent[find(i)] = find(j)
+
+    blocks: Dict[int, List[int]] = {}
+    for i in range(n):
+        blocks.setdefault(find(i), []).append(i)
+    return sorted(blocks.values())
+
+def block_inverse(metric: sp.Matrix, blocks: Optional[List[List[int]]] = None) -> sp.Matrix:
+    """Invert a metric block by block, with a direct path for diagonal entries"""
+    n = metric.rows
+    blocks = blocks if blocks is not None else metric_blocks(metric)
+    inverse = sp.zeros(n, n)
+    for block in blocks:
+        if len(block) == 1:
+            i = block[0]
+            if metric[i, i] == 0:
+                raise ValueError("Metric is degenerate (zero diagonal entry with no coupling)")
+            inverse[i, i] = 1 / metric[i, i]
+            continue
+        sub_inverse = metric.extract(block, block).inv()
+        for a, i in enumerate(block):
+            for b, j in enumerate(block):
+                inverse[i, j] = sub_inverse[a, b]
+    return inverse
+
+class _Derivatives:
+    """Memoized metric derivatives that skip coordinates an entry does not contain"""
+    def __init__(self, metric: sp.Matrix, coords: Sequence[sp.Symbol]):
+        self.metric = metric
+        self.coords = coords
+        self.free = {
+            (i, j): metric[i, j].free_symbols if metric[i, j] != 0 else set()
+            for i in range(metric.rows) for j in range(i, metric.rows)
+        }
+        self._first: Dict[Tuple[int, int, int], sp.Expr] = {}
+        self._second: Dict[Tuple[int, int, int, int], sp.Expr] = {}
+
+    def first(self, i: int, j: int, k: int) -> sp.Expr:
+        """d_k g_ij"""
+        i, j = min(i, j), max(i, j)
+        key = (i, j, k)
+        if key not in self._first:
+            if self.coords[k] in self.free[(i, j)]:
+                self._first[key] = sp.diff(self.metric[i, j], self.coords[k])
+            else:
+                self._first[key] = sp.Integer(0)
+        return self._first[key]
+
+    def second(self, i: int, j: int, k: int, l: int) -> sp.Expr:
+        """d_k d_l g_ij"""
+        i, j = min(i, j), max(i, j)
+        k, l = min(k, l), max(k, l)
+        key = (i, j, k, l)
+        if key not in self._second:
+            first = self.first(i, j, k)
+            if first != 0 and self.coords[l] in first.free_symbols:
+                self._second[key] = sp.diff(first, self.coords[l])
+            else:
+                self._second[key] = sp.Integer(0)
+        return self._second[key]
+
+    def replace(self, metric: sp.Matrix, changed_cells: Set[Tuple[int, int]]) -> None:
+        """Swap in an edited metric, dropping derivatives of the changed cells"""
+        self.metric = metric
+        for i, j in changed_cells:
+            self.free[(i, j)] = metric[i, j].free_symbols if metric[i, j] != 0 else set()
+        self._first = {k: v for k, v in self._first.items() if k[:2] not in changed_cells}
+        self._second = {k: v for k, v in self._second.items() if k[:2] not in changed_cells}
+
+def _identity(expr: sp.Expr) -> sp.Expr:
+    return expr
+
+def _pair(i: int, j: int) -> Tuple[int, int]:
+    return (i, j) if i <= j else (j, i)
+
+# Callbacks reporting a finished stage and per-component progress
+StageCallback = Callable[[str, Any], None]
+ProgressCallback = Callable[[str, int, int], None]
+# True for sympy.simplify, False to skip, or a custom callable
+Simplifier = Union[bool, Callable[[sp.Expr], sp.Expr]]
+
+def simplifier_function(simplify: Simplifier) -> Callable[[sp.Expr], sp.Expr]:
+    """The function a ``Simplifier`` setting applies to each component"""
+    if callable(simplify):
+        return simplify
+    return sp.simplify if simplify else _identity
+
+class CurvatureKernel:
+    """Stateful curvature computation that can be updated one metric cell at a time
+
+    Only independent components are computed: Gamma^i_{jk} for j <= k,
+    R_{abcd} for a < b, c < d and (a, b) <= (c, d), and R_{bd} for b <= d.
+    Derivatives with respect to coordinates absent from an entry are skipped,
+    and the inverse metric is built block by block. With ``simplify`` the
+    Riemann, Ricci and scalar components are simplified like einsteinpy does;
+    a callable (e.g. ``simplification.BudgetedSimplifier``) replaces
+    ``sympy.simplify``.
+
+    ``update`` takes an edited metric and recomputes only the components
+    whose inputs changed, following the dependency chain
+    g_ij / g^ij -> Gamma_{ljk} -> Gamma^i_{jk} -> R_{abcd} -> R_{bd} -> R -> G_{bd}.
+
+    ``on_stage(name, value)`` is called as each stage completes and
+    ``on_progress(stage, done, total)`` after each recomputed component.
+    """
+    def __init__(self, metric: sp.Matrix, coords: Sequence[sp.Symbol], simplify: Simplifier = True,
+                 on_stage: Optional[StageCallback] = None,
+                 on_progress: Optional[ProgressCallback] = None):
+        metric = sp.Matrix(metric)
+        self.coords = tuple(coords)
+        self.n = metric.rows
+        if metric.shape != (self.n, self.n) or len(self.coords) != self.n:
+            raise ValueError("Metric must be square and match the number of coordinates")
+        self._simp = simplifier_function(simplify)
+        # Number of components recomputed per stage by the last compute/update
+        self.stats: Dict[str, int] = {}
+
+        n = self.n
+        self.metric = metric
+        self.blocks = metric_blocks(metric)
+        self.inverse = block_inverse(metric, self.blocks)
+        self._block_of = {i: tuple(block) for block in self.blocks for i in block}
+        self._derivs = _Derivatives(metric, self.coords)
+        self._first_kind: Dict[Tuple[int, int, int], sp.Expr] = {}
+        self._christoffels = sp.MutableDenseNDimArray.zeros(n, n, n)
+        self._riemann = sp.MutableDenseNDimArray.zeros(n, n, n, n)
+        self._ricci = sp.MutableDenseNDimArray.zeros(n, n)
+        self._einstein = sp.MutableDenseNDimArray.zeros(n, n)
+        self._scalar = sp.Integer(0)
+        self._on_stage = on_stage
+        self._on_progress = on_progress
+        try:
+            self._compute_all()
+        finally:
+            # Callbacks are per call and usually not picklable
+            self._on_stage = self._on_progress = None
+
+    # Independent index sets
+    def _lower_pairs(self) -> List[Tuple[int, int]]:
+        return list(combinations_with_replacement(range(self.n), 2))
+
+    def _riemann_indices(self) -> List[Tuple[int, int, int, int]]:
+        pairs = [(a, b) for a in range(self.n) for b in range(a + 1, self.n)]
+        return [(a, b, c, d) for p, (a, b) in enumerate(pairs) for c, d in pairs[p:]]
+
+    # Single component formulas
+    def _first_kind_value(self, l: int, j: int, k: int) -> sp.Expr:
+        """Gamma_{l jk} = 1/2 (g_lj,k + g_lk,j - g_jk,l)"""
+        d = self._derivs
+        return (d.first(l, j, k) + d.first(l, k, j) - d.first(j, k, l)) / 2
+
+    def _christoffel_value(self, i: int, j: int, k: int) -> sp.Expr:
+        """Gamma^i_{jk} = g^{il} Gamma_{l jk}; g^{il} vanishes outside i's block"""
+        value = sp.Integer(0)
+        for l in self._block_of[i]:
+            if self.inverse[i, l] != 0 and self._first_kind[(l, j, k)] != 0:
+                value += self.inverse[i, l] * self._first_kind[(l, j, k)]
+        return value
+
+    def _riemann_value(self, a: int, b: int, c: int, d: int) -> sp.Expr:
+        """R_{abcd} = 1/2 (g_ad,bc + g_bc,ad - g_ac,bd - g_bd,ac)
+        + Gamma^e_{bc} Gamma_{e ad} - Gamma^e_{bd} Gamma_{e ac}"""
+        derivs, chris, first_kind = self._derivs, self._christoffels, self._first_kind
+        value = (derivs.second(a, d, b, c) + derivs.second(b, c, a, d)
+                 - derivs.second(a, c, b, d) - derivs.second(b, d, a, c)) / 2
+        for e in range(self.n):
+            if chris[e, b, c] != 0 and first_kind[(e, a, d)] != 0:
+                value += chris[e, b, c] * first_kind[(e, a, d)]
+            if chris[e, b, d] != 0 and first_kind[(e, a, c)] != 0:
+                value -= chris[e, b, d] * first_kind[(e, a, c)]
+        return self._simp(value)
+
+    def _ricci_value(self, b: int, d: int) -> sp.Expr:
+        """R_{bd} = g^{ac} R_{cbad}"""
+        value = sp.Integer(0)
+        for a in range(self.n):
+            for c in self._block_of[a]:
+                if self.inverse[a, c] != 0 and self._riemann[c, b, a, d] != 0:
+                    value += self.inverse[a, c] * self._riemann[c, b, a, d]
+        return self._simp(value)
+
+    def _scalar_value(self) -> sp.Expr:
+        value = sp.Integer(0)
+        for b in range(self.n):
+            for d in self._block_of[b]:
+                if self.inverse[b, d] != 0 and self._ricci[b, d] != 0:
+                    value += self.inverse[b, d] * self._ricci[b, d]
+        return self._simp(value)
+
+    def _einstein_value(self, b: int, d: int) -> sp.Expr:
+        return self._ricci[b, d] - sp.Rational(1, 2) * self.metric[b, d] * self._scalar
+
+    # Storage with symmetric fill
+    def _store_first_kind(self, l: int, j: int, k: int, value: sp.Expr) -> None:
+        self._first_kind[(l, j, k)] = self._first_kind[(l, k, j)] = value
+
+    def _store_christoffel(self, i: int, j: int, k: int, value: sp.Expr) -> None:
+        self._christoffels[i, j, k] = self._christoffels[i, k, j] = value
+
+    def _store_riemann(self, a: int, b: int, c: int, d: int, value: sp.Expr) -> List[Tuple[int, int, int, int]]:
+        images = []
+        for w, x, sign_ab in ((a, b, 1), (b, a, -1)):
+            for y, z, sign_cd in ((c, d, 1), (d, c, -1)):
+                self._riemann[w, x, y, z] = sign_ab * sign_cd * value
+                self._riemann[y, z, w, x] = sign_ab * sign_cd * value
+                images.extend([(w, x, y, z), (y, z, w, x)])
+        return images
+
+    # Callback helpers
+    def _stage_value(self, stage: str) -> Any:
+        if stage == 'inverse':
+            return self.inverse
+        if stage == 'ricci_scalar':
+            return self._scalar
+        arrays = {
+            'christoffel_symbols': self._christoffels,
+            'riemann': self._riemann,
+            'ricci': self._ricci,
+            'einstein_tensor': self._einstein
+        }
+        return sp.ImmutableDenseNDimArray(arrays[stage])
+
+    def _emit_stage(self, stage: str) -> None:
+        if self._on_stage is not None:
+            self._on_stage(stage, self._stage_value(stage))
+
+    def _emit_progress(self, stage: str, done: int, total: int) -> None:
+        if self._on_progress is not None:
+            self._on_progress(stage, done, total)
+
+    def _compute_all(self) -> None:
+        n = self.n
+        pairs = self._lower_pairs()
+        self._emit_stage('inverse')
+        for l in range(n):
+            for j, k in pairs:
+                self._store_first_kind(l, j, k, self._first_kind_value(l, j, k))
+        total = n * len(pairs)
+        for i in range(n):
+            for p, (j, k) in enumerate(pairs):
+                self._store_christoffel(i, j, k, self._christoffel_value(i, j, k))
+                self._emit_progress('christoffel_symbols', i * len(pairs) + p + 1, total)
+        self._emit_stage('christoffel_symbols')
+        riemann_indices = self._riemann_indices()
+        for done, index in enumerate(riemann_indices, 1):
+            self._store_riemann(*index, self._riemann_value(*index))
+            self._emit_progress('riemann', done, len(riemann_indices))
+        self._emit_stage('riemann')
+        for done, (b, d) in enumerate(pairs, 1):
+            self._ricci[b, d] = self._ricci[d, b] = self._ricci_value(b, d)
+            self._emit_progress('ricci', done, len(pairs))
+        self._emit_stage('ricci')
+        self._scalar = self._scalar_value()
+        self._emit_stage('ricci_scalar')
+        for b, d in pairs:
+            self._einstein[b, d] = self._einstein[d, b] = self._einstein_value(b, d)
+        self._emit_stage('einstein_tensor')
+
+        pairs = len(self._lower_pairs())
+        self.stats = {
+            'inverse': n * n,
+            'christoffel_symbols': n * pairs,
+            'riemann': len(riemann_indices),
+            'ricci': pairs,
+            'ricci_scalar': 1,
+            'einstein_tensor': pairs
+        }
+
+    def update(self, metric: sp.Matrix, on_stage: Optional[StageCallback] = None,
+               on_progress: Optional[ProgressCallback] = None) -> Dict[str, int]:
+        """Replace the metric and recompute only the components that depend on edited cells
+
+        Returns the number of components recomputed per stage.
+        """
+        self._on_stage = on_stage
+        self._on_progress = on_progress
+        try:
+            return self._update(sp.Matrix(metric))
+        finally:
+            self._on_stage = self._on_progress = None
+
+    def _update(self, metric: sp.Matrix) -> Dict[str, int]:
+        n = self.n
+        if metric.shape != (n, n):
+            raise ValueError("Updated metric must keep the same dimension")
+        changed_cells = {
+            (i, j) for i, j in self._lower_pairs()
+            if metric[i, j] != self.metric[i, j] or metric[j, i] != self.metric[j, i]
+        }
+        self.stats = {stage: 0 for stage in
+                      ('inverse', 'christoffel_symbols', 'riemann', 'ricci',
+                       'ricci_scalar', 'einstein_tensor')}
+        if not changed_cells:
+            for stage in ('inverse', 'christoffel_symbols', 'riemann', 'ricci',
+                          'ricci_scalar', 'einstein_tensor'):
+                self._emit_stage(stage)
+            return self.stats
+
+        # Inverse metric: only blocks touching an edited cell can change
+        touched = {i for cell in changed_cells for i in cell}
+        old_inverse = self.inverse
+        self.metric = metric
+        self.blocks = metric_blocks(metric)
+        self._block_of = {i: tuple(block) for block in self.blocks for i in block}
+        affected_blocks = [block for block in self.blocks if touched.intersection(block)]
+        inverse = old_inverse.copy()
+        for i in touched.union(*affected_blocks):
+            for j in range(n):
+                inverse[i, j] = inverse[j, i] = 0
+        partial = block_inverse(metric, affected_blocks)
+        for block in affected_blocks:
+            for i in block:
+                for j in block:
+                    inverse[i, j] = partial[i, j]
+        self.inverse = inverse
+        changed_inverse = {
+            (i, j) for i, j in self._lower_pairs() if inverse[i, j] != old_inverse[i, j]
+        }
+        inverse_rows = {i for cell in changed_inverse for i in cell}
+        self.stats['inverse'] = sum(len(block) ** 2 for block in affected_blocks)
+        self._emit_stage('inverse')
+
+        self._derivs.replace(metric, changed_cells)
+
+        # Gamma_{l jk} depends on g_lj, g_lk and g_jk
+        changed_first_kind = set()
+        for l in range(n):
+            for j, k in self._lower_pairs():
+                if {_pair(l, j), _pair(l, k), (j, k)} & changed_cells:
+                    value = self._first_kind_value(l, j, k)
+                    if value != self._first_kind[(l, j, k)]:
+                        changed_first_kind.add((l, j, k))
+                    self._store_first_kind(l, j, k, value)
+        first_kind_pairs = {(j, k) for _, j, k in changed_first_kind}
+
+        # Gamma^i_{jk} depends on row i of the inverse and on Gamma_{l jk}
+        changed_christoffels = set()
+        recomputed = 0
+        for i in range(n):
+            for j, k in self._lower_pairs():
+                if i in inverse_rows or any(
+                    (l, j, k) in changed_first_kind for l in self._block_of[i]
+                ):
+                    recomputed += 1
+                    value = self._christoffel_value(i, j, k)
+                    if value != self._christoffels[i, j, k]:
+                        changed_christoffels.add((j, k))
+                    self._store_christoffel(i, j, k, value)
+                    self._emit_progress('christoffel_symbols', recomputed, n * len(self._lower_pairs()))
+        self.stats['christoffel_symbols'] = recomputed
+        self._emit_stage('christoffel_symbols')
+
+        # R_{abcd} depends on second derivatives of four cells and on the
+        # Christoffels carrying the (b, c), (b, d), (a, d) and (a, c) pairs
+        changed_riemann = set()
+        recomputed = 0
+        riemann_indices = self._riemann_indices()
+        for a, b, c, d in riemann_indices:
+            if ({_pair(a, d), _pair(b, c), _pair(a, c), _pair(b, d)} & changed_cells
+                    or {_pair(b, c), _pair(b, d)} & changed_christoffels
+                    or {_pair(a, d), _pair(a, c)} & first_kind_pairs):
+                recomputed += 1
+                value = self._riemann_value(a, b, c, d)
+                if value != self._riemann[a, b, c, d]:
+                    changed_riemann.update(self._store_riemann(a, b, c, d, value))
+                else:
+                    self._store_riemann(a, b, c, d, value)
+                self._emit_progress('riemann', recomputed, len(riemann_indices))
+        self.stats['riemann'] = recomputed
+        self._emit_stage('riemann')
+
+        # R_{bd} = g^{ac} R_{cbad}
+        ricci_pairs = {_pair(b, d) for _, b, _, d in changed_riemann}
+        if changed_inverse:
+            ricci_pairs = set(self._lower_pairs())
+        changed_ricci = set()
+        for done, (b, d) in enumerate(sorted(ricci_pairs), 1):
+            value = self._ricci_value(b, d)
+            if value != self._ricci[b, d]:
+                changed_ricci.add((b, d))
+            self._ricci[b, d] = self._ricci[d, b] = value
+            self._emit_progress('ricci', done, len(ricci_pairs))
+        self.stats['ricci'] = len(ricci_pairs)
+        self._emit_stage('ricci')
+
+        scalar_changed = False
+        if changed_ricci or changed_inverse:
+            value = self._scalar_value()
+            scalar_changed = value != self._scalar
+            self._scalar = value
+            self.stats['ricci_scalar'] = 1
+        self._emit_stage('ricci_scalar')
+
+        einstein_pairs = set(self._lower_pairs()) if scalar_changed else changed_ricci | changed_cells
+        for b, d in einstein_pairs:
+            self._einstein[b, d] = self._einstein[d, b] = self._einstein_value(b, d)
+        self.stats['einstein_tensor'] = len(einstein_pairs)
+        self._emit_stage('einstein_tensor')
+        return self.stats
+
+    def result(self) -> CurvatureResult:
+        """Snapshot of the current tensors"""
+        return CurvatureResult(
+            metric=self.metric,
+            inverse=self.inverse,
+            coordinates=self.coords,
+            christoffels=sp.ImmutableDenseNDimArray(self._christoffels),
+            riemann=sp.ImmutableDenseNDimArray(self._riemann),
+            ricci=sp.ImmutableDenseNDimArray(self._ricci),
+            ricci_scalar=self._scalar,
+            einstein=sp.ImmutableDenseNDimArray(self._einstein),
+            blocks=[list(block) for block in self.blocks]
+        )
+
+def compute_curvature(metric: sp.Matrix, coords: Sequence[sp.Symbol],
+                      simplify: Simplifier = True) -> CurvatureResult:
+    """Compute Christoffels, Riemann, Ricci and Einstein using index symmetries"""
+    return CurvatureKernel(metric, coords, simplify=simplify).result()
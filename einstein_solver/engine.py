@@ -0,0 +1,278 @@
+from typing import Dict, Any, List, Optional, Tuple
+import sympy as sp
+from einsteinpy.symbolic import (
+    MetricTensor, ChristoffelSymbols, RicciTensor, RicciScalar, EinsteinTensor,
+    RiemannCurvatureTensor
+)
+
+from .cache import ResultCache, metric_key
+from .compression import CompressedResults
+from .curvature import (
+    CurvatureKernel, CurvatureResult, ProgressCallback, Simplifier, StageCallback,
+    compute_curvature
+)
+from .instrumentation import StageTimer, correlation
+from .invariants import Invariants
+from .parsing import parse_component
+from .simplification import BudgetedSimplifier, simplify_results
+from .utils import MetricData
+
+# Stages produced by a solve, in the order they become available
+STAGES = ('metric', 'christoffel_symbols', 'einstein_tensor', 'ricci_scalar', 'invariants')
+
+BACKENDS = ('native', 'einsteinpy')
+
+def coordinate_symbols(coordinates: List[str]) -> Tuple[sp.Symbol, ...]:
+    """Convert LaTeX coordinate names to the symbols latex2sympy uses in components"""
+    symbols = []
+    for name in coordinates:
+        try:
+            symbol = parse_component(name)
+        except Exception:
+            symbol = None
+        if not isinstance(symbol, sp.Symbol):
+            symbol = sp.Symbol(name.strip())
+        symbols.append(symbol)
+    return tuple(symbols)
+
+def _invariant_simplifier(simplify: Simplifier) -> Simplifier:
+    # Invariants are long sums of products; an unbounded simplify on Kerr runs for minutes
+    return BudgetedSimplifier() if simplify is True else simplify
+
+def _einsteinpy_stages(metric_matrix: sp.Matrix, coord_symbols: Tuple[sp.Symbol, ...],
+                       results: Dict[str, Any], simplify: Simplifier = True) -> Dict[str, Any]:
+    """Compute missing stages with einsteinpy, reusing cached Christoffels"""
+    computed = {}
+    # einsteinpy accepts nested lists or sympy Arrays, not Matrix objects
+    metric_tensor = MetricTensor(metric_matrix.tolist(), coord_symbols)
+    if 'christoffel_symbols' in results:
+        christoffels = ChristoffelSymbols(
+            results['christoffel_symbols'], coord_symbols,
+            config="ull", parent_metric=metric_tensor
+        )
+    else:
+        christoffels = ChristoffelSymbols.from_metric(metric_tensor)
+        computed['christoffel_symbols'] = christoffels.tensor()
+
+    if 'einstein_tensor' not in results or 'ricci_scalar' not in results:
+        # Build the chain once instead of letting each tensor recompute its parents
+        ricci_tensor = RicciTensor.from_christoffels(christoffels, metric_tensor)
+        ricci_scalar = RicciScalar.from_riccitensor(ricci_tensor, metric_tensor)
+        einstein_tensor = EinsteinTensor(
+            ricci_tensor.tensor() - sp.Rational(1, 2) * metric_tensor.tensor() * ricci_scalar.expr,
+            coord_symbols,
+            config="ll",
+            parent_metric=metric_tensor
+        )
+        computed['einstein_tensor'] = einstein_tensor.tensor()
+        computed['ricci_scalar'] = ricci_scalar.expr
+
+    if 'invariants' not in results:
+        riemann = RiemannCurvatureTensor.from_christoffels(christoffels, metric_tensor)
+        ricci_tensor = RicciTensor.from_riemann(riemann, metric_tensor)
+        invariants = Invariants(
+            metric_matrix, metric_tensor.inv().tensor().tomatrix(),
+            riemann.change_config('llll', metric_tensor).tensor(), ricci_tensor.tensor(),
+            RicciScalar.from_riccitensor(ricci_tensor, metric_tensor).expr,
+            _invariant_simplifier(simplify)
+        )
+        computed['invariants'] = invariants.as_dict()
+    return computed
+
+def _prepare(metric_data: MetricData) -> Tuple[sp.Matrix, Tuple[sp.Symbol, ...]]:
+    if len(metric_data.coordinates) != metric_data.dimension:
+        raise ValueError(
+            f"Number of coordinates must match dimensions ({metric_data.dimension})"
+        )
+    return metric_data.to_matrix(), coordinate_symbols(metric_data.coordinates)
+
+def _simplify_setting(simplify: Simplifier) -> Optional[str]:
+    """Stable description of a simplifier for cache keys, or None if it has none"""
+    if isinstance(simplify, bool):
+        return str(simplify)
+    if isinstance(simplify, BudgetedSimplifier):
+        return f"budget={simplify.budget},strategies={','.join(simplify.strategies)}"
+    name = f"{getattr(simplify, '__module__', '')}.{getattr(simplify, '__qualname__', '')}"
+    # Lambdas and closures share names while behaving differently
+    return None if '<' in name or name == '.' else name
+
+def _cache_key(cache: Optional[ResultCache], metric_matrix: sp.Matrix,
+               coord_symbols: Tuple[sp.Symbol, ...], backend: str, simplify: Simplifier,
+               simplify_budget: Optional[float] = None) -> Optional[str]:
+    """Key for results solved with these settings; None skips the cache"""
+    if cache is None:
+        return None
+    setting = _simplify_setting(simplify)
+    if setting is None:
+        return None
+    return metric_key(metric_matrix, coord_symbols, {
+        'backend': backend, 'simplify': setting, 'simplify_budget': simplify_budget
+    })
+
+def _load_cached(cache: Optional[ResultCache], key: Optional[str]) -> Dict[str, Any]:
+    cached = {}
+    if cache is not None and key is not None:
+        for stage in STAGES[1:]:
+            value = cache.get(key, stage)
+            if value is not None:
+                cached[stage] = value
+    return cached
+
+def _curvature_stages(curvature: CurvatureResult, results: Dict[str, Any],
+                      simplify: Simplifier = True) -> Dict[str, Any]:
+    """Stages of a kernel result that are not already in ``results``"""
+    stages = {
+        'christoffel_symbols': lambda: curvature.christoffels,
+        'einstein_tensor': lambda: curvature.einstein,
+        'ricci_scalar': lambda: curvature.ricci_scalar,
+        'invariants': lambda: Invariants.from_curvature(
+            curvature, _invariant_simplifier(simplify)
+        ).as_dict()
+    }
+    return {stage: value() for stage, value in stages.items() if stage not in results}
+
+def _store(cache: Optional[ResultCache], key: Optional[str], computed: Dict[str, Any]) -> None:
+    if cache is not None and key is not None:
+        for stage, value in computed.items():
+            cache.put(key, stage, value)
+
+def _simplify_stages(computed: Dict[str, Any], budget: float,
+                     max_workers: Optional[int]) -> Dict[str, Any]:
+    # Invariants were already simplified within the budget as they were built
+    stages = [stage for stage in computed if stage != 'invariants']
+    return simplify_results(computed, budget, max_workers=max_workers, stages=stages)[0]
+
+def solve_metric(metric_data: MetricData, cache: Optional[ResultCache] = None,
+                 backend: str = 'native', simplify: Simplifier = True,
+                 simplify_budget: Optional[float] = None,
+                 simplify_workers: Optional[int] = None) -> Dict[str, Any]:
+    """Compute Christoffel symbols, Einstein tensor, Ricci scalar and invariants for a metric
+
+    ``backend`` selects the symmetry-aware kernel in ``curvature`` ('native')
+    or the einsteinpy classes ('einsteinpy'). When a cache is given, each
+    stage is looked up by the canonical metric key first and only the
+    missing stages are computed and stored.
+
+    With ``simplify_budget`` the curvature is computed unsimplified and the
+    distinct components of the finished stages are then simplified once
+    each, within that many seconds, across ``simplify_workers`` processes
+    (see ``simplification.simplify_results``); ``simplify`` is ignored.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    with correlation():
+        timer = StageTimer()
+        metric_matrix, coord_symbols = _prepare(metric_data)
+        timer.mark('parse')
+        key = _cache_key(cache, metric_matrix, coord_symbols, backend,
+                         False if simplify_budget else simplify, simplify_budget or None)
+        results = {'metric': metric_matrix}
+        results.update(_load_cached(cache, key))
+        timer.mark('cache_lookup')
+        if all(stage in results for stage in STAGES):
+            return results
+
+        if simplify_budget:
+            simplify = False
+            invariant_simplify: Simplifier = BudgetedSimplifier(simplify_budget)
+        else:
+            invariant_simplify = simplify
+        if backend == 'native':
+            curvature = compute_curvature(metric_matrix, coord_symbols, simplify=simplify)
+            timer.mark('curvature')
+            computed = _curvature_stages(curvature, results, invariant_simplify)
+        else:
+            computed = _einsteinpy_stages(metric_matrix, coord_symbols, results,
+                                          invariant_simplify)
+        timer.mark('invariants' if backend == 'native' else 'einsteinpy')
+        if simplify_budget:
+            computed = _simplify_stages(computed, simplify_budget, simplify_workers)
+            timer.mark('simplification')
+        results.update(computed)
+        _store(cache, key, computed)
+        timer.mark('cache_store')
+
+    return {stage: results[stage] for stage in STAGES}
+
+class IncrementalSolver:
+    """Re-solves edited metrics by updating the previous solve instead of starting over
+
+    Keeps the native ``CurvatureKernel`` from the last solve; when the next
+    metric uses the same coordinates only components depending on edited
+    cells are recomputed. ``last_stats`` holds the per-stage recompute counts
+    and ``last_timings`` the seconds spent in each stage.
+    """
+    def __init__(self, cache: Optional[ResultCache] = None, simplify: Simplifier = True):
+        self.cache = cache
+        self.simplify = simplify
+        self.kernel: Optional[CurvatureKernel] = None
+        self.last_stats: Dict[str, int] = {}
+        self.last_timings: Dict[str, float] = {}
+
+    def reset(self) -> None:
+        """Forget the previous solve"""
+        self.kernel = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The cache holds a database connection; other processes open their own
+        state = self.__dict__.copy()
+        state['cache'] = None
+        return state
+
+    def solve(self, metric_data: MetricData, on_stage: Optional[StageCallback] = None,
+              on_progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Solve a metric, reusing the previous solve where possible
+
+        ``on_stage`` and ``on_progress`` receive stages and per-component
+        progress as they complete (see ``CurvatureKernel``).
+        """
+        timer = StageTimer(on_stage)
+        self.last_timings = timer.timings
+        with correlation():
+            return self._solve(metric_data, timer, on_progress)
+
+    def _solve(self, metric_data: MetricData, timer: StageTimer,
+               on_progress: Optional[ProgressCallback]) -> Dict[str, Any]:
+        metric_matrix, coord_symbols = _prepare(metric_data)
+        timer.mark('parse')
+        timer.emit('metric', metric_matrix)
+        key = _cache_key(self.cache, metric_matrix, coord_symbols, 'native', self.simplify)
+        results = {'metric': metric_matrix}
+        results.update(_load_cached(self.cache, key))
+        timer.mark('cache_lookup')
+        if all(stage in results for stage in STAGES):
+            self.last_stats = {}
+            for stage in STAGES[1:]:
+                timer.emit(stage, results[stage])
+            return results
+
+        if self.kernel is not None and self.kernel.coords == coord_symbols:
+            self.kernel.update(metric_matrix, on_stage=timer, on_progress=on_progress)
+        else:
+            self.kernel = CurvatureKernel(
+                metric_matrix, coord_symbols, simplify=self.simplify,
+                on_stage=timer, on_progress=on_progress
+            )
+        self.last_stats = dict(self.kernel.stats)
+
+        computed = _curvature_stages(self.kernel.result(), results, self.simplify)
+        if 'invariants' in computed:
+            timer('invariants', computed['invariants'])
+        results.update(computed)
+        _store(self.cache, key, computed)
+        timer.mark('cache_store')
+        return {stage: results[stage] for stage in STAGES}
+
+def serialize_results(results: Dict[str, Any], compact: bool = False) -> Dict[str, Any]:
+    """Convert solve results to plain strings for JSON output
+
+    With ``compact`` the curvature stages share one list of common
+    subexpressions instead of repeating them in every component.
+    """
+    if not compact:
+        return {name: str(results[name]) for name in STAGES if name in results}
+    serialized = {'metric': str(results['metric'])}
+    serialized.update(CompressedResults.from_results(
+        {name: results[name] for name in STAGES[1:] if name in results}
+    ).to_strings())
+    return serialized
@@ -1,16 +1,45 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QLabel, QLineEdit, QTextEdit, QPushButton, QSpinBox, 
-    QMessageBox, QScrollArea
+    QMessageBox, QScrollArea, QProgressBar, QSplitter, QFileDialog, QTabWidget
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPalette, QColor
-import sympy as sp
-from einsteinpy.symbolic import MetricTensor, EinsteinTensor
-from latex2sympy2 import latex2sympy
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QPalette, QColor, QTextCursor
+import importlib
+import threading
+import time
 
-from .analyzer import LLMAnalyzer
-from .utils import MetricData, APIConfig
+from .cache import DEFAULT_CACHE_PATH, DEFAULT_RESPONSE_CACHE_PATH, ResponseCache
+from .results_view import ResultsView, write_results
+from .timings_view import SolveTiming, TimingsPanel
+from .utils import MetricData, APIConfig, debug_mode
+from .worker import SolverWorker
+
+# Section titles for streamed solver stages, in display order
+STAGE_TITLES = {
+    'metric': "Metric Tensor",
+    'inverse': "Inverse Metric",
+    'christoffel_symbols': "Christoffel Symbols",
+    'ricci': "Ricci Tensor",
+    'ricci_scalar': "Ricci Scalar",
+    'einstein_tensor': "Einstein Tensor",
+    'invariants': "Curvature Invariants"
+}
+
+# Modules that pull in sympy, einsteinpy, latex2sympy, numpy and aiohttp. The
+# window is built without them; they are imported in the background once it
+# is showing, or on first use if that has not finished yet.
+PREFETCH_MODULES = (
+    'einstein_solver.parsing',
+    'einstein_solver.engine',
+    'einstein_solver.compression',
+    'einstein_solver.analyzer'
+)
+
+def prefetch_math_stack() -> None:
+    """Import the math modules so the first solve does not wait for them"""
+    for name in PREFETCH_MODULES:
+        importlib.import_module(name)
 
 class TensorInputWidget(QWidget):
     def __init__(self, dim: int, coords: list, tensor_name: str = "g"):
@@ -55,7 +84,23 @@ class EinsteinSolverWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.api_config = APIConfig()
+        self.cache_path = DEFAULT_CACHE_PATH
+        # Created by the solver process on the first solve, then reused
+        self.solver = None
+        self.solver_worker = None
+        self.solve_started = 0.0
+        # Profile every solve to logs/profiles/ when debug_mode is set
+        self.profile_solves = debug_mode()
+        self.analysis_service = None
+        self.analysis_future = None
+        # Last text block of each analysis being streamed into the results pane
+        self.analysis_blocks = {}
         self.setup_ui()
+        # Runs once the event loop has started, i.e. after the window is shown
+        QTimer.singleShot(0, self.start_prefetch)
+    
+    def start_prefetch(self):
+        threading.Thread(target=prefetch_math_stack, name="prefetch", daemon=True).start()
     
     def setup_ui(self):
         self.setWindowTitle('Einstein Field Equations Solver')
@@ -70,7 +115,7 @@ class EinsteinSolverWindow(QMainWindow):
         dim_layout = QHBoxLayout()
         dim_label = QLabel("Dimensions:")
         self.dim_input = QSpinBox()
-        self.dim_input.setRange(2, 4)
+        self.dim_input.setRange(2, 11)
         self.dim_input.setValue(4)
         dim_layout.addWidget(dim_label)
         dim_layout.addWidget(self.dim_input)
@@ -101,7 +146,8 @@ class EinsteinSolverWindow(QMainWindow):
         scroll.setWidget(self.tensor_widget)
         layout.addWidget(scroll)
         
-        # Add results area
+        # Add results area: solved components above, messages and LLM analyses below
+        self.results_view = ResultsView()
         self.results = QTextEdit()
         self.results.setReadOnly(True)
         self.results.setStyleSheet("""
@@ -114,12 +160,40 @@ class EinsteinSolverWindow(QMainWindow):
                 font-family: monospace;
             }
         """)
-        layout.addWidget(self.results)
+        self.timings_panel = TimingsPanel()
+        messages = QTabWidget()
+        messages.addTab(self.results, "Messages")
+        messages.addTab(self.timings_panel, "Solve Timings")
+        results_splitter = QSplitter(Qt.Orientation.Vertical)
+        results_splitter.addWidget(self.results_view)
+        results_splitter.addWidget(messages)
+        results_splitter.setSizes([400, 150])
+        layout.addWidget(results_splitter)
+        
+        # Add solver progress
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
         
         # Add solve button
         self.solve_button = QPushButton("Solve Einstein Field Equations")
         self.solve_button.clicked.connect(self.solve_equations)
         layout.addWidget(self.solve_button)
+        
+        # Add LLM analysis button
+        self.analyze_button = QPushButton("Analyze Metric with LLM")
+        self.analyze_button.clicked.connect(self.analyze_metric)
+        layout.addWidget(self.analyze_button)
+        
+        # Add results export and import
+        files_layout = QHBoxLayout()
+        self.export_button = QPushButton("Export Results...")
+        self.export_button.clicked.connect(self.export_results)
+        self.open_button = QPushButton("Open Results...")
+        self.open_button.clicked.connect(self.open_results)
+        files_layout.addWidget(self.export_button)
+        files_layout.addWidget(self.open_button)
+        layout.addLayout(files_layout)
     
     def apply_theme(self):
         self.setStyleSheet("""
@@ -166,76 +240,224 @@ class EinsteinSolverWindow(QMainWindow):
             self.tensor_layout.addWidget(metric_label)
             self.metric_input = TensorInputWidget(dim, coords)
             self.tensor_layout.addWidget(self.metric_input)
+            if self.solver is not None:
+                self.solver.reset()
             
         except Exception as e:
             QMessageBox.warning(self, "Error", str(e))
     
     def solve_equations(self):
+        if self.solver_worker is not None and self.solver_worker.isRunning():
+            self.cancel_solve()
+            return
+        
         try:
-            dim = self.dim_input.value()
-            coords = [c.strip() for c in self.coords_input.text().split(',')]
-            
-            # Create 2D list of metric components
-            metric_components = []
-            for i in range(dim):
-                row = []
-                for j in range(dim):
-                    text = self.metric_input.inputs[i][j].toPlainText().strip()
-                    if not text:
-                        text = "0"
-                    row.append(text)
-                metric_components.append(row)
-            
-            metric_data = MetricData(
-                components=metric_components,
-                dimension=dim,
-                coordinates=coords
-            )
-            
-            # Convert to sympy Matrix
-            metric = []
-            for i in range(dim):
-                row = []
-                for j in range(dim):
-                    try:
-                        if metric_components[i][j] == "0":
-                            row.append(sp.Integer(0))
-                        else:
-                            expr = latex2sympy(metric_components[i][j])
-                            row.append(expr)
-                    except:
-                        row.append(sp.Integer(0))
-                metric.append(row)
+            metric_data = self.current_metric_data()
             
-            metric_matrix = sp.Matrix(metric)
+            self.results.clear()
+            self.results_view.model.clear()
             
-            # Create coordinate symbols
-            coord_symbols = sp.symbols(' '.join(coords))
+            # Run the solve in a worker process, streaming stages as they finish
+            self.solver_worker = SolverWorker(metric_data, self.solver, self.cache_path,
+                                              self.profile_solves)
+            self.solver_worker.stage_ready.connect(self.display_stage)
+            self.solver_worker.progress.connect(self.update_progress)
+            self.solver_worker.finished.connect(self.on_solve_finished)
+            self.solver_worker.error.connect(self.on_solve_error)
+            self.solve_started = time.perf_counter()
+            self.solver_worker.start()
             
-            # Create metric tensor
-            metric_tensor = MetricTensor(metric_matrix, coord_symbols)
-            einstein_tensor = EinsteinTensor.from_metric(metric_tensor)
-            
-            results = {
-                'metric': metric_matrix,
-                'einstein_tensor': einstein_tensor.tensor(),
-                'ricci_scalar': einstein_tensor.ricci_scalar(),
-                'christoffel_symbols': metric_tensor.christoffels()
-            }
-            
-            self.display_results(results)
+            self.solve_button.setText("Cancel")
+            self.progress_bar.setValue(0)
+            self.progress_bar.setVisible(True)
                 
         except Exception as e:
             QMessageBox.warning(self, "Error", str(e))
     
+    def current_metric_data(self) -> MetricData:
+        """Read the metric currently entered in the tensor inputs"""
+        dim = self.dim_input.value()
+        coords = [c.strip() for c in self.coords_input.text().split(',')]
+        
+        # Create 2D list of metric components
+        metric_components = []
+        for i in range(dim):
+            row = []
+            for j in range(dim):
+                text = self.metric_input.inputs[i][j].toPlainText().strip()
+                if not text:
+                    text = "0"
+                row.append(text)
+            metric_components.append(row)
+        
+        return MetricData(
+            components=metric_components,
+            dimension=dim,
+            coordinates=coords
+        )
+    
+    def analyze_metric(self):
+        if self.analysis_future is not None and not self.analysis_future.done():
+            self.analysis_future.cancel()
+            self.results.append("\nLLM analysis cancelled.")
+            self.on_analysis_finished({})
+            return
+        
+        from .analyzer import ANALYSIS_TYPES, AnalysisService
+
+        try:
+            metric_data = self.current_metric_data()
+            if self.analysis_service is None:
+                self.analysis_service = AnalysisService(
+                    self.api_config,
+                    ResponseCache(DEFAULT_RESPONSE_CACHE_PATH, ttl=self.api_config.cache_ttl)
+                )
+                self.analysis_service.partial_text.connect(self.display_partial_analysis)
+                self.analysis_service.result_ready.connect(self.display_analysis)
+                self.analysis_service.error.connect(self.on_analysis_error)
+                self.analysis_service.all_finished.connect(self.on_analysis_finished)
+            
+            self.results.append("\n=== LLM Analysis ===")
+            self.analysis_blocks = {}
+            self.analysis_future = self.analysis_service.analyze(metric_data, ANALYSIS_TYPES)
+            self.analyze_button.setText("Cancel Analysis")
+        except Exception as e:
+            QMessageBox.warning(self, "Error", str(e))
+    
+    def display_partial_analysis(self, analysis_type: str, chunk: str):
+        block = self.analysis_blocks.get(analysis_type)
+        if block is None:
+            self.results.append(f"\n{analysis_type.title()}:")
+            self.results.append("")
+            block = self.results.document().lastBlock()
+        # Append at the end of this analysis' last block so concurrent streams stay apart
+        cursor = QTextCursor(block)
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+        cursor.insertText(chunk)
+        self.analysis_blocks[analysis_type] = cursor.block()
+    
+    def display_analysis(self, analysis_type: str, text: str):
+        if analysis_type in self.analysis_blocks:
+            return
+        self.results.append(f"\n{analysis_type.title()}:")
+        self.results.append(text)
+    
+    def on_analysis_error(self, analysis_type: str, message: str):
+        self.results.append(f"\n{analysis_type.title()} failed: {message}")
+    
+    def on_analysis_finished(self, results: dict):
+        self.analyze_button.setText("Analyze Metric with LLM")
+    
+    def closeEvent(self, event):
+        if self.solver_worker is not None and self.solver_worker.isRunning():
+            self.solver_worker.stop()
+            self.solver_worker.wait()
+        if self.analysis_service is not None:
+            self.analysis_service.close()
+        super().closeEvent(event)
+    
+    def cancel_solve(self):
+        """Stop the running solve and kill its process"""
+        self.solver_worker.stop()
+        self.solver_worker.wait()
+        self.results.append("\nCalculation cancelled.")
+        self.record_timing('cancelled')
+        self.reset_solve_controls()
+    
+    def reset_solve_controls(self):
+        self.solve_button.setText("Solve Einstein Field Equations")
+        self.progress_bar.setVisible(False)
+    
+    def record_timing(self, status: str, stages: dict = None):
+        self.timings_panel.add_solve(SolveTiming(
+            self.solver_worker.solve_id, status,
+            time.perf_counter() - self.solve_started, dict(stages or {})
+        ))
+    
+    def update_progress(self, stage: str, done: int, total: int):
+        title = STAGE_TITLES.get(stage, stage.replace('_', ' ').title())
+        self.progress_bar.setFormat(f"{title}: %v/%m")
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(done)
+    
+    def on_solve_finished(self, results: dict):
+        # Keep the updated solver state so the next edit is incremental
+        self.solver = self.solver_worker.solver
+        self.record_timing('ok', self.solver.last_timings)
+        self.reset_solve_controls()
+    
+    def on_solve_error(self, message: str):
+        self.record_timing('error')
+        self.reset_solve_controls()
+        QMessageBox.warning(self, "Error", message)
+    
+    def display_stage(self, stage: str, value):
+        if stage not in STAGE_TITLES:
+            return
+        self.results_view.model.set_stage(stage, STAGE_TITLES[stage], value)
+    
     def display_results(self, results: dict):
-        self.results.clear()
-        self.results.append("=== Calculation Results ===\n")
-        self.results.append("Metric Tensor:")
-        self.results.append(str(results['metric']))
-        self.results.append("\nEinstein Tensor:")
-        self.results.append(str(results['einstein_tensor']))
-        self.results.append("\nRicci Scalar:")
-        self.results.append(str(results['ricci_scalar']))
-        self.results.append("\nChristoffel Symbols:")
-        self.results.append(str(results['christoffel_symbols']))
\ No newline at end of file
+        self.results_view.model.clear()
+        for stage in STAGE_TITLES:
+            if stage in results:
+                self.display_stage(stage, results[stage])
+    
+    def export_results(self):
+        stages = self.results_view.model.stages()
+        if not stages:
+            QMessageBox.information(self, "Export", "There are no results to export yet.")
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Results", "results.efr",
+            "Results files (*.efr);;Text files (*.txt);;All files (*)"
+        )
+        if not path:
+            return
+        # Imported here because the results file format needs sympy
+        from .result_file import SUFFIX, save_results
+
+        try:
+            if not path.endswith(SUFFIX):
+                with open(path, 'w') as stream:
+                    count = write_results(stages, stream)
+                self.results.append(f"\nExported {count} components to {path}")
+                return
+            try:
+                metric_data = self.current_metric_data()
+            except Exception:
+                metric_data = None
+            size = save_results(path, dict(stages), metric_data)
+            self.results.append(f"\nSaved results to {path} ({size / 1024:.1f} KiB)")
+        except Exception as e:
+            QMessageBox.warning(self, "Error", str(e))
+    
+    def open_results(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Results", "",
+                                              "Results files (*.efr);;All files (*)")
+        if path:
+            self.load_results_file(path)
+    
+    def load_results_file(self, path: str):
+        """Show a saved results file and restore the metric it was solved from"""
+        from .result_file import load_results
+
+        try:
+            saved = load_results(path)
+            if saved.metric_data is not None:
+                self.show_metric(saved.metric_data)
+            self.results_view.model.clear()
+            for stage in STAGE_TITLES:
+                if stage in saved.stages:
+                    self.display_stage(stage, saved.stage(stage))
+            self.results.append(f"\nLoaded results from {path}")
+        except Exception as e:
+            QMessageBox.warning(self, "Error", str(e))
+    
+    def show_metric(self, metric_data: MetricData):
+        """Fill the inputs with a metric"""
+        self.dim_input.setValue(metric_data.dimension)
+        self.coords_input.setText(", ".join(metric_data.coordinates))
+        self.initialize_tensors()
+        for i, row in enumerate(metric_data.components):
+            for j, text in enumerate(row):
+                self.metric_input.inputs[i][j].setPlainText(text)
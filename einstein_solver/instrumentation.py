@@ -0,0 +1,159 @@
+import cProfile
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+DEFAULT_LOG_DIR = Path('logs')
+TIMINGS_FILE = 'timings.jsonl'
+PROFILE_DIR = 'profiles'
+
+# Timing records go to this logger only, one JSON object per line
+logger = logging.getLogger('einstein_solver.timings')
+logger.propagate = False
+
+# Set by configure(); None while timing records are not written anywhere
+_log_dir: Optional[Path] = None
+
+# Correlation ID shared by every record emitted while a solve or analysis runs
+_correlation_id: ContextVar[Optional[str]] = ContextVar('correlation_id', default=None)
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats timing records as single-line JSON objects"""
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': round(record.created, 6),
+            'event': record.getMessage(),
+            'correlation_id': getattr(record, 'correlation_id', None)
+        }
+        data.update(getattr(record, 'fields', {}))
+        return json.dumps(data, default=str)
+
+def configure(log_dir: Path = DEFAULT_LOG_DIR) -> Path:
+    """Write timing records to ``log_dir/timings.jsonl``; returns that path
+
+    Calling it again with the same directory does nothing, so solver
+    processes can call it unconditionally.
+    """
+    global _log_dir
+    log_dir = Path(log_dir)
+    path = log_dir / TIMINGS_FILE
+    if _log_dir == log_dir:
+        return path
+    log_dir.mkdir(parents=True, exist_ok=True)
+    handler = logging.FileHandler(path)
+    handler.setFormatter(JsonLinesFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    _log_dir = log_dir
+    return path
+
+def log_dir() -> Optional[Path]:
+    """Directory timing records are written to, or None if recording is off"""
+    return _log_dir
+
+def enabled() -> bool:
+    return logger.isEnabledFor(logging.INFO)
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+def correlation_id() -> Optional[str]:
+    """ID of the solve or analysis currently running in this context"""
+    return _correlation_id.get()
+
+def record(event: str, **fields: Any) -> None:
+    """Emit one timing record, tagged with the current correlation ID"""
+    if enabled():
+        logger.info(event, extra={'fields': fields, 'correlation_id': _correlation_id.get()})
+
+@contextmanager
+def span(event: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """Record how long a block took; fields added to the yielded dict are logged too"""
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        record(event, seconds=round(time.perf_counter() - start, 6), **fields)
+
+@contextmanager
+def correlation(correlation_id: Optional[str] = None) -> Iterator[str]:
+    """Tag records in this block with an ID, keeping an enclosing one if there is one"""
+    current = _correlation_id.get()
+    if current is not None and correlation_id is None:
+        yield current
+        return
+    token = _correlation_id.set(correlation_id or new_correlation_id())
+    try:
+        yield _correlation_id.get()
+    finally:
+        _correlation_id.reset(token)
+
+def profile_path(correlation_id: str) -> Path:
+    """Where the profile of a solve is saved, next to the timing log"""
+    return (log_dir() or DEFAULT_LOG_DIR) / PROFILE_DIR / f"{correlation_id}.prof"
+
+@contextmanager
+def solve_context(correlation_id: Optional[str] = None, profile: bool = False,
+                  **fields: Any) -> Iterator[str]:
+    """Run a solve under a correlation ID, recording its total time
+
+    With ``profile`` the block runs under cProfile and the stats are saved
+    as ``profiles/<id>.prof`` next to the timing log, for ``pstats`` or
+    snakeviz.
+    """
+    with correlation(correlation_id) as solve_id:
+        profiler = cProfile.Profile() if profile else None
+        status = 'error'
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield solve_id
+            status = 'ok'
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                path = profile_path(solve_id)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(str(path))
+                fields['profile'] = str(path)
+            record('solve', seconds=round(time.perf_counter() - start, 6), status=status,
+                   **fields)
+
+class StageTimer:
+    """Times consecutive solve stages, forwarding stage callbacks unchanged
+
+    Each ``mark`` (or callback) closes the stage that has been running since
+    the previous one. Durations are kept in ``timings`` and recorded as
+    'stage' events; time spent in the forwarded callback is summed under
+    'emit' rather than charged to the next stage.
+    """
+    def __init__(self, on_stage: Optional[Callable[[str, Any], None]] = None):
+        self.on_stage = on_stage
+        self.timings: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> float:
+        now = time.perf_counter()
+        seconds = now - self._last
+        self._last = now
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+        record('stage', stage=stage, seconds=round(seconds, 6))
+        return seconds
+
+    def emit(self, stage: str, value: Any) -> None:
+        """Forward a stage result without closing a stage"""
+        if self.on_stage is not None:
+            self.on_stage(stage, value)
+            now = time.perf_counter()
+            self.timings['emit'] = self.timings.get('emit', 0.0) + now - self._last
+            self._last = now
+
+    def __call__(self, stage: str, value: Any) -> None:
+        self.mark(stage)
+        self.emit(stage, value)
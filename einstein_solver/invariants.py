@@ -0,0 +1,126 @@
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+import sympy as sp
+
+from .curvature import CurvatureResult, Simplifier, simplifier_function
+
+INVARIANT_NAMES = ('kretschmann', 'ricci_squared', 'weyl_squared')
+
+class Invariants:
+    """Curvature invariants built from cached intermediate tensors
+
+    The Riemann tensor is stored as a symmetric matrix over antisymmetric
+    index pairs (a < b), R_{PQ}, and indices are raised two at a time with
+    the bivector metric G^{PQ} = g^{ac} g^{bd} - g^{ad} g^{bc}. Then
+
+        R_{abcd} R^{abcd} = 4 tr(G R G R)
+
+    so the Kretschmann sum costs sparse matrix products over n(n-1)/2
+    pairs rather than a sum over n^8 index combinations. The inverse metric,
+    the bivector metric and the mixed tensors are cached and shared between
+    the invariants.
+    """
+    def __init__(self, metric: sp.Matrix, inverse: sp.Matrix, riemann: sp.Array,
+                 ricci: sp.Array, ricci_scalar: sp.Expr, simplify: Simplifier = False):
+        self.metric = sp.Matrix(metric)
+        self.inverse = sp.Matrix(inverse)
+        self.riemann = riemann
+        self.ricci = ricci
+        self.ricci_scalar = ricci_scalar
+        self.n = self.metric.rows
+        self.pairs: List[Tuple[int, int]] = [
+            (a, b) for a in range(self.n) for b in range(a + 1, self.n)
+        ]
+        self._simp = simplifier_function(simplify)
+
+    @classmethod
+    def from_curvature(cls, curvature: CurvatureResult,
+                       simplify: Simplifier = False) -> 'Invariants':
+        """Reuse the inverse metric and Riemann tensor of a curvature result"""
+        return cls(curvature.metric, curvature.inverse, curvature.riemann,
+                   curvature.ricci, curvature.ricci_scalar, simplify)
+
+    @cached_property
+    def riemann_pairs(self) -> sp.SparseMatrix:
+        """R_{PQ} for index pairs P = (a, b), Q = (c, d) with a < b, c < d"""
+        size = len(self.pairs)
+        entries = {}
+        for p, (a, b) in enumerate(self.pairs):
+            for q in range(p, size):
+                c, d = self.pairs[q]
+                value = self.riemann[a, b, c, d]
+                if value != 0:
+                    entries[p, q] = entries[q, p] = value
+        return sp.SparseMatrix(size, size, entries)
+
+    @cached_property
+    def bivector_metric(self) -> sp.SparseMatrix:
+        """G^{PQ} = g^{ac} g^{bd} - g^{ad} g^{bc}, the inverse metric on index pairs"""
+        g = self.inverse
+        size = len(self.pairs)
+        entries = {}
+        for p, (a, b) in enumerate(self.pairs):
+            for q in range(p, size):
+                c, d = self.pairs[q]
+                value = g[a, c] * g[b, d] - g[a, d] * g[b, c]
+                if value != 0:
+                    entries[p, q] = entries[q, p] = value
+        return sp.SparseMatrix(size, size, entries)
+
+    @cached_property
+    def mixed_riemann(self) -> sp.SparseMatrix:
+        """R^P_Q = G^{PS} R_{SQ}, the Riemann tensor as an operator on bivectors"""
+        return self.bivector_metric * self.riemann_pairs
+
+    @cached_property
+    def mixed_ricci(self) -> sp.Matrix:
+        """R^a_b = g^{ac} R_{cb}"""
+        ricci = sp.Matrix(self.n, self.n, lambda i, j: self.ricci[i, j])
+        return self.inverse * ricci
+
+    @cached_property
+    def kretschmann(self) -> sp.Expr:
+        """R_{abcd} R^{abcd}"""
+        return self._simp(4 * _trace_of_square(self.mixed_riemann))
+
+    @cached_property
+    def ricci_squared(self) -> sp.Expr:
+        """R_{ab} R^{ab}"""
+        return self._simp(_trace_of_square(self.mixed_ricci))
+
+    @cached_property
+    def weyl_squared(self) -> sp.Expr:
+        """C_{abcd} C^{abcd}, from the Kretschmann, Ricci-squared and scalar invariants"""
+        n = self.n
+        # The Weyl tensor vanishes identically below four dimensions
+        if n < 4:
+            return sp.Integer(0)
+        return self._simp(
+            self.kretschmann - sp.Rational(4, n - 2) * self.ricci_squared
+            + sp.Rational(2, (n - 1) * (n - 2)) * self.ricci_scalar ** 2
+        )
+
+    def as_dict(self, names: Optional[Tuple[str, ...]] = None) -> Dict[str, sp.Expr]:
+        """Invariants by name, computing only those requested"""
+        return {name: getattr(self, name) for name in (names or INVARIANT_NAMES)}
+
+    def __getstate__(self):
+        # Drop the simplifier, which may not be picklable; cached values are kept
+        state = self.__dict__.copy()
+        state['_simp'] = simplifier_function(False)
+        return state
+
+def _trace_of_square(matrix: sp.MatrixBase) -> sp.Expr:
+    """tr(M M) summing only the nonzero entries"""
+    if isinstance(matrix, sp.SparseMatrix):
+        entries = matrix.todok()
+    else:
+        entries = {(i, j): matrix[i, j] for i in range(matrix.rows)
+                   for j in range(matrix.cols) if matrix[i, j] != 0}
+    return sp.Add(*[
+        value * entries[j, i] for (i, j), value in entries.items() if (j, i) in entries
+    ])
+
+def kretschmann_scalar(curvature: CurvatureResult, simplify: bool = False) -> sp.Expr:
+    """Kretschmann invariant R_{abcd} R^{abcd} of a curvature result"""
+    return Invariants.from_curvature(curvature, simplify).kretschmann
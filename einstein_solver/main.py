@@ -2,9 +2,11 @@
 import sys
 from PyQt6.QtWidgets import QApplication
 from einstein_solver.gui import EinsteinSolverWindow  # Changed from EinsteinSolverGUI
+from einstein_solver.utils import setup_logging
 
 def main():
     """Application entry point"""
+    setup_logging()
     app = QApplication(sys.argv)
     
     # Create and show main window
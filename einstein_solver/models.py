@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from dataclasses import dataclass, astuple, field
+from typing import Iterable, List, Dict, Optional, Set, Tuple
 
 @dataclass
 class Constraint:
@@ -8,11 +8,119 @@ class Constraint:
     relation: str
     value2: str
 
+    @classmethod
+    def from_dict(cls, data) -> 'Constraint':
+        """Create a constraint from a dictionary or a [category, value1, relation, value2] list"""
+        if isinstance(data, dict):
+            return cls(data['category'], data['value1'], data['relation'], str(data['value2']))
+        category, value1, relation, value2 = data
+        return cls(category, value1, relation, str(value2))
+
+@dataclass
+class ConstraintUpdate:
+    """Effect of adding one constraint to a puzzle"""
+    constraint: Constraint
+    added: bool
+    consistent: bool
+    # Values whose position (1-based) became fixed by this constraint
+    forced: Dict[Tuple[str, str], int] = field(default_factory=dict)
+
 class Puzzle:
+    """Categories of values to arrange in positions, with an indexed constraint store
+
+    Constraints are normalized when added (``right_of`` becomes ``left_of``,
+    symmetric relations get a fixed operand order, ``value2`` is qualified
+    as 'category:value'), duplicates are dropped, and each one is indexed by
+    the values it mentions. Position domains are propagated incrementally,
+    so a contradiction or forced position shows up in the returned
+    ``ConstraintUpdate`` right away.
+    """
     def __init__(self, categories: List[str], values: Dict[str, List[str]]):
         self.categories = categories
         self.values = values
         self.constraints: List[Constraint] = []
+        self.consistent = True
+        self._keys: Set[Tuple[str, int, int]] = set()
+        self._index: Dict[Tuple[str, str], List[Constraint]] = {}
+        self._propagator = None
+
+    @property
+    def propagator(self) -> 'Propagator':
+        """Position domains of every value, kept propagated as constraints are added"""
+        if self._propagator is None:
+            # Imported here because the solver module builds on these models
+            from .puzzle import Propagator
+            self._propagator = Propagator(self)
+        return self._propagator
+
+    def _store(self, constraint: Constraint) -> Tuple[Tuple[str, int, int], Constraint, bool]:
+        """Normalize and index a constraint; the flag is False for a duplicate"""
+        propagator = self.propagator
+        key = propagator.normalize(constraint)
+        normalized = propagator.constraint(*key)
+        if key in self._keys:
+            return key, normalized, False
+        self._keys.add(key)
+        self.constraints.append(normalized)
+        relation, a, b = key
+        mentioned = [a] if relation in ('at', 'not_at') else [a, b]
+        for variable in mentioned:
+            self._index.setdefault(propagator.names[variable], []).append(normalized)
+        return key, normalized, True
+
+    def add_constraint(self, constraint: Constraint) -> ConstraintUpdate:
+        """Normalize, deduplicate, index and propagate a constraint
+
+        Raises ValueError for unknown values, relations or positions.
+        """
+        key, normalized, added = self._store(constraint)
+        if not added:
+            return ConstraintUpdate(normalized, False, self.consistent)
+        propagator = self.propagator
+        before = list(propagator.domains)
+        changed = propagator.add(*key)
+        if self.consistent:
+            self.consistent = propagator.propagate(propagator.domains, changed)
+        forced = {}
+        if self.consistent:
+            for variable, (old, new) in enumerate(zip(before, propagator.domains)):
+                if old != new and new & (new - 1) == 0:
+                    forced[propagator.names[variable]] = new.bit_length()
+        return ConstraintUpdate(normalized, True, self.consistent, forced)
+
+    def add_constraints(self, constraints: Iterable[Constraint]) -> bool:
+        """Add many constraints with a single propagation pass; returns consistency"""
+        changed: List[int] = []
+        for constraint in constraints:
+            key, _, added = self._store(constraint)
+            if added:
+                changed.extend(self.propagator.add(*key))
+        if self.consistent and changed:
+            self.consistent = self.propagator.propagate(self.propagator.domains, changed)
+        return self.consistent
+
+    def constraints_for(self, category: str, value: str) -> List[Constraint]:
+        """Constraints that mention a value"""
+        return list(self._index.get((category, value), []))
+
+    def possible_positions(self, category: str, value: str) -> List[int]:
+        """1-based positions still open to a value"""
+        propagator = self.propagator
+        domain = propagator.domains[propagator.variable(category, value)]
+        return [p + 1 for p in range(propagator.size) if domain >> p & 1]
+
+    def to_dict(self) -> dict:
+        """Convert puzzle to dictionary, with constraints as lists"""
+        return {
+            'categories': self.categories,
+            'values': self.values,
+            'constraints': [list(astuple(c)) for c in self.constraints]
+        }
 
-    def add_constraint(self, constraint: Constraint) -> None:
-        self.constraints.append(constraint) 
\ No newline at end of file
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Puzzle':
+        """Create a puzzle from a dictionary"""
+        puzzle = cls(list(data['categories']),
+                     {k: list(v) for k, v in data['values'].items()})
+        puzzle.add_constraints(Constraint.from_dict(c) for c in data.get('constraints', []))
+        return puzzle
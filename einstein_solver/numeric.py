@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
+import sympy as sp
+
+from .curvature import CurvatureResult
+from .invariants import INVARIANT_NAMES, Invariants
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Axis values for a grid coordinate, or a single value to hold it fixed
+AxisValues = Union[float, Sequence[float], np.ndarray]
+
+@dataclass
+class _Quantity:
+    name: str
+    shape: Tuple[int, ...]
+    # Flat positions of nonzero components and where they sit in the compiled output
+    positions: List[int]
+
+class GridEvaluator:
+    """Compiles symbolic quantities into one CSE-optimized NumPy function
+
+    All components of all quantities are lambdified together with common
+    subexpression elimination, so subexpressions shared between the Ricci
+    scalar, Einstein tensor and Kretschmann invariant are evaluated once per
+    point. Zero components are left out of the compiled function.
+    """
+    def __init__(self, quantities: Mapping[str, Any], variables: Sequence[sp.Symbol],
+                 parameters: Optional[Mapping[Union[str, sp.Symbol], float]] = None):
+        self.variables = tuple(variables)
+        substitutions = {
+            (sp.Symbol(k) if isinstance(k, str) else k): v
+            for k, v in (parameters or {}).items()
+        }
+
+        self.quantities: List[_Quantity] = []
+        components: List[sp.Expr] = []
+        for name, value in quantities.items():
+            shape = tuple(getattr(value, 'shape', ()))
+            flat = sp.flatten(value) if shape else [value]
+            positions = []
+            for position, expr in enumerate(flat):
+                expr = sp.sympify(expr).subs(substitutions) if substitutions else sp.sympify(expr)
+                if expr == 0:
+                    continue
+                self._check_expression(name, expr)
+                positions.append(position)
+                components.append(expr)
+            self.quantities.append(_Quantity(name, shape, positions))
+
+        self.component_count = len(components)
+        self._function = sp.lambdify(self.variables, components, modules='numpy', cse=True)
+
+    def _check_expression(self, name: str, expr: sp.Expr) -> None:
+        unknown = expr.free_symbols - set(self.variables)
+        if unknown:
+            names = ', '.join(sorted(str(s) for s in unknown))
+            raise ValueError(f"{name} depends on symbols without values: {names}")
+        functions = expr.atoms(sp.core.function.AppliedUndef)
+        if functions:
+            names = ', '.join(sorted(str(f) for f in functions))
+            raise ValueError(f"{name} contains undefined functions: {names}")
+
+    def __call__(self, *coordinates: np.ndarray) -> Dict[str, np.ndarray]:
+        """Evaluate at matching arrays of points, one array per variable"""
+        points = np.broadcast(*coordinates).shape if coordinates else ()
+        results = {
+            quantity.name: np.zeros(points + quantity.shape) for quantity in self.quantities
+        }
+        self._evaluate_into(coordinates, {
+            name: out.reshape(points + (-1,)) for name, out in results.items()
+        })
+        return results
+
+    def _evaluate_into(self, coordinates: Sequence[np.ndarray],
+                       targets: Dict[str, np.ndarray]) -> None:
+        # targets hold one flattened component axis last; zero components are left untouched
+        values = self._function(*coordinates)
+        offset = 0
+        for quantity in self.quantities:
+            target = targets[quantity.name]
+            for position in quantity.positions:
+                target[..., position] = values[offset]
+                offset += 1
+
+    def evaluate_grid(self, axes: Mapping[Union[str, sp.Symbol], AxisValues],
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      output_dir: Optional[Path] = None) -> Dict[str, np.ndarray]:
+        """Evaluate over the outer product of coordinate axes in chunks
+
+        ``axes`` maps every variable to a 1-D array of values, or to a scalar
+        to hold that coordinate fixed. Results have one dimension per array
+        axis (in variable order) followed by the quantity's tensor shape.
+        With ``output_dir`` each quantity is written to a memory-mapped
+        ``<name>.npy`` file, so grids larger than RAM stream to disk.
+        """
+        by_name = {(s if isinstance(s, str) else s.name): v for s, v in axes.items()}
+        missing = [v.name for v in self.variables if v.name not in by_name]
+        if missing:
+            raise ValueError(f"No grid values for: {', '.join(missing)}")
+
+        grid_axes = []
+        fixed = {}
+        for variable in self.variables:
+            values = np.asarray(by_name[variable.name], dtype=float)
+            if values.ndim == 0:
+                fixed[variable.name] = float(values)
+            else:
+                grid_axes.append((variable.name, values.ravel()))
+        grid_shape = tuple(len(values) for _, values in grid_axes)
+        total = int(np.prod(grid_shape, dtype=np.int64))
+
+        outputs = {}
+        if output_dir is not None:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+        for quantity in self.quantities:
+            shape = grid_shape + quantity.shape
+            if output_dir is not None:
+                outputs[quantity.name] = np.lib.format.open_memmap(
+                    output_dir / f"{quantity.name}.npy", mode='w+', dtype=np.float64, shape=shape
+                )
+            else:
+                outputs[quantity.name] = np.zeros(shape)
+
+        # Fresh .npy memmaps and np.zeros are zero-filled, so zero components need no writes
+        flat_outputs = {name: out.reshape((total, -1)) for name, out in outputs.items()}
+        for start in range(0, total, chunk_size):
+            stop = min(start + chunk_size, total)
+            indices = np.unravel_index(np.arange(start, stop), grid_shape) if grid_shape else ()
+            points = {name: values[idx] for (name, values), idx in zip(grid_axes, indices)}
+            arguments = [
+                points[v.name] if v.name in points else np.full(stop - start, fixed[v.name])
+                for v in self.variables
+            ]
+            self._evaluate_into(arguments, {
+                name: out[start:stop] for name, out in flat_outputs.items()
+            })
+
+        for out in outputs.values():
+            if isinstance(out, np.memmap):
+                out.flush()
+        return outputs
+
+def compile_curvature(curvature: CurvatureResult,
+                      parameters: Optional[Mapping[Union[str, sp.Symbol], float]] = None,
+                      quantities: Sequence[str] = ('ricci_scalar', 'einstein_tensor', 'kretschmann')
+                      ) -> GridEvaluator:
+    """Build a GridEvaluator for curvature quantities of a solved metric
+
+    ``parameters`` gives numeric values for constants such as M or a.
+    """
+    invariants = Invariants.from_curvature(curvature)
+    available = {
+        'ricci_scalar': lambda: curvature.ricci_scalar,
+        'ricci_tensor': lambda: curvature.ricci,
+        'einstein_tensor': lambda: curvature.einstein,
+        **{name: (lambda name=name: getattr(invariants, name)) for name in INVARIANT_NAMES}
+    }
+    unknown = [name for name in quantities if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown quantities: {', '.join(unknown)}")
+    selected = {name: available[name]() for name in quantities}
+    return GridEvaluator(selected, curvature.coordinates, parameters)
+
+def compile_invariants(invariants: Invariants, variables: Sequence[sp.Symbol],
+                       parameters: Optional[Mapping[Union[str, sp.Symbol], float]] = None,
+                       names: Sequence[str] = INVARIANT_NAMES) -> GridEvaluator:
+    """Build a GridEvaluator for scalar invariants, sharing subexpressions between them"""
+    unknown = [name for name in names if name not in INVARIANT_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown invariants: {', '.join(unknown)}")
+    return GridEvaluator(invariants.as_dict(tuple(names)), variables, parameters)
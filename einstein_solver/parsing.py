@@ -0,0 +1,165 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import sympy as sp
+from latex2sympy2 import latex2sympy
+
+from .instrumentation import span
+
+MEMO_SIZE = 4096
+
+@dataclass
+class ParseError:
+    """A metric component that could not be parsed"""
+    row: int
+    column: int
+    text: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"g_{{{self.row}{self.column}}} = '{self.text}': {self.message}"
+
+@dataclass
+class ParseResult:
+    """Parsed metric matrix together with any problems found on the way"""
+    matrix: sp.Matrix
+    errors: List[ParseError] = field(default_factory=list)
+    asymmetric: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+class MetricParseError(ValueError):
+    """Raised when one or more metric components fail to parse"""
+    def __init__(self, errors: List[ParseError]):
+        self.errors = errors
+        super().__init__("Could not parse metric components:\n" +
+                         "\n".join(str(e) for e in errors))
+
+# LRU memo of component text -> (expression, error message)
+_memo: 'OrderedDict[str, Tuple[Optional[sp.Expr], Optional[str]]]' = OrderedDict()
+_memo_lock = threading.Lock()
+
+def normalize_component(text: str) -> str:
+    """Collapse whitespace so trivially different spellings share a memo entry"""
+    text = " ".join(str(text).split())
+    return text or "0"
+
+def _parse_text(text: str) -> Tuple[Optional[sp.Expr], Optional[str]]:
+    if text == "0":
+        return sp.Integer(0), None
+    with span('latex_parse', chars=len(text), ok=True) as fields:
+        try:
+            return latex2sympy(text), None
+        except Exception as e:
+            fields['ok'] = False
+            return None, str(e) or type(e).__name__
+
+def _memo_get(text: str) -> Optional[Tuple[Optional[sp.Expr], Optional[str]]]:
+    with _memo_lock:
+        entry = _memo.get(text)
+        if entry is not None:
+            _memo.move_to_end(text)
+        return entry
+
+def _memo_put(text: str, entry: Tuple[Optional[sp.Expr], Optional[str]]) -> None:
+    with _memo_lock:
+        _memo[text] = entry
+        _memo.move_to_end(text)
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+
+def clear_memo() -> None:
+    """Drop all memoized component parses"""
+    with _memo_lock:
+        _memo.clear()
+
+def parse_component(text: str) -> sp.Expr:
+    """Parse one LaTeX component, reusing earlier parses of the same string"""
+    text = normalize_component(text)
+    entry = _memo_get(text)
+    if entry is None:
+        entry = _parse_text(text)
+        _memo_put(text, entry)
+    expr, message = entry
+    if message is not None:
+        raise ValueError(message)
+    return expr
+
+def _parse_many(texts: List[str], max_workers: Optional[int]) -> Dict[str, Tuple[Optional[sp.Expr], Optional[str]]]:
+    parsed = {}
+    missing = []
+    for text in texts:
+        entry = _memo_get(text)
+        if entry is None:
+            missing.append(text)
+        else:
+            parsed[text] = entry
+
+    with span('parse_metric', components=len(texts), memo_hits=len(parsed)):
+        if max_workers and max_workers > 1 and len(missing) > 1:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+                entries = list(executor.map(_parse_text, missing))
+        else:
+            entries = [_parse_text(text) for text in missing]
+
+    for text, entry in zip(missing, entries):
+        _memo_put(text, entry)
+        parsed[text] = entry
+    return parsed
+
+def _same_expr(a: sp.Expr, b: sp.Expr) -> bool:
+    if a == b:
+        return True
+    try:
+        return sp.expand(a - b) == 0
+    except Exception:
+        return False
+
+def parse_metric(components: List[List[str]], dimension: int,
+                 max_workers: Optional[int] = None) -> ParseResult:
+    """Parse a metric's components into a symmetric sympy Matrix
+
+    Each distinct string is parsed once (optionally across ``max_workers``
+    processes). A literal "0" in one cell of an off-diagonal pair (the GUI
+    default) takes the other entry, so either triangle can be filled alone.
+    Pairs whose entries both differ from "0" and disagree are listed in
+    ``asymmetric``, and the upper entry is used.
+    """
+    texts = [[normalize_component(components[i][j]) for j in range(dimension)]
+             for i in range(dimension)]
+    distinct = list(dict.fromkeys(text for row in texts for text in row))
+    parsed = _parse_many(distinct, max_workers)
+
+    matrix = sp.zeros(dimension, dimension)
+    errors = []
+    asymmetric = []
+    for i in range(dimension):
+        for j in range(i, dimension):
+            upper, lower = texts[i][j], texts[j][i]
+            upper_expr, upper_error = parsed[upper]
+            if upper_error is not None:
+                errors.append(ParseError(i, j, upper, upper_error))
+            if upper == lower:
+                value = upper_expr
+            else:
+                lower_expr, lower_error = parsed[lower]
+                if lower_error is not None:
+                    errors.append(ParseError(j, i, lower, lower_error))
+                if upper_error is not None or lower_error is not None:
+                    continue
+                if upper == "0":
+                    value = lower_expr
+                else:
+                    if lower != "0" and not _same_expr(upper_expr, lower_expr):
+                        asymmetric.append((i, j))
+                    value = upper_expr
+            if value is not None:
+                matrix[i, j] = value
+                matrix[j, i] = value
+
+    errors.sort(key=lambda e: (e.row, e.column))
+    return ParseResult(matrix, errors, asymmetric)
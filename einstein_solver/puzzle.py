@@ -0,0 +1,405 @@
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config.settings import Settings
+from .models import Constraint, Puzzle
+
+# Positional relations between two values; left_of and right_of mean immediately adjacent
+BINARY_RELATIONS = ('same', 'not_same', 'next_to', 'left_of', 'right_of')
+# Relations between a value and a 1-based position given as value2
+UNARY_RELATIONS = ('at', 'not_at')
+RELATIONS = BINARY_RELATIONS + UNARY_RELATIONS
+
+# Variable ordering heuristics for the search
+ORDERINGS = ('mrv_degree', 'mrv', 'dom_degree', 'random', 'input')
+# Nodes between polls of a search's stop callback
+STOP_CHECK_INTERVAL = 256
+
+# A solution lists each category's values in position order
+Solution = Dict[str, List[str]]
+
+def default_max_iterations() -> int:
+    """Search node limit from the application settings"""
+    settings = Settings()
+    return int(settings.config.get('max_iterations', settings.default_config['max_iterations']))
+
+def _bits(domain: int) -> Iterator[int]:
+    while domain:
+        low = domain & -domain
+        yield low.bit_length() - 1
+        domain ^= low
+
+def _count(domain: int) -> int:
+    return bin(domain).count('1')
+
+class Propagator:
+    """Bitset domains for every (category, value) with AC-3 style propagation
+
+    Variable ``v`` is the position of one value; its domain is an integer
+    whose bit ``p`` is set while position ``p`` is still possible. Binary
+    relations are revised exactly on whole bitsets (shifts for adjacency),
+    so they are kept arc consistent. Each category is a permutation of the
+    positions, handled by removing assigned positions from the other values
+    and assigning positions that only one value can still take.
+    """
+    def __init__(self, puzzle: Puzzle):
+        self.categories = list(puzzle.categories)
+        self.size = len(puzzle.values[self.categories[0]]) if self.categories else 0
+        for category in self.categories:
+            if len(puzzle.values[category]) != self.size:
+                raise ValueError(
+                    f"Category '{category}' has {len(puzzle.values[category])} values, "
+                    f"expected {self.size}"
+                )
+        self.full = (1 << self.size) - 1
+        self.names: List[Tuple[str, str]] = [
+            (category, value) for category in self.categories for value in puzzle.values[category]
+        ]
+        self.index = {name: v for v, name in enumerate(self.names)}
+        self.members: List[List[int]] = [
+            list(range(c * self.size, (c + 1) * self.size)) for c in range(len(self.categories))
+        ]
+        self.domains = [self.full] * len(self.names)
+        self.binary: List[Tuple[str, int, int]] = []
+        self.watch: List[List[int]] = [[] for _ in self.names]
+
+    def variable(self, category: str, value: str) -> int:
+        """Variable index of a value within a known category"""
+        if (category, value) in self.index:
+            return self.index[category, value]
+        raise ValueError(f"Unknown value '{value}' in category '{category}'")
+
+    def find(self, value: str) -> int:
+        """Variable index of a value given as 'category:value' or a name unique across categories"""
+        if ':' in value:
+            category, name = value.split(':', 1)
+            if (category, name) in self.index:
+                return self.index[category, name]
+        matches = [v for v, (_, name) in enumerate(self.names) if name == value]
+        if not matches:
+            raise ValueError(f"Unknown value '{value}'")
+        if len(matches) > 1:
+            categories = ', '.join(self.names[v][0] for v in matches)
+            raise ValueError(f"Value '{value}' is ambiguous, found in: {categories}")
+        return matches[0]
+
+    def normalize(self, constraint: Constraint) -> Tuple[str, int, int]:
+        """(relation, a, b) with right_of rewritten as left_of; b is a position for unary relations"""
+        if constraint.relation not in RELATIONS:
+            raise ValueError(
+                f"Unknown relation '{constraint.relation}', expected one of {RELATIONS}"
+            )
+        a = self.variable(constraint.category, constraint.value1)
+        if constraint.relation in UNARY_RELATIONS:
+            position = int(constraint.value2) - 1
+            if not 0 <= position < self.size:
+                raise ValueError(f"Position {constraint.value2} is outside 1..{self.size}")
+            return constraint.relation, a, position
+        b = self.find(constraint.value2)
+        if constraint.relation == 'right_of':
+            return 'left_of', b, a
+        if constraint.relation in ('same', 'not_same', 'next_to') and b < a:
+            a, b = b, a
+        return constraint.relation, a, b
+
+    def constraint(self, relation: str, a: int, b: int) -> Constraint:
+        """Canonical Constraint for a normalized (relation, a, b), naming value2 as 'category:value'"""
+        category, value = self.names[a]
+        if relation in UNARY_RELATIONS:
+            return Constraint(category, value, relation, str(b + 1))
+        return Constraint(category, value, relation, ':'.join(self.names[b]))
+
+    def add(self, relation: str, a: int, b: int) -> List[int]:
+        """Register a normalized constraint and return the variables whose domains it narrowed"""
+        if relation == 'at':
+            return self._restrict(a, 1 << b)
+        if relation == 'not_at':
+            return self._restrict(a, self.full & ~(1 << b))
+        self.binary.append((relation, a, b))
+        index = len(self.binary) - 1
+        self.watch[a].append(index)
+        self.watch[b].append(index)
+        return [a, b]
+
+    def _restrict(self, variable: int, mask: int) -> List[int]:
+        narrowed = self.domains[variable] & mask
+        if narrowed == self.domains[variable]:
+            return []
+        self.domains[variable] = narrowed
+        return [variable]
+
+    def degree(self, variable: int) -> int:
+        return len(self.watch[variable])
+
+    def _revise(self, relation: str, da: int, db: int) -> Tuple[int, int]:
+        full = self.full
+        if relation == 'same':
+            both = da & db
+            return both, both
+        if relation == 'not_same':
+            if db & (db - 1) == 0:
+                da &= ~db
+            if da & (da - 1) == 0:
+                db &= ~da
+            return da, db
+        if relation == 'next_to':
+            da &= ((db << 1) | (db >> 1)) & full
+            db &= ((da << 1) | (da >> 1)) & full
+            return da, db
+        # left_of: a sits immediately left of b
+        da &= db >> 1
+        db &= (da << 1) & full
+        return da, db
+
+    def propagate(self, domains: List[int], changed: Iterable[int]) -> bool:
+        """Narrow ``domains`` in place to a fixpoint; False if a domain empties"""
+        queue = deque(dict.fromkeys(changed))
+        queued = set(queue)
+        size = self.size
+        while queue:
+            variable = queue.popleft()
+            queued.discard(variable)
+            if not domains[variable]:
+                return False
+            updates: List[int] = []
+            for index in self.watch[variable]:
+                relation, a, b = self.binary[index]
+                da, db = self._revise(relation, domains[a], domains[b])
+                if not da or not db:
+                    return False
+                if da != domains[a]:
+                    domains[a] = da
+                    updates.append(a)
+                if db != domains[b]:
+                    domains[b] = db
+                    updates.append(b)
+
+            members = self.members[variable // size]
+            domain = domains[variable]
+            if domain & (domain - 1) == 0:
+                for other in members:
+                    if other != variable and domains[other] & domain:
+                        domains[other] &= ~domain
+                        if not domains[other]:
+                            return False
+                        updates.append(other)
+            # A position only one value of the category can still take must be that value's
+            seen = once = 0
+            for other in members:
+                once = (once & ~domains[other]) | (domains[other] & ~seen)
+                seen |= domains[other]
+            if seen != self.full:
+                return False
+            for other in members:
+                single = domains[other] & once
+                if single and domains[other] != single:
+                    if single & (single - 1):
+                        return False
+                    domains[other] = single
+                    updates.append(other)
+
+            for other in updates:
+                if other not in queued:
+                    queued.add(other)
+                    queue.append(other)
+        return True
+
+    def solution(self, domains: List[int]) -> Solution:
+        """Category values in position order for fully assigned domains"""
+        solution: Solution = {}
+        for category, members in zip(self.categories, self.members):
+            row = [''] * self.size
+            for variable in members:
+                row[domains[variable].bit_length() - 1] = self.names[variable][1]
+            solution[category] = row
+        return solution
+
+@dataclass
+class SolveResult:
+    """Solutions found by a search and whether the search space was exhausted"""
+    solutions: List[Solution] = field(default_factory=list)
+    complete: bool = True
+    nodes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def unique(self) -> bool:
+        """True only when the search proved there is exactly one solution"""
+        return len(self.solutions) == 1 and self.complete
+
+    @property
+    def solved(self) -> bool:
+        return bool(self.solutions)
+
+class PuzzleSolver:
+    """Constraint propagation and backtracking search over a Puzzle
+
+    ``ordering`` picks the next variable to branch on (see ``ORDERINGS``);
+    the default takes the smallest remaining domain, ties broken by the
+    number of constraints on the variable. The search stops after
+    ``max_iterations`` nodes (``Settings`` 'max_iterations' by default) and
+    then reports an incomplete result.
+    """
+    def __init__(self, puzzle: Puzzle, max_iterations: Optional[int] = None,
+                 ordering: str = 'mrv_degree', seed: Optional[int] = None):
+        if ordering not in ORDERINGS:
+            raise ValueError(f"Unknown ordering '{ordering}', expected one of {ORDERINGS}")
+        self.puzzle = puzzle
+        if max_iterations is None:
+            max_iterations = default_max_iterations()
+        self.max_iterations = max_iterations
+        self.ordering = ordering
+        self._rng = random.Random(seed)
+        # The puzzle propagates as constraints are added; searches copy its domains
+        self.propagator = puzzle.propagator
+        self.consistent = puzzle.consistent
+
+    def _key(self, variable: int, domain: int):
+        degree = self.propagator.degree(variable)
+        if self.ordering == 'mrv_degree':
+            return _count(domain), -degree
+        if self.ordering == 'mrv':
+            return _count(domain), variable
+        if self.ordering == 'dom_degree':
+            return _count(domain) / (degree + 1), variable
+        if self.ordering == 'random':
+            return _count(domain), self._rng.random()
+        return variable
+
+    def _select(self, domains: List[int]) -> int:
+        best, best_key = -1, None
+        for variable, domain in enumerate(domains):
+            if domain & (domain - 1) == 0:
+                continue
+            key = self._key(variable, domain)
+            if best_key is None or key < best_key:
+                best, best_key = variable, key
+            if self.ordering == 'input':
+                break
+        return best
+
+    def _children(self, domains: List[int], variable: int) -> Iterator[List[int]]:
+        for position in _bits(domains[variable]):
+            child = list(domains)
+            child[variable] = 1 << position
+            if self.propagator.propagate(child, [variable]):
+                yield child
+
+    def _search(self, domains: List[int], result: SolveResult, max_solutions: Optional[int],
+                stop: Optional[Callable[[], bool]]) -> bool:
+        """Depth-first search; returns False once a node, solution or stop limit ends it"""
+        variable = self._select(domains)
+        if variable < 0:
+            result.solutions.append(self.propagator.solution(domains))
+            return max_solutions is None or len(result.solutions) < max_solutions
+        for position in _bits(domains[variable]):
+            if result.nodes >= self.max_iterations or (
+                    stop is not None and result.nodes % STOP_CHECK_INTERVAL == 0 and stop()):
+                result.complete = False
+                return False
+            result.nodes += 1
+            child = list(domains)
+            child[variable] = 1 << position
+            if self.propagator.propagate(child, [variable]):
+                if not self._search(child, result, max_solutions, stop):
+                    return False
+        return True
+
+    def solve(self, max_solutions: Optional[int] = None, domains: Optional[List[int]] = None,
+              stop: Optional[Callable[[], bool]] = None) -> SolveResult:
+        """Find up to ``max_solutions`` solutions (all of them by default)
+
+        ``domains`` starts the search from a subproblem produced by
+        ``split``; ``stop`` is polled periodically and ends the search early.
+        """
+        start = time.perf_counter()
+        result = SolveResult()
+        if self.consistent:
+            domains = list(self.propagator.domains if domains is None else domains)
+            finished = self._search(domains, result, max_solutions, stop)
+            # Stopping at max_solutions leaves the rest of the tree unexplored
+            result.complete = result.complete and (
+                finished or max_solutions is None or len(result.solutions) < max_solutions
+            )
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def check_unique(self, stop: Optional[Callable[[], bool]] = None) -> SolveResult:
+        """Search for a second solution; ``result.unique`` tells whether there is exactly one"""
+        return self.solve(max_solutions=2, stop=stop)
+
+    def split(self, parts: int) -> List[List[int]]:
+        """Divide the search tree into at least ``parts`` independent subproblems
+
+        Subproblems are expanded breadth first, largest first, so their
+        union is exactly the original search space. Fewer are returned when
+        the tree is smaller than ``parts``.
+        """
+        if not self.consistent:
+            return []
+        frontier = [list(self.propagator.domains)]
+        while len(frontier) < parts:
+            frontier.sort(key=lambda d: sum(_count(x) for x in d))
+            domains = frontier.pop()
+            variable = self._select(domains)
+            if variable < 0:
+                frontier.append(domains)
+                break
+            frontier.extend(self._children(domains, variable))
+            if not frontier:
+                break
+        return frontier
+
+def solve_puzzle(puzzle: Puzzle, max_solutions: Optional[int] = None,
+                 max_iterations: Optional[int] = None, ordering: str = 'mrv_degree') -> SolveResult:
+    """Solve a puzzle, returning up to ``max_solutions`` solutions"""
+    return PuzzleSolver(puzzle, max_iterations, ordering).solve(max_solutions)
+
+def _random_clue(solution: Solution, rng: random.Random) -> Constraint:
+    categories = list(solution)
+    size = len(solution[categories[0]])
+    relation = rng.choice(('same', 'same', 'next_to', 'left_of', 'not_same', 'at'))
+    first, second = rng.choice(categories), rng.choice(categories)
+    position = rng.randrange(size)
+    if relation == 'at':
+        return Constraint(first, solution[first][position], 'at', str(position + 1))
+    if relation == 'same':
+        other = position
+        while first == second and len(categories) > 1:
+            second = rng.choice(categories)
+    elif relation == 'not_same':
+        other = rng.choice([p for p in range(size) if p != position])
+    elif relation == 'left_of':
+        position = min(position, size - 2)
+        other = position + 1
+    elif position == size - 1 or (position > 0 and rng.random() < 0.5):
+        other = position - 1
+    else:
+        other = position + 1
+    return Constraint(first, solution[first][position], relation,
+                      f"{second}:{solution[second][other]}")
+
+def generate_puzzle(size: int, category_count: Optional[int] = None,
+                    seed: Optional[int] = None) -> Tuple[Puzzle, Solution]:
+    """Random puzzle with a unique solution, built by adding true clues until unique
+
+    Values are named by category letter and number (A1, B3, ...).
+    """
+    rng = random.Random(seed)
+    category_count = category_count or size
+    categories = [chr(ord('A') + c) for c in range(category_count)]
+    values = {category: [f"{category}{i + 1}" for i in range(size)] for category in categories}
+    solution = {category: rng.sample(values[category], size) for category in categories}
+
+    puzzle = Puzzle(categories, values)
+    domains = puzzle.propagator.domains
+    while True:
+        puzzle.add_constraint(_random_clue(solution, rng))
+        # Only run a search once propagation has narrowed things down
+        if sum(_count(d) for d in domains) > 2 * len(domains):
+            continue
+        if PuzzleSolver(puzzle, max_iterations=10_000).check_unique().unique:
+            return puzzle, solution
@@ -0,0 +1,294 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .models import Puzzle
+from .puzzle import ORDERINGS, PuzzleSolver, Solution, SolveResult, default_max_iterations
+from .utils import TimeLimitExceeded, time_limit
+
+# Puzzles sent to a worker per task in the default mode
+DEFAULT_CHUNK_SIZE = 16
+# Subproblems per worker when one puzzle's search tree is split
+SPLIT_FACTOR = 4
+
+@dataclass
+class PuzzleResult:
+    """Outcome of solving a single puzzle in a batch"""
+    index: int
+    status: str
+    elapsed: float
+    nodes: int = 0
+    solutions: int = 0
+    solution: Optional[Solution] = None
+    ordering: Optional[str] = None
+    error: Optional[str] = None
+    name: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Convert result to dictionary"""
+        data = {
+            'index': self.index,
+            'status': self.status,
+            'elapsed': round(self.elapsed, 6),
+            'nodes': self.nodes,
+            'solutions': self.solutions,
+            'solution': self.solution,
+            'error': self.error
+        }
+        if self.ordering is not None:
+            data['ordering'] = self.ordering
+        if self.name is not None:
+            data['name'] = self.name
+        return data
+
+def _status(result: SolveResult) -> str:
+    if len(result.solutions) > 1:
+        return 'multiple'
+    if not result.complete:
+        return 'incomplete'
+    return 'unique' if result.solutions else 'unsolvable'
+
+def _from_solve(index: int, record: dict, result: SolveResult, elapsed: float,
+                ordering: Optional[str] = None) -> PuzzleResult:
+    return PuzzleResult(
+        index, _status(result), elapsed, result.nodes, len(result.solutions),
+        result.solutions[0] if result.solutions else None, ordering, name=record.get('name')
+    )
+
+def iter_records(path: Path) -> Iterator[dict]:
+    """Read puzzle records one JSON line at a time; '-' reads standard input"""
+    stream = sys.stdin if str(path) == '-' else open(path)
+    try:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def _solve_record(index: int, record: dict, max_iterations: int, all_solutions: bool,
+                  timeout: Optional[float], ordering: str = 'mrv_degree',
+                  stop_event=None) -> PuzzleResult:
+    """Solve one record; ``stop_event`` lets a portfolio race end the losers"""
+    start = time.perf_counter()
+    name = record.get('name')
+    try:
+        # Only enforced on POSIX, where SIGALRM is available
+        with time_limit(timeout):
+            solver = PuzzleSolver(Puzzle.from_dict(record), max_iterations, ordering)
+            stop = stop_event.is_set if stop_event is not None else None
+            result = solver.solve(None if all_solutions else 2, stop=stop)
+        return _from_solve(index, record, result, time.perf_counter() - start, ordering)
+    except TimeLimitExceeded:
+        return PuzzleResult(index, 'timeout', time.perf_counter() - start, ordering=ordering,
+                            error=f"Exceeded {timeout}s time limit", name=name)
+    except Exception as e:
+        return PuzzleResult(index, 'error', time.perf_counter() - start, ordering=ordering,
+                            error=str(e), name=name)
+
+def _solve_chunk(chunk: List[Tuple[int, dict]], max_iterations: int, all_solutions: bool,
+                 timeout: Optional[float]) -> List[PuzzleResult]:
+    return [_solve_record(index, record, max_iterations, all_solutions, timeout)
+            for index, record in chunk]
+
+def _solve_subtree(record: dict, domains: List[int], max_iterations: int,
+                   max_solutions: Optional[int], stop_event,
+                   deadline: Optional[float] = None) -> SolveResult:
+    """Search one subtree; ``deadline`` is the wall-clock time the whole puzzle must end by"""
+    remaining = deadline - time.time() if deadline is not None else None
+    if remaining is not None and remaining <= 0:
+        raise TimeLimitExceeded()
+    # Only enforced on POSIX, where SIGALRM is available
+    with time_limit(remaining):
+        solver = PuzzleSolver(Puzzle.from_dict(record), max_iterations)
+        return solver.solve(max_solutions, domains=domains, stop=stop_event.is_set)
+
+def _chunks(records: Iterable[dict], size: int) -> Iterator[List[Tuple[int, dict]]]:
+    chunk: List[Tuple[int, dict]] = []
+    for item in enumerate(records):
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_puzzles(records: Iterable[dict], max_workers: Optional[int] = None,
+                max_iterations: Optional[int] = None, all_solutions: bool = False,
+                timeout: Optional[float] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[PuzzleResult]:
+    """Solve a stream of puzzles in parallel, yielding results as chunks finish
+
+    Records are read lazily, with a bounded number of chunks in flight, so
+    arbitrarily long streams run in constant memory. Without
+    ``all_solutions`` each search stops at a second solution, which is
+    enough to decide uniqueness.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_iterations = max_iterations or default_max_iterations()
+    chunks = _chunks(records, chunk_size)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(_solve_chunk, chunk, max_iterations,
+                                        all_solutions, timeout))
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in pending:
+            yield from future.result()
+
+def solve_split(record: dict, executor: Executor, parts: int, stop_event,
+                max_iterations: Optional[int] = None, all_solutions: bool = False,
+                index: int = 0, timeout: Optional[float] = None) -> PuzzleResult:
+    """Solve one hard puzzle by searching independent subtrees in parallel
+
+    Each subtree gets its own ``max_iterations`` budget. Unless
+    ``all_solutions`` is set, the remaining subtrees are told to stop once
+    two solutions are found, since uniqueness is already decided. The
+    ``timeout`` covers the whole puzzle, including subtrees still queued.
+    """
+    start = time.perf_counter()
+    max_iterations = max_iterations or default_max_iterations()
+    max_solutions = None if all_solutions else 2
+    try:
+        solver = PuzzleSolver(Puzzle.from_dict(record), max_iterations)
+        subproblems = solver.split(parts)
+    except Exception as e:
+        return PuzzleResult(index, 'error', time.perf_counter() - start,
+                            error=str(e), name=record.get('name'))
+    stop_event.clear()
+    combined = SolveResult()
+    deadline = time.time() + timeout if timeout else None
+    futures = [
+        executor.submit(_solve_subtree, record, domains, max_iterations, max_solutions,
+                        stop_event, deadline)
+        for domains in subproblems
+    ]
+    pending = set(futures)
+    timed_out = False
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                result = future.result()
+            except TimeLimitExceeded:
+                timed_out = True
+                continue
+            combined.solutions.extend(result.solutions)
+            combined.nodes += result.nodes
+            combined.complete = combined.complete and result.complete
+        if timed_out or (max_solutions is not None and len(combined.solutions) >= max_solutions):
+            stop_event.set()
+    if timed_out:
+        return PuzzleResult(index, 'timeout', time.perf_counter() - start, combined.nodes,
+                            error=f"Exceeded {timeout}s time limit", name=record.get('name'))
+    if max_solutions is not None and len(combined.solutions) >= max_solutions:
+        del combined.solutions[max_solutions:]
+    return _from_solve(index, record, combined, time.perf_counter() - start)
+
+def solve_portfolio(record: dict, executor: Executor, stop_event,
+                    orderings: Sequence[str] = ORDERINGS,
+                    max_iterations: Optional[int] = None, all_solutions: bool = False,
+                    timeout: Optional[float] = None, index: int = 0) -> PuzzleResult:
+    """Race several variable orderings on one puzzle and keep the first decisive answer"""
+    start = time.perf_counter()
+    max_iterations = max_iterations or default_max_iterations()
+    stop_event.clear()
+    pending = {
+        executor.submit(_solve_record, index, record, max_iterations, all_solutions,
+                        timeout, ordering, stop_event)
+        for ordering in orderings
+    }
+    finished: List[PuzzleResult] = []
+    best: Optional[PuzzleResult] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            result = future.result()
+            finished.append(result)
+            if best is None and result.status not in ('incomplete', 'timeout', 'error'):
+                best = result
+                stop_event.set()
+    # Nodes are the winner's; elapsed is the wall time of the whole race
+    best = best or finished[0]
+    best.elapsed = time.perf_counter() - start
+    return best
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for batch puzzle solving"""
+    parser = argparse.ArgumentParser(
+        description="Solve and verify a JSONL stream of logic puzzles"
+    )
+    parser.add_argument('input', type=Path,
+                        help="JSONL file of puzzle records, or - for standard input")
+    parser.add_argument('-o', '--output', type=Path,
+                        help="JSONL file for results (default: stdout)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument('-t', '--timeout', type=float, default=None,
+                        help="Per-puzzle time limit in seconds")
+    parser.add_argument('--max-iterations', type=int, default=None,
+                        help="Search node limit per puzzle (default: from settings)")
+    parser.add_argument('--all-solutions', action='store_true',
+                        help="Enumerate every solution instead of stopping at a second one")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Puzzles per worker task (default: {DEFAULT_CHUNK_SIZE})")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--split', action='store_true',
+                      help="Split each puzzle's search tree across the workers")
+    mode.add_argument('--portfolio', action='store_true',
+                      help=f"Race the variable orderings {', '.join(ORDERINGS)} on each puzzle")
+    args = parser.parse_args(argv)
+
+    records = iter_records(args.input)
+    workers = args.workers or os.cpu_count() or 1
+    out = open(args.output, 'w') if args.output else sys.stdout
+    counts = {}
+    start = time.perf_counter()
+
+    def write(result: PuzzleResult) -> None:
+        counts[result.status] = counts.get(result.status, 0) + 1
+        out.write(json.dumps(result.to_dict()) + "\n")
+        out.flush()
+
+    try:
+        if args.split or args.portfolio:
+            with multiprocessing.Manager() as manager, \
+                    ProcessPoolExecutor(max_workers=workers) as executor:
+                stop_event = manager.Event()
+                for index, record in enumerate(records):
+                    if args.split:
+                        write(solve_split(record, executor, workers * SPLIT_FACTOR, stop_event,
+                                          args.max_iterations, args.all_solutions, index,
+                                          args.timeout))
+                    else:
+                        write(solve_portfolio(record, executor, stop_event, ORDERINGS,
+                                              args.max_iterations, args.all_solutions,
+                                              args.timeout, index))
+        else:
+            for result in run_puzzles(records, workers, args.max_iterations,
+                                      args.all_solutions, args.timeout, args.chunk_size):
+                write(result)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    rate = total / elapsed if elapsed else 0.0
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"Verified {total} puzzles in {elapsed:.2f} s ({rate:.1f}/s): {summary}",
+          file=sys.stderr)
+    sys.exit(1 if counts.get('error') or counts.get('timeout') else 0)
+
+if __name__ == '__main__':
+    main()
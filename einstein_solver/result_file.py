@@ -0,0 +1,432 @@
+import json
+import struct
+import sys
+from array import array
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+import sympy as sp
+from sympy.core.function import AppliedUndef
+from sympy.tensor.array import NDimArray
+
+from .utils import MetricData
+
+# Results files start with MAGIC and a format version; readers reject newer versions
+MAGIC = b'EFSR'
+FORMAT_VERSION = 1
+SUFFIX = '.efr'
+
+_PREAMBLE = struct.Struct('<4sHI')
+
+# Node kinds of the expression table
+(_INTEGER, _RATIONAL, _FLOAT, _SYMBOL, _SINGLETON,
+ _ADD, _MUL, _POW, _FUNCTION, _UNDEFINED, _BASIC) = range(11)
+_OPERATORS = {_ADD: sp.Add, _MUL: sp.Mul, _POW: sp.Pow}
+
+Index = Union[Tuple[int, ...], str]
+
+class ResultFormatError(ValueError):
+    """Raised for data that is not a results file this version can read"""
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data: memoryview, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def _zigzag(value: int) -> int:
+    return 2 * value if value >= 0 else -2 * value - 1
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+# Independent components of symmetric tensors: each symmetry maps an index to
+# its canonical index and a sign, or None for a component that must vanish
+
+def _symmetric(index: Tuple[int, ...]) -> Optional[Tuple[Tuple[int, ...], int]]:
+    return tuple(sorted(index)), 1
+
+def _symmetric_last(index: Tuple[int, ...]) -> Optional[Tuple[Tuple[int, ...], int]]:
+    i, j, k = index
+    return (i, min(j, k), max(j, k)), 1
+
+def _riemann(index: Tuple[int, ...]) -> Optional[Tuple[Tuple[int, ...], int]]:
+    a, b, c, d = index
+    if a == b or c == d:
+        return None
+    sign = 1
+    if a > b:
+        a, b, sign = b, a, -sign
+    if c > d:
+        c, d, sign = d, c, -sign
+    if (a, b) > (c, d):
+        a, b, c, d = c, d, a, b
+    return (a, b, c, d), sign
+
+_SYMMETRIES = {'symmetric': _symmetric, 'symmetric_last': _symmetric_last, 'riemann': _riemann}
+
+def _detect_symmetry(value: Any, shape: Tuple[int, ...]) -> str:
+    """Strongest symmetry the tensor has, checked on every component"""
+    if len(shape) < 2 or len(set(shape)) != 1:
+        return 'none'
+    candidates = {2: 'symmetric', 3: 'symmetric_last', 4: 'riemann'}
+    name = candidates.get(len(shape))
+    if name is None:
+        return 'none'
+    canonical = _SYMMETRIES[name]
+    for index in product(range(shape[0]), repeat=len(shape)):
+        mapped = canonical(index)
+        expr = value[index]
+        if mapped is None:
+            if expr != 0:
+                return 'none'
+        elif mapped[0] != index and expr != mapped[1] * value[mapped[0]]:
+            return 'none'
+    return name
+
+def _flat_index(shape: Tuple[int, ...], index: Tuple[int, ...]) -> int:
+    flat = 0
+    for size, i in zip(shape, index):
+        if not 0 <= i < size:
+            raise IndexError(f"Index {index} out of range for shape {shape}")
+        flat = flat * size + i
+    return flat
+
+def _unflatten(shape: Tuple[int, ...], flat: int) -> Tuple[int, ...]:
+    index = []
+    for size in reversed(shape):
+        index.append(flat % size)
+        flat //= size
+    return tuple(reversed(index))
+
+class _Encoder:
+    """Post-order expression table in which equal subtrees are stored once"""
+    def __init__(self):
+        self.nodes = bytearray()
+        self.offsets = array('I')
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._ids: Dict[sp.Basic, int] = {}
+
+    def _string(self, text: str) -> int:
+        index = self._string_ids.get(text)
+        if index is None:
+            index = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    def add(self, expr: sp.Basic) -> int:
+        """Node ID of an expression, adding it and any new subexpressions"""
+        known = self._ids.get(expr)
+        if known is not None:
+            return known
+        # Iterative post-order walk, so deep expressions cannot hit the recursion limit
+        stack = [(expr, False)]
+        while stack:
+            node, ready = stack.pop()
+            if node in self._ids:
+                continue
+            children = () if node.is_Atom else node.args
+            if ready or not children:
+                self._ids[node] = self._emit(node)
+                continue
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children) if child not in self._ids)
+        return self._ids[expr]
+
+    def _emit(self, expr: sp.Basic) -> int:
+        out = bytearray()
+        if isinstance(expr, sp.Integer):
+            out.append(_INTEGER)
+            _write_varint(out, _zigzag(int(expr)))
+        elif isinstance(expr, sp.Rational):
+            out.append(_RATIONAL)
+            _write_varint(out, _zigzag(int(expr.p)))
+            _write_varint(out, int(expr.q))
+        elif isinstance(expr, sp.Float):
+            out.append(_FLOAT)
+            _write_varint(out, self._string(str(expr)))
+            _write_varint(out, expr._prec)
+        elif isinstance(expr, sp.Symbol):
+            out.append(_SYMBOL)
+            _write_varint(out, self._string(expr.name))
+            _write_varint(out, self._string(json.dumps(expr.assumptions0, sort_keys=True)))
+        elif expr.is_Atom:
+            if getattr(sp.S, type(expr).__name__, None) is not expr:
+                raise TypeError(f"Cannot store {type(expr).__name__} '{expr}'")
+            out.append(_SINGLETON)
+            _write_varint(out, self._string(type(expr).__name__))
+        else:
+            kind = next((k for k, cls in _OPERATORS.items() if type(expr) is cls), None)
+            if kind is not None:
+                out.append(kind)
+            elif isinstance(expr, AppliedUndef):
+                out.append(_UNDEFINED)
+                _write_varint(out, self._string(expr.func.__name__))
+            else:
+                name = type(expr).__name__
+                if getattr(sp, name, None) is not type(expr):
+                    raise TypeError(f"Cannot store {name} '{expr}'")
+                out.append(_FUNCTION if isinstance(expr, sp.Function) else _BASIC)
+                _write_varint(out, self._string(name))
+            _write_varint(out, len(expr.args))
+            for arg in expr.args:
+                _write_varint(out, self._ids[arg])
+        self.offsets.append(len(self.nodes))
+        self.nodes += out
+        return len(self.offsets) - 1
+
+def _stage_layout(value: Any) -> Tuple[str, Tuple[int, ...], Tuple[str, ...], List[Any]]:
+    if isinstance(value, Mapping):
+        return 'mapping', (len(value),), tuple(value), [sp.sympify(v) for v in value.values()]
+    if isinstance(value, sp.MatrixBase):
+        return 'matrix', tuple(map(int, value.shape)), (), list(value)
+    if isinstance(value, NDimArray):
+        return 'array', tuple(map(int, value.shape)), (), sp.flatten(value)
+    return 'scalar', (), (), [sp.sympify(value)]
+
+def encodable(value: Any) -> bool:
+    """Whether a stage value can be stored: sympy objects or a dict of them"""
+    if isinstance(value, Mapping):
+        return all(isinstance(v, sp.Basic) for v in value.values())
+    return isinstance(value, (sp.Basic, sp.MatrixBase, NDimArray))
+
+def dumps(results: Mapping[str, Any], metric_data: Optional[MetricData] = None) -> bytes:
+    """Encode result stages, and optionally the metric they came from, as bytes
+
+    Stages may be sympy expressions, Matrices, Arrays or dicts of
+    expressions (such as the invariants). Zero components are left out and
+    symmetric tensors keep only their independent components.
+    """
+    encoder = _Encoder()
+    stages = []
+    for name, value in results.items():
+        kind, shape, keys, flat = _stage_layout(value)
+        symmetry = 'none'
+        if kind in ('matrix', 'array'):
+            symmetry = _detect_symmetry(sp.ImmutableDenseNDimArray(flat, shape), shape)
+        canonical = _SYMMETRIES.get(symmetry)
+        entries = []
+        for position, expr in enumerate(flat):
+            if expr == 0:
+                continue
+            if canonical is not None:
+                index = _unflatten(shape, position)
+                if canonical(index)[0] != index:
+                    continue
+            entries.append([position, encoder.add(expr)])
+        stages.append({'name': name, 'kind': kind, 'shape': list(shape), 'keys': list(keys),
+                       'symmetry': symmetry, 'entries': entries})
+
+    header = json.dumps({
+        'version': FORMAT_VERSION,
+        'sympy': sp.__version__,
+        'metric': metric_data.to_dict() if metric_data is not None else None,
+        'strings': encoder.strings,
+        'stages': stages,
+        'nodes': len(encoder.offsets)
+    }, separators=(',', ':')).encode('utf-8')
+    offsets = array('I', encoder.offsets)
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+    return b''.join([_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)), header,
+                     offsets.tobytes(), bytes(encoder.nodes)])
+
+def save_results(path: Union[str, Path], results: Mapping[str, Any],
+                 metric_data: Optional[MetricData] = None) -> int:
+    """Write a results file, returning its size in bytes"""
+    data = dumps(results, metric_data)
+    Path(path).write_bytes(data)
+    return len(data)
+
+class ResultFile:
+    """Lazily decoded results file
+
+    Only the header is parsed up front. Expressions are rebuilt node by node
+    the first time a component needs them, and shared subexpressions are
+    rebuilt once.
+    """
+    def __init__(self, data: bytes):
+        if len(data) < _PREAMBLE.size:
+            raise ResultFormatError("Data is too short for a results file")
+        magic, version, header_size = _PREAMBLE.unpack_from(data)
+        if magic != MAGIC:
+            raise ResultFormatError("Not a results file")
+        if version > FORMAT_VERSION:
+            raise ResultFormatError(
+                f"Results file version {version} is newer than supported ({FORMAT_VERSION})"
+            )
+        start = _PREAMBLE.size
+        try:
+            header = json.loads(bytes(data[start:start + header_size]).decode('utf-8'))
+        except ValueError as e:
+            raise ResultFormatError(f"Corrupt results file header: {e}") from e
+        self.version = version
+        self.sympy_version: str = header['sympy']
+        metric = header['metric']
+        self.metric_data = MetricData.from_dict(metric) if metric is not None else None
+        self._strings: List[str] = header['strings']
+        self._stages = {stage['name']: stage for stage in header['stages']}
+        for stage in self._stages.values():
+            stage['shape'] = tuple(stage['shape'])
+            stage['entries'] = dict(stage['entries'])
+
+        count = header['nodes']
+        offsets_start = start + header_size
+        self._offsets = array('I')
+        self._offsets.frombytes(data[offsets_start:offsets_start + 4 * count])
+        if sys.byteorder == 'big':
+            self._offsets.byteswap()
+        self._data = memoryview(data)[offsets_start + 4 * count:]
+        self._nodes: List[Optional[sp.Basic]] = [None] * count
+
+    @classmethod
+    def read(cls, path: Union[str, Path]) -> 'ResultFile':
+        return cls(Path(path).read_bytes())
+
+    @property
+    def stages(self) -> Tuple[str, ...]:
+        """Stage names, in the order they were written"""
+        return tuple(self._stages)
+
+    def shape(self, name: str) -> Tuple[int, ...]:
+        return self._stages[name]['shape']
+
+    def _node(self, node_id: int) -> sp.Basic:
+        expr = self._nodes[node_id]
+        if expr is not None:
+            return expr
+        # Children always have smaller IDs, so decode missing ones bottom-up
+        pending = [node_id]
+        while pending:
+            current = pending[-1]
+            if self._nodes[current] is not None:
+                pending.pop()
+                continue
+            missing = [child for child in self._children(current)
+                       if self._nodes[child] is None]
+            if missing:
+                pending.extend(missing)
+                continue
+            self._nodes[current] = self._decode(current)
+            pending.pop()
+        return self._nodes[node_id]
+
+    def _children(self, node_id: int) -> List[int]:
+        data = self._data
+        pos = self._offsets[node_id]
+        kind = data[pos]
+        if kind < _ADD:
+            return []
+        pos += 1
+        if kind in (_FUNCTION, _UNDEFINED, _BASIC):
+            _, pos = _read_varint(data, pos)
+        count, pos = _read_varint(data, pos)
+        children = []
+        for _ in range(count):
+            child, pos = _read_varint(data, pos)
+            children.append(child)
+        return children
+
+    def _decode(self, node_id: int) -> sp.Basic:
+        data = self._data
+        pos = self._offsets[node_id]
+        kind = data[pos]
+        pos += 1
+        if kind == _INTEGER:
+            return sp.Integer(_unzigzag(_read_varint(data, pos)[0]))
+        if kind == _RATIONAL:
+            p, pos = _read_varint(data, pos)
+            return sp.Rational(_unzigzag(p), _read_varint(data, pos)[0])
+        if kind == _FLOAT:
+            text, pos = _read_varint(data, pos)
+            return sp.Float(self._strings[text], precision=_read_varint(data, pos)[0])
+        if kind == _SYMBOL:
+            name, pos = _read_varint(data, pos)
+            assumptions = json.loads(self._strings[_read_varint(data, pos)[0]])
+            return sp.Symbol(self._strings[name], **assumptions)
+        if kind == _SINGLETON:
+            return getattr(sp.S, self._strings[_read_varint(data, pos)[0]])
+
+        name = None
+        if kind in (_FUNCTION, _UNDEFINED, _BASIC):
+            name, pos = _read_varint(data, pos)
+            name = self._strings[name]
+        args = [self._nodes[child] for child in self._children(node_id)]
+        if kind in _OPERATORS:
+            # The stored trees are already canonical, so skip re-evaluation
+            return _OPERATORS[kind](*args, evaluate=False)
+        if kind == _UNDEFINED:
+            return sp.Function(name)(*args)
+        cls = getattr(sp, name, None)
+        if not isinstance(cls, type) or not issubclass(cls, sp.Basic):
+            raise ResultFormatError(f"Unknown expression type '{name}'")
+        return cls(*args, evaluate=False) if kind == _FUNCTION else cls(*args)
+
+    def component(self, name: str, index: Index = ()) -> sp.Expr:
+        """One component of a stage, decoding only the expressions it uses
+
+        ``index`` is a tuple for tensors, a key for mappings and () for scalars.
+        """
+        stage = self._stages[name]
+        sign = 1
+        if stage['kind'] == 'mapping':
+            position = stage['keys'].index(index)
+        else:
+            index = tuple(index)
+            if len(index) != len(stage['shape']):
+                raise IndexError(f"Stage '{name}' has shape {stage['shape']}")
+            canonical = _SYMMETRIES.get(stage['symmetry'])
+            if canonical is not None:
+                mapped = canonical(index)
+                if mapped is None:
+                    return sp.Integer(0)
+                index, sign = mapped
+            position = _flat_index(stage['shape'], index) if index else 0
+        node = stage['entries'].get(position)
+        if node is None:
+            return sp.Integer(0)
+        expr = self._node(node)
+        return -expr if sign < 0 else expr
+
+    def nonzero(self, name: str) -> Iterator[Tuple[Index, sp.Expr]]:
+        """Stored (index, expression) pairs: the nonzero independent components"""
+        stage = self._stages[name]
+        for position, node in sorted(stage['entries'].items()):
+            if stage['kind'] == 'mapping':
+                index: Index = stage['keys'][position]
+            else:
+                index = _unflatten(stage['shape'], position)
+            yield index, self._node(node)
+
+    def stage(self, name: str) -> Any:
+        """A whole stage in the form it was saved from"""
+        stage = self._stages[name]
+        kind, shape = stage['kind'], stage['shape']
+        if kind == 'scalar':
+            return self.component(name)
+        if kind == 'mapping':
+            return {key: self.component(name, key) for key in stage['keys']}
+        flat = [self.component(name, index) for index in product(*(range(s) for s in shape))]
+        if kind == 'matrix':
+            return sp.Matrix(*shape, flat)
+        return sp.ImmutableDenseNDimArray(flat, shape)
+
+    def results(self) -> Dict[str, Any]:
+        """Every stage, in the order they were written"""
+        return {name: self.stage(name) for name in self._stages}
+
+def load_results(path: Union[str, Path]) -> ResultFile:
+    """Open a results file for lazy reading"""
+    return ResultFile.read(path)
@@ -0,0 +1,216 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTreeView, QTextEdit, QComboBox, QLabel, QSplitter
+)
+from PyQt6.QtCore import Qt, QAbstractItemModel, QModelIndex
+from collections import OrderedDict
+from itertools import product
+from typing import Any, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# Characters of an expression shown in a row; the detail pane shows all of it
+DISPLAY_CHARS = 300
+# Component strings kept after they scroll out of view
+STRING_CACHE_SIZE = 2000
+FORMATS = ('Plain', 'Pretty', 'LaTeX')
+
+def components(value: Any) -> Iterator[Tuple[str, Any]]:
+    """(label, expression) for each component worth showing, without converting to text
+
+    Zero tensor components are skipped; scalars and named invariants are
+    always listed, since a zero there is a result in itself.
+    """
+    if isinstance(value, dict):
+        for key, expr in value.items():
+            yield str(key), expr
+        return
+    shape = getattr(value, 'shape', None)
+    if not shape:
+        yield "", value
+        return
+    for index in product(*(range(size) for size in shape)):
+        expr = value[index]
+        if expr != 0:
+            yield "[" + ", ".join(str(i) for i in index) + "]", expr
+
+def write_results(stages: Iterable[Tuple[str, Any]], stream: TextIO) -> int:
+    """Write nonzero components one line at a time, returning the line count
+
+    Each component is converted and written on its own, so the full text
+    is never held in memory.
+    """
+    lines = 0
+    for name, value in stages:
+        for label, expr in components(value):
+            stream.write(f"{name}{label} = {expr}\n")
+            lines += 1
+    return lines
+
+def render(expr: Any, fmt: str) -> str:
+    """Full text of an expression in one of ``FORMATS``"""
+    if fmt == 'Plain':
+        return str(expr)
+    import sympy as sp
+
+    expr = sp.sympify(expr)
+    return sp.pretty(expr, use_unicode=True) if fmt == 'Pretty' else sp.latex(expr)
+
+class _Stage:
+    def __init__(self, name: str, title: str, value: Any):
+        self.name = name
+        self.title = title
+        self.value = value
+        self.entries: List[Tuple[str, Any]] = list(components(value))
+        shape = getattr(value, 'shape', None)
+        self.total = 1
+        for size in shape or ():
+            self.total *= size
+
+class ResultsModel(QAbstractItemModel):
+    """Tree of solved stages and their nonzero components
+
+    Expressions are turned into text only when a view asks for a visible
+    row, and a bounded number of those strings are kept.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._stages: List[_Stage] = []
+        self._strings: 'OrderedDict[Tuple[int, int], str]' = OrderedDict()
+
+    def set_stage(self, name: str, title: str, value: Any) -> None:
+        """Add a stage, or replace it if it was already shown"""
+        stage = _Stage(name, title, value)
+        for row, existing in enumerate(self._stages):
+            if existing.name == name:
+                self.beginResetModel()
+                self._stages[row] = stage
+                self._strings.clear()
+                self.endResetModel()
+                return
+        row = len(self._stages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._stages.append(stage)
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._stages = []
+        self._strings.clear()
+        self.endResetModel()
+
+    def stages(self) -> List[Tuple[str, Any]]:
+        """(name, value) of every stage, in display order"""
+        return [(stage.name, stage.value) for stage in self._stages]
+
+    def expression(self, index: QModelIndex) -> Optional[Any]:
+        """The component behind a row, or None for a stage row"""
+        stage = index.internalPointer() if index.isValid() else None
+        if stage is None:
+            return None
+        return stage.entries[index.row()][1]
+
+    def _text(self, stage_row: int, row: int, expr: Any) -> str:
+        key = (stage_row, row)
+        text = self._strings.get(key)
+        if text is None:
+            text = str(expr)
+            if len(text) > DISPLAY_CHARS:
+                text = text[:DISPLAY_CHARS] + " …"
+            self._strings[key] = text
+            if len(self._strings) > STRING_CACHE_SIZE:
+                self._strings.popitem(last=False)
+        else:
+            self._strings.move_to_end(key)
+        return text
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column)
+        return self.createIndex(row, column, self._stages[parent.row()])
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        stage = index.internalPointer() if index.isValid() else None
+        if stage is None:
+            return QModelIndex()
+        return self.createIndex(self._stages.index(stage), 0)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self._stages)
+        if parent.internalPointer() is None and parent.column() == 0:
+            return len(self._stages[parent.row()].entries)
+        return 0
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 2
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return ("Component", "Value")[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        stage = index.internalPointer()
+        if stage is None:
+            stage = self._stages[index.row()]
+            if index.column() == 0:
+                return stage.title
+            if stage.total > 1:
+                return f"{len(stage.entries)} nonzero of {stage.total}"
+            return None
+        label, expr = stage.entries[index.row()]
+        if index.column() == 0:
+            return stage.name + label
+        return self._text(self._stages.index(stage), index.row(), expr)
+
+class ResultsView(QWidget):
+    """Tree of result components with a detail pane for the selected one"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model = ResultsModel(self)
+
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        # Lets the view lay out rows without asking every row for its text
+        self.tree.setUniformRowHeights(True)
+        self.tree.setAlternatingRowColors(True)
+        self.tree.setColumnWidth(0, 240)
+        self.tree.selectionModel().currentChanged.connect(self.show_detail)
+
+        self.format_box = QComboBox()
+        self.format_box.addItems(FORMATS)
+        self.format_box.currentTextChanged.connect(lambda _: self.show_detail())
+        self.detail = QTextEdit()
+        self.detail.setReadOnly(True)
+        self.detail.setStyleSheet("QTextEdit { font-family: monospace; }")
+
+        detail_widget = QWidget()
+        detail_layout = QVBoxLayout(detail_widget)
+        detail_layout.setContentsMargins(0, 0, 0, 0)
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel("Show as:"))
+        format_layout.addWidget(self.format_box)
+        format_layout.addStretch()
+        detail_layout.addLayout(format_layout)
+        detail_layout.addWidget(self.detail)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        splitter.addWidget(self.tree)
+        splitter.addWidget(detail_widget)
+        splitter.setSizes([300, 100])
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(splitter)
+
+    def show_detail(self, *args):
+        expr = self.model.expression(self.tree.currentIndex())
+        if expr is None:
+            self.detail.clear()
+            return
+        try:
+            self.detail.setPlainText(render(expr, self.format_box.currentText()))
+        except Exception as e:
+            self.detail.setPlainText(f"Could not render: {e}")
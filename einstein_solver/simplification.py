@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+import sympy as sp
+from sympy.tensor.array import NDimArray
+
+from .utils import TimeLimitExceeded, time_limit, time_limit_enforced
+
+# Strategies ordered from cheap to expensive
+STRATEGIES: Dict[str, Callable[[sp.Expr], sp.Expr]] = {
+    'factor_terms': sp.factor_terms,
+    'cancel': sp.cancel,
+    'trigsimp': sp.trigsimp,
+    'simplify': sp.simplify
+}
+DEFAULT_STRATEGIES = tuple(STRATEGIES)
+DEFAULT_BUDGET = 2.0
+
+@dataclass
+class SimplifyStats:
+    """Summary of a simplification run"""
+    components: int = 0
+    timed_out: int = 0
+    ops_before: int = 0
+    ops_after: int = 0
+    elapsed: float = 0.0
+    strategy_wins: Dict[str, int] = field(default_factory=dict)
+
+def simplify_with_budget(expr: sp.Expr, budget: Optional[float] = DEFAULT_BUDGET,
+                         strategies: Sequence[str] = DEFAULT_STRATEGIES
+                         ) -> Tuple[sp.Expr, Optional[str], bool]:
+    """Apply strategies in order within a wall-clock budget, keeping the smallest form
+
+    Each strategy runs on the best form found so far and is kept only if it
+    lowers the operation count. Returns (expression, winning strategy or
+    None, whether the budget ran out). Where the budget cannot be enforced
+    (off the main thread, or without SIGALRM) the expression is returned
+    unsimplified and counted as timed out, rather than simplified without
+    a limit.
+    """
+    best, best_ops, winner = expr, sp.count_ops(expr), None
+    if best_ops == 0:
+        return best, winner, False
+    if budget and not time_limit_enforced():
+        logging.getLogger(__name__).warning(
+            "Simplification budget cannot be enforced in thread %s; skipping simplification",
+            threading.current_thread().name
+        )
+        return best, winner, True
+    deadline = time.monotonic() + budget if budget else None
+    for name in strategies:
+        remaining = deadline - time.monotonic() if deadline else None
+        if remaining is not None and remaining <= 0:
+            return best, winner, True
+        try:
+            with time_limit(remaining):
+                candidate = STRATEGIES[name](best)
+        except TimeLimitExceeded:
+            # An enclosing limit (e.g. a batch job timeout) fired first
+            if deadline is None or time.monotonic() < deadline:
+                raise
+            return best, winner, True
+        ops = sp.count_ops(candidate)
+        if ops < best_ops:
+            best, best_ops, winner = candidate, ops, name
+    return best, winner, False
+
+def _simplify_job(expr: sp.Expr, budget: Optional[float],
+                  strategies: Sequence[str]) -> Tuple[sp.Expr, Optional[str], bool]:
+    return simplify_with_budget(expr, budget, strategies)
+
+def _components(value: Any) -> List[sp.Expr]:
+    if isinstance(value, Mapping):
+        return [sp.sympify(v) for v in value.values()]
+    if isinstance(value, sp.MatrixBase):
+        return list(value)
+    if isinstance(value, NDimArray):
+        return sp.flatten(value)
+    return [sp.sympify(value)]
+
+def _rebuild(value: Any, components: List[sp.Expr]) -> Any:
+    if isinstance(value, Mapping):
+        return dict(zip(value, components))
+    if isinstance(value, sp.MatrixBase):
+        return sp.Matrix(value.rows, value.cols, components)
+    if isinstance(value, NDimArray):
+        return sp.ImmutableDenseNDimArray(components, value.shape)
+    return components[0]
+
+def simplify_results(results: Mapping[str, Any], budget: Optional[float] = DEFAULT_BUDGET,
+                     strategies: Sequence[str] = DEFAULT_STRATEGIES,
+                     max_workers: Optional[int] = None,
+                     stages: Optional[Sequence[str]] = None) -> Tuple[Dict[str, Any], SimplifyStats]:
+    """Simplify every distinct nonzero component of the given stages in parallel
+
+    ``budget`` is the wall-clock limit per component in seconds. Identical
+    components (e.g. symmetric tensor entries) are simplified once. With
+    ``max_workers=1`` everything runs in this process, unless the budget
+    cannot be enforced on the calling thread; then a single worker process
+    is used.
+    """
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown simplification strategies: {', '.join(unknown)}")
+    stages = [name for name in (stages or results) if name != 'metric']
+    start = time.perf_counter()
+
+    flattened = {name: _components(results[name]) for name in stages}
+    distinct = list(dict.fromkeys(
+        expr for components in flattened.values() for expr in components if expr != 0
+    ))
+
+    # Worker processes run jobs on their main thread, where the budget is enforced
+    in_process = (max_workers == 1 or len(distinct) <= 1) and (
+        not budget or time_limit_enforced()
+    )
+    if not distinct or in_process:
+        outcomes = [simplify_with_budget(expr, budget, strategies) for expr in distinct]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(
+                _simplify_job, distinct, [budget] * len(distinct), [strategies] * len(distinct)
+            ))
+
+    simplified = {expr: outcome[0] for expr, outcome in zip(distinct, outcomes)}
+    stats = SimplifyStats(components=len(distinct))
+    for expr, (new_expr, winner, timed_out) in zip(distinct, outcomes):
+        stats.ops_before += sp.count_ops(expr)
+        stats.ops_after += sp.count_ops(new_expr)
+        stats.timed_out += timed_out
+        if winner is not None:
+            stats.strategy_wins[winner] = stats.strategy_wins.get(winner, 0) + 1
+
+    output = dict(results)
+    for name, components in flattened.items():
+        output[name] = _rebuild(results[name], [simplified.get(c, c) for c in components])
+    stats.elapsed = time.perf_counter() - start
+    return output, stats
+
+class BudgetedSimplifier:
+    """Callable for CurvatureKernel that simplifies each component within a budget"""
+    def __init__(self, budget: Optional[float] = DEFAULT_BUDGET,
+                 strategies: Sequence[str] = DEFAULT_STRATEGIES):
+        self.budget = budget
+        self.strategies = tuple(strategies)
+
+    def __call__(self, expr: sp.Expr) -> sp.Expr:
+        return simplify_with_budget(expr, self.budget, self.strategies)[0]
@@ -1,5 +1,13 @@
+import asyncio
+import json
+import threading
+import time
+import aiohttp
 import pytest
+from aiohttp import web
 from einstein_solver.analyzer import *
+from einstein_solver.cache import ResponseCache
+from einstein_solver.utils import APIConfig, MetricData
 
 def test_puzzle_solving():
     # Test cases for puzzle solving logic
@@ -7,4 +15,228 @@ def test_puzzle_solving():
 
 def test_constraint_validation():
     # Test cases for constraint validation
-    pass 
\ No newline at end of file
+    pass 
+
+METRIC = MetricData(components=[['r^2', '0'], ['0', 'r^2']], dimension=2,
+                    coordinates=['\\theta', '\\phi'])
+
+class StubServer:
+    """Local /analyze endpoint on its own event loop thread"""
+    def __init__(self, delay=0.0, stream_words=None, throttle=0, status=None):
+        self.delay = delay
+        # When set, every request that is not throttled gets this bodiless status
+        self.status = status
+        # Number of initial requests answered with 429 and a Retry-After
+        self.throttle = throttle
+        # When set, streaming requests get these words as server-sent events
+        self.stream_words = stream_words
+        self.disconnected = threading.Event()
+        self.requests = []
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.url = asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_post('/analyze', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def handle(self, request):
+        body = await request.json()
+        self.requests.append((body, request.transport.get_extra_info('peername')))
+        if len(self.requests) <= self.throttle:
+            return web.Response(status=429, headers={'Retry-After': '0.2'})
+        if self.status is not None:
+            return web.Response(status=self.status)
+        if body.get('stream') and self.stream_words is not None:
+            return await self.stream(request)
+        await asyncio.sleep(self.delay)
+        return web.json_response({'analysis': f"{body['analysis_type']} done"})
+
+    async def stream(self, request):
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        try:
+            for word in self.stream_words:
+                await response.write(f"data: {json.dumps({'delta': word})}\n\n".encode())
+                await asyncio.sleep(self.delay)
+            await response.write(b"data: [DONE]\n\n")
+        except (ConnectionResetError, asyncio.CancelledError):
+            self.disconnected.set()
+            raise
+        return response
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+@pytest.fixture
+def stub_server():
+    server = StubServer(delay=0.3)
+    yield server
+    server.close()
+
+def test_analyses_run_concurrently_on_pooled_connections(stub_server):
+    service = AnalysisService(APIConfig(api_url=stub_server.url, max_concurrent=3, rate_limit=0))
+    try:
+        start = time.perf_counter()
+        results = service.analyze(METRIC, ANALYSIS_TYPES).result(timeout=10)
+        elapsed = time.perf_counter() - start
+        assert results == {t: f"{t} done" for t in ANALYSIS_TYPES}
+        assert elapsed < 0.3 * 2
+
+        service.analyze(METRIC, ANALYSIS_TYPES).result(timeout=10)
+        connections = {peer for _, peer in stub_server.requests}
+        assert len(stub_server.requests) == 6
+        assert len(connections) <= 3
+    finally:
+        service.close()
+
+def test_llm_analyzer_uses_service(stub_server):
+    service = AnalysisService(APIConfig(api_url=stub_server.url, rate_limit=0))
+    try:
+        analyzer = LLMAnalyzer(METRIC, service.api_config, 'validate', service=service)
+        received = []
+        analyzer.finished.connect(received.append)
+        analyzer.run()
+        assert received == ['validate done']
+        assert stub_server.requests[0][0]['metric_data'] == METRIC.to_dict()
+    finally:
+        service.close()
+
+def test_repeated_and_concurrent_requests_share_one_call(stub_server, tmp_path):
+    cache = ResponseCache(tmp_path / 'analyses.sqlite3')
+    service = AnalysisService(APIConfig(api_url=stub_server.url, rate_limit=0), cache)
+    try:
+        first = service.submit(METRIC, 'validate')
+        second = service.submit(METRIC, 'validate')
+        assert first.result(timeout=10) == second.result(timeout=10) == 'validate done'
+        assert len(stub_server.requests) == 1
+    finally:
+        service.close()
+
+    # A new service over the same file answers from disk
+    service = AnalysisService(APIConfig(api_url=stub_server.url, rate_limit=0),
+                              ResponseCache(tmp_path / 'analyses.sqlite3'))
+    try:
+        assert service.submit(METRIC, 'validate').result(timeout=10) == 'validate done'
+        assert len(stub_server.requests) == 1
+        assert service.cache.hits == 1
+    finally:
+        service.close()
+
+def test_response_cache_expires_entries(tmp_path):
+    cache = ResponseCache(tmp_path / 'analyses.sqlite3', ttl=0.05)
+    cache.put('key', 'text')
+    assert cache.get('key') == 'text'
+    time.sleep(0.1)
+    assert cache.get('key') is None
+
+def test_streamed_analysis_arrives_incrementally():
+    server = StubServer(delay=0.05, stream_words=['Flat ', 'space', 'time.'])
+    service = AnalysisService(APIConfig(api_url=server.url, rate_limit=0))
+    try:
+        chunks = []
+        text = service.submit(METRIC, 'interpret', chunks.append).result(timeout=10)
+        assert chunks == ['Flat ', 'space', 'time.']
+        assert text == 'Flat spacetime.'
+    finally:
+        service.close()
+        server.close()
+
+def test_stream_may_outlast_the_timeout():
+    server = StubServer(delay=0.15, stream_words=['word '] * 10)
+    service = AnalysisService(APIConfig(api_url=server.url, rate_limit=0, timeout=1))
+    try:
+        chunks = []
+        text = service.submit(METRIC, 'interpret', chunks.append).result(timeout=10)
+        assert text == 'word ' * 10
+        assert chunks == ['word '] * 10
+    finally:
+        service.close()
+        server.close()
+
+def test_stalled_stream_is_not_retried_after_partial_text():
+    server = StubServer(delay=2, stream_words=['first ', 'second'])
+    service = AnalysisService(APIConfig(api_url=server.url, rate_limit=0, timeout=1,
+                                        max_retries=3, backoff_base=0.01))
+    try:
+        chunks = []
+        with pytest.raises(asyncio.TimeoutError):
+            service.submit(METRIC, 'interpret', chunks.append).result(timeout=10)
+        assert chunks == ['first ']
+        assert len(server.requests) == 1
+    finally:
+        service.close()
+        server.close()
+
+def test_cancelling_aborts_the_stream():
+    server = StubServer(delay=0.05, stream_words=['word '] * 1000)
+    service = AnalysisService(APIConfig(api_url=server.url, rate_limit=0))
+    try:
+        chunks = []
+        future = service.submit(METRIC, 'suggest', chunks.append)
+        while not chunks:
+            time.sleep(0.01)
+        future.cancel()
+        assert server.disconnected.wait(timeout=5)
+    finally:
+        service.close()
+        server.close()
+
+def test_retry_after_pauses_and_counts_retries():
+    server = StubServer(throttle=2)
+    config = APIConfig(api_url=server.url, rate_limit=0, max_retries=5, backoff_base=0.01)
+    service = AnalysisService(config)
+    try:
+        start = time.perf_counter()
+        assert service.submit(METRIC, 'validate').result(timeout=10) == 'validate done'
+        assert time.perf_counter() - start >= 0.4
+        stats = RateLimiter.for_config(config).stats()
+        assert stats['throttled'] == 2 and stats['retried'] == 2
+    finally:
+        service.close()
+        server.close()
+
+def test_bodiless_success_ends_the_request():
+    server = StubServer(status=204)
+    service = AnalysisService(APIConfig(api_url=server.url, rate_limit=0, max_retries=3))
+    try:
+        assert service.submit(METRIC, 'validate').result(timeout=10) == 'No analysis provided'
+        assert len(server.requests) == 1
+    finally:
+        service.close()
+        server.close()
+
+def test_throttling_until_retries_run_out_raises():
+    server = StubServer(throttle=100)
+    config = APIConfig(api_url=server.url, rate_limit=0, max_retries=3, backoff_base=0.01)
+    service = AnalysisService(config)
+    try:
+        with pytest.raises(aiohttp.ClientResponseError) as error:
+            service.submit(METRIC, 'suggest').result(timeout=10)
+        assert error.value.status == 429
+        assert len(server.requests) == 3
+    finally:
+        service.close()
+        server.close()
+
+def test_token_bucket_spaces_requests():
+    limiter = RateLimiter(rate=20, burst=2)
+
+    async def acquire_all():
+        await asyncio.gather(*(limiter.acquire() for _ in range(6)))
+
+    start = time.perf_counter()
+    asyncio.run(acquire_all())
+    # Two tokens are available at once, the other four arrive 50 ms apart
+    assert 0.18 <= time.perf_counter() - start < 0.5
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
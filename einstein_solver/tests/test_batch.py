@@ -0,0 +1,30 @@
+import json
+import pytest
+from einstein_solver.batch import load_records, run_batch
+from einstein_solver.result_file import load_results
+
+SPHERE = {
+    'name': 'sphere',
+    'components': [['r^2', '0'], ['0', 'r^2\\sin^2\\theta']],
+    'coordinates': ['\\theta', '\\phi']
+}
+
+def test_load_records_jsonl(tmp_path):
+    path = tmp_path / 'metrics.jsonl'
+    path.write_text(json.dumps(SPHERE) + "\n" + json.dumps(SPHERE) + "\n")
+    assert len(load_records(path)) == 2
+
+def test_run_batch_streams_results():
+    broken = dict(SPHERE, coordinates=['\\theta'])
+    results = sorted(run_batch([SPHERE, broken], max_workers=2, timeout=60),
+                     key=lambda r: r.index)
+    assert results[0].status == 'ok'
+    assert results[0].results['ricci_scalar'] == '2/r**2'
+    assert results[1].status == 'error'
+
+def test_run_batch_saves_results_files(tmp_path):
+    [result] = run_batch([SPHERE], max_workers=1, results_dir=tmp_path / 'out')
+    assert result.results_file.endswith('000000-sphere.efr')
+    saved = load_results(result.results_file)
+    assert str(saved.stage('ricci_scalar')) == result.results['ricci_scalar']
+    assert saved.metric_data.components == SPHERE['components']
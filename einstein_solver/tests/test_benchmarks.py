@@ -0,0 +1,44 @@
+import copy
+from einstein_solver.benchmarks import (
+    BENCHMARK_STAGES, CATALOGUE, compare, merge_baseline, run_benchmark
+)
+
+def test_catalogue_metrics_are_square():
+    for metric in CATALOGUE.values():
+        assert len(metric.components) == len(metric.coordinates)
+        assert all(len(row) == len(metric.coordinates) for row in metric.components)
+
+def test_run_benchmark_times_every_stage():
+    result = run_benchmark(CATALOGUE['schwarzschild'], repeats=1, samples=100)
+    assert set(result.timings) == set(BENCHMARK_STAGES)
+    assert all(seconds >= 0 for seconds in result.timings.values())
+    assert result.peak_memory > 0
+    assert result.to_dict()['total'] > 0
+    assert result.timed_out == []
+
+def test_einsteinpy_stage_can_time_out():
+    result = run_benchmark(CATALOGUE['kerr'], repeats=2, samples=10, memory=False,
+                           simplify_budget=0.01, einsteinpy_limit=0.5)
+    assert 'einsteinpy' not in result.timings
+    assert result.timed_out == ['einsteinpy']
+    assert result.to_dict()['timed_out'] == ['einsteinpy']
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {'metrics': {'kerr': {'timings': {'inverse': 1.0, 'parse': 0.001}}}}
+    report = copy.deepcopy(baseline)
+    report['metrics']['kerr']['timings'].update(inverse=1.2, parse=0.004)
+    report['metrics']['new'] = {'timings': {'inverse': 5.0}}
+    assert compare(report, baseline) == []
+
+    report['metrics']['kerr']['timings']['inverse'] = 2.0
+    [regression] = compare(report, baseline)
+    assert (regression.metric, regression.stage) == ('kerr', 'inverse')
+
+def test_merge_baseline_keeps_metrics_not_run():
+    baseline = {'settings': {'repeats': 3},
+                'metrics': {'kerr': {'total': 1.0}, 'minkowski': {'total': 0.1}}}
+    report = {'settings': {'repeats': 1}, 'metrics': {'kerr': {'total': 2.0}}}
+    merged = merge_baseline(baseline, report)
+    assert merged['metrics'] == {'kerr': {'total': 2.0}, 'minkowski': {'total': 0.1}}
+    assert merged['settings'] == {'repeats': 1}
+    assert baseline['metrics']['kerr'] == {'total': 1.0}
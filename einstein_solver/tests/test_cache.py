@@ -0,0 +1,44 @@
+import pytest
+from einstein_solver.cache import ResultCache
+from einstein_solver.engine import solve_metric
+from einstein_solver.utils import MetricData
+
+def sphere(theta_entry):
+    return MetricData(
+        components=[['r^2', '0'], ['0', theta_entry]],
+        dimension=2,
+        coordinates=['\\theta', '\\phi']
+    )
+
+def test_equivalent_latex_hits_cache(tmp_path):
+    cache = ResultCache(tmp_path / 'results.sqlite3')
+    first = solve_metric(sphere('r^2\\sin^2\\theta'), cache=cache)
+    assert cache.hits == 0
+
+    second = solve_metric(sphere('r^{2}  \\sin^{2}{\\theta}'), cache=cache)
+    assert cache.hits == 4
+    assert second['ricci_scalar'] == first['ricci_scalar']
+
+def test_solve_settings_are_part_of_the_key(tmp_path):
+    cache = ResultCache(tmp_path / 'results.sqlite3')
+    metric = sphere('r^2\\sin^2\\theta')
+    solve_metric(metric, cache=cache, simplify=False)
+    solve_metric(metric, cache=cache, simplify=True)
+    assert cache.hits == 0
+
+    solve_metric(metric, cache=cache, backend='einsteinpy')
+    solve_metric(metric, cache=cache, simplify_budget=1.0)
+    assert cache.hits == 0
+    solve_metric(metric, cache=cache, simplify=True)
+    assert cache.hits == 4
+
+def test_lru_eviction_respects_size_cap(tmp_path):
+    cache = ResultCache(tmp_path / 'results.sqlite3', max_bytes=300)
+    cache.put('a', 'stage', 'x' * 100)
+    cache.put('b', 'stage', 'y' * 100)
+    assert cache.get('a', 'stage') is not None
+    cache.put('c', 'stage', 'z' * 100)
+
+    assert cache.get('b', 'stage') is None
+    assert cache.get('a', 'stage') is not None
+    assert cache.total_bytes() <= 300
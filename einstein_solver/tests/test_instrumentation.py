@@ -0,0 +1,58 @@
+import json
+import logging
+import queue
+import pytest
+from einstein_solver import instrumentation
+from einstein_solver.parsing import clear_memo
+from einstein_solver.worker import _solve_in_process
+
+@pytest.fixture
+def log_dir(tmp_path):
+    yield tmp_path
+    for handler in list(instrumentation.logger.handlers):
+        instrumentation.logger.removeHandler(handler)
+        handler.close()
+    instrumentation.logger.setLevel(logging.NOTSET)
+    instrumentation._log_dir = None
+
+def read_records(log_dir):
+    with open(log_dir / instrumentation.TIMINGS_FILE) as f:
+        return [json.loads(line) for line in f]
+
+def test_solve_records_share_correlation_id_and_profile(log_dir):
+    metric = {
+        'components': [['r^2', '0'], ['0', 'r^2\\sin^2\\theta']],
+        'coordinates': ['\\theta', '\\phi']
+    }
+    cache_path = str(log_dir / 'results.sqlite3')
+    clear_memo()
+    for solve_id in ('first', 'second'):
+        events = queue.Queue()
+        _solve_in_process(events, metric, None, cache_path, solve_id, str(log_dir),
+                          profile=solve_id == 'first')
+        while not events.empty():
+            event = events.get()
+        assert event[0] == 'finished'
+
+    records = read_records(log_dir)
+    assert {r['correlation_id'] for r in records} == {'first', 'second'}
+    first = [r for r in records if r['correlation_id'] == 'first']
+    second = [r for r in records if r['correlation_id'] == 'second']
+
+    stages = [r['stage'] for r in first if r['event'] == 'stage']
+    assert stages[:2] == ['parse', 'cache_lookup'] and 'riemann' in stages
+    assert any(r['event'] == 'latex_parse' and r['ok'] for r in first)
+    assert {r['hit'] for r in first if r['event'] == 'cache'} == {False}
+    assert {r['hit'] for r in second if r['event'] == 'cache'} == {True}
+
+    [solve] = [r for r in first if r['event'] == 'solve']
+    assert solve['status'] == 'ok' and solve['seconds'] > 0
+    assert (log_dir / 'profiles' / 'first.prof').exists()
+    assert not (log_dir / 'profiles' / 'second.prof').exists()
+
+def test_records_are_dropped_until_configured(tmp_path):
+    with instrumentation.correlation('abc') as solve_id:
+        instrumentation.record('stage', stage='parse', seconds=0.1)
+        assert solve_id == instrumentation.correlation_id() == 'abc'
+    assert instrumentation.correlation_id() is None
+    assert not instrumentation.enabled() and not list(tmp_path.iterdir())
@@ -0,0 +1,56 @@
+import numpy as np
+import sympy as sp
+from einstein_solver.curvature import compute_curvature
+from einstein_solver.engine import solve_metric
+from einstein_solver.invariants import Invariants
+from einstein_solver.numeric import compile_invariants
+from einstein_solver.utils import MetricData
+
+t, r, theta, phi, M = sp.symbols('t r theta phi M')
+
+def test_schwarzschild_invariants():
+    f = 1 - 2*M/r
+    curvature = compute_curvature(
+        sp.diag(-f, 1/f, r**2, r**2*sp.sin(theta)**2), (t, r, theta, phi), simplify=False
+    )
+    invariants = Invariants.from_curvature(curvature, simplify=True)
+    assert invariants.kretschmann == 48*M**2/r**6
+    assert invariants.ricci_squared == 0
+    assert invariants.weyl_squared == 48*M**2/r**6
+
+    evaluate = compile_invariants(invariants, (r,), {'M': 1})
+    radii = np.linspace(3, 10, 5)
+    np.testing.assert_allclose(evaluate(radii)['kretschmann'], 48 / radii**6)
+
+def test_contraction_matches_full_index_sum():
+    x, y, z, w = coords = sp.symbols('x y z w')
+    metric = sp.Matrix([
+        [-(1 + x**2), y, 0, 0],
+        [y, 1 + z**2, 0, x*w],
+        [0, 0, 2 + x, 0],
+        [0, x*w, 0, 3 + y**2]
+    ])
+    curvature = compute_curvature(metric, coords, simplify=False)
+    invariants = Invariants.from_curvature(curvature)
+    point = dict(zip(coords, (0.3, -0.4, 0.5, 0.7)))
+
+    numeric = lambda value: np.array(sp.Array(value).subs(point).tolist(), dtype=float)
+    ginv = numeric(curvature.inverse)
+    riemann = numeric(curvature.riemann)
+    ricci = numeric(curvature.ricci)
+    raised = np.einsum('ae,bf,cg,dh,efgh->abcd', ginv, ginv, ginv, ginv, riemann)
+    ricci_raised = np.einsum('ac,bd,cd->ab', ginv, ginv, ricci)
+
+    assert np.isclose(float(invariants.kretschmann.subs(point)), np.sum(riemann * raised))
+    assert np.isclose(float(invariants.ricci_squared.subs(point)), np.sum(ricci * ricci_raised))
+
+def test_solve_includes_invariants_for_both_backends():
+    metric_data = MetricData(
+        dimension=2, components=[['r^2', '0'], ['0', 'r^2\\sin^2\\theta']],
+        coordinates=['\\theta', '\\phi']
+    )
+    native = solve_metric(metric_data)['invariants']
+    reference = solve_metric(metric_data, backend='einsteinpy')['invariants']
+    for name, value in native.items():
+        assert sp.simplify(value - reference[name]) == 0
+    assert native['weyl_squared'] == 0
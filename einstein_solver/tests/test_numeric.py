@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+import sympy as sp
+from einstein_solver.curvature import compute_curvature
+from einstein_solver.numeric import GridEvaluator, compile_curvature
+
+t, r, theta, phi, M = sp.symbols('t r theta phi M')
+
+@pytest.fixture(scope='module')
+def schwarzschild():
+    f = 1 - 2*M/r
+    metric = sp.diag(-f, 1/f, r**2, r**2*sp.sin(theta)**2)
+    return compute_curvature(metric, (t, r, theta, phi))
+
+def test_kretschmann_on_grid(schwarzschild, tmp_path):
+    evaluator = compile_curvature(schwarzschild, {'M': 1.0})
+    radii = np.linspace(3, 10, 50)
+    outputs = evaluator.evaluate_grid(
+        {'t': 0, 'r': radii, 'theta': np.linspace(0.1, 3.0, 7), 'phi': 0},
+        chunk_size=64, output_dir=tmp_path
+    )
+
+    assert outputs['kretschmann'].shape == (50, 7)
+    assert outputs['einstein_tensor'].shape == (50, 7, 4, 4)
+    np.testing.assert_allclose(outputs['kretschmann'][:, 3], 48 / radii**6)
+    np.testing.assert_allclose(np.load(tmp_path / 'kretschmann.npy'), outputs['kretschmann'])
+
+def test_unresolved_symbols_are_rejected():
+    with pytest.raises(ValueError):
+        GridEvaluator({'f': M / r}, (r,))
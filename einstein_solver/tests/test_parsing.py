@@ -0,0 +1,32 @@
+import pytest
+import sympy as sp
+from einstein_solver.parsing import MetricParseError, clear_memo, parse_metric
+from einstein_solver.utils import MetricData
+
+def test_errors_report_cell_positions():
+    result = parse_metric([['-1', '\\frac{a'], ['\\frac{a', 'r^2']], 2)
+    assert [(e.row, e.column) for e in result.errors] == [(0, 1)]
+
+    with pytest.raises(MetricParseError):
+        MetricData([['-1', '\\frac{a'], ['\\frac{a', 'r^2']], 2, ['t', 'r']).to_matrix()
+
+def test_asymmetric_pairs_are_flagged():
+    result = parse_metric([['-1', 'a'], ['b', 'r^2']], 2)
+    assert result.asymmetric == [(0, 1)]
+    assert result.matrix[1, 0] == sp.Symbol('a')
+
+def test_zero_cells_mirror_the_other_triangle():
+    upper = parse_metric([['-1', 'a', 'b'], ['0', 'r^2', 'c'], ['0', '0', '1']], 3)
+    lower = parse_metric([['-1', '0', '0'], ['a', 'r^2', ''], ['b', 'c', '1']], 3)
+    assert upper.asymmetric == [] and lower.asymmetric == []
+    assert upper.matrix == lower.matrix == upper.matrix.T
+    assert upper.matrix[2, 1] == sp.Symbol('c')
+
+def test_parallel_parse_matches_serial():
+    components = [['-1', 'x'], ['x', 'r^2 \\sin^2\\theta']]
+    clear_memo()
+    parallel = parse_metric(components, 2, max_workers=2)
+    clear_memo()
+    serial = parse_metric(components, 2)
+    assert parallel.matrix == serial.matrix
+    assert parallel.ok and not parallel.asymmetric
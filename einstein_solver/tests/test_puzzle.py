@@ -0,0 +1,84 @@
+import pytest
+from einstein_solver.models import Constraint, Puzzle
+from einstein_solver.puzzle import PuzzleSolver, generate_puzzle, solve_puzzle
+
+def zebra_puzzle():
+    puzzle = Puzzle(
+        ['nationality', 'color', 'pet', 'drink', 'smoke'],
+        {
+            'nationality': ['Englishman', 'Spaniard', 'Ukrainian', 'Norwegian', 'Japanese'],
+            'color': ['red', 'green', 'ivory', 'yellow', 'blue'],
+            'pet': ['dog', 'snails', 'fox', 'horse', 'zebra'],
+            'drink': ['coffee', 'tea', 'milk', 'orange juice', 'water'],
+            'smoke': ['Old Gold', 'Kools', 'Chesterfield', 'Lucky Strike', 'Parliament']
+        }
+    )
+    for clue in [
+        ('nationality', 'Englishman', 'same', 'red'),
+        ('nationality', 'Spaniard', 'same', 'dog'),
+        ('drink', 'coffee', 'same', 'green'),
+        ('nationality', 'Ukrainian', 'same', 'tea'),
+        ('color', 'green', 'right_of', 'ivory'),
+        ('smoke', 'Old Gold', 'same', 'snails'),
+        ('smoke', 'Kools', 'same', 'yellow'),
+        ('drink', 'milk', 'at', '3'),
+        ('nationality', 'Norwegian', 'at', '1'),
+        ('smoke', 'Chesterfield', 'next_to', 'fox'),
+        ('smoke', 'Kools', 'next_to', 'horse'),
+        ('smoke', 'Lucky Strike', 'same', 'orange juice'),
+        ('nationality', 'Japanese', 'same', 'Parliament'),
+        ('nationality', 'Norwegian', 'next_to', 'blue'),
+    ]:
+        puzzle.add_constraint(Constraint(*clue))
+    return puzzle
+
+def test_zebra_puzzle_is_unique():
+    result = PuzzleSolver(zebra_puzzle()).check_unique()
+    assert result.unique
+    solution = result.solutions[0]
+    owner = solution['nationality'][solution['pet'].index('zebra')]
+    drinker = solution['nationality'][solution['drink'].index('water')]
+    assert (owner, drinker) == ('Japanese', 'Norwegian')
+    # Propagation leaves almost nothing to search (8 nodes with mrv_degree)
+    assert result.nodes < 50
+
+def test_underconstrained_puzzle_lists_all_solutions():
+    puzzle = Puzzle(['a', 'b'], {'a': ['x', 'y', 'z'], 'b': ['p', 'q', 'r']})
+    puzzle.add_constraint(Constraint('a', 'x', 'same', 'p'))
+    result = solve_puzzle(puzzle)
+    assert result.complete and len(result.solutions) == 12
+
+    limited = solve_puzzle(puzzle, max_iterations=1)
+    assert not limited.complete and not limited.unique
+
+def test_contradiction_and_bad_input():
+    puzzle = Puzzle(['a', 'b'], {'a': ['x', 'y'], 'b': ['p', 'q']})
+    assert puzzle.add_constraint(Constraint('a', 'x', 'same', 'p')).consistent
+    puzzle.add_constraint(Constraint('a', 'x', 'not_same', 'b:p'))
+    assert not solve_puzzle(puzzle).solved
+    update = puzzle.add_constraint(Constraint('a', 'y', 'at', '1'))
+    assert not update.consistent and not puzzle.consistent
+
+    with pytest.raises(ValueError):
+        puzzle.add_constraint(Constraint('a', 'x', 'above', 'p'))
+
+def test_constraints_are_normalized_indexed_and_propagated():
+    puzzle = Puzzle(['a', 'b'], {'a': ['x', 'y', 'z'], 'b': ['p', 'q', 'r']})
+    first = puzzle.add_constraint(Constraint('b', 'q', 'right_of', 'x'))
+    assert first.constraint == Constraint('a', 'x', 'left_of', 'b:q')
+    assert not puzzle.add_constraint(Constraint('a', 'x', 'left_of', 'q')).added
+    assert puzzle.add_constraint(Constraint('b', 'p', 'next_to', 'y')).added
+    assert not puzzle.add_constraint(Constraint('a', 'y', 'next_to', 'p')).added
+    assert len(puzzle.constraints) == 2
+    assert puzzle.constraints_for('b', 'q') == [first.constraint]
+    assert puzzle.possible_positions('a', 'x') == [1, 2]
+
+    update = puzzle.add_constraint(Constraint('b', 'q', 'not_at', '3'))
+    assert update.forced == {('a', 'x'): 1, ('a', 'y'): 2, ('a', 'z'): 3, ('b', 'q'): 2}
+
+@pytest.mark.parametrize('size', [8, 10])
+def test_generated_puzzle_is_tractable(size):
+    puzzle, expected = generate_puzzle(size, seed=size)
+    result = PuzzleSolver(puzzle, max_iterations=10_000).check_unique()
+    assert result.unique
+    assert result.solutions[0] == expected
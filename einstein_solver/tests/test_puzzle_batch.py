@@ -0,0 +1,47 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from einstein_solver.puzzle import generate_puzzle
+from einstein_solver.puzzle_batch import run_puzzles, solve_portfolio, solve_split
+from einstein_solver.tests.test_puzzle import zebra_puzzle
+
+def test_run_puzzles_reports_status_per_puzzle():
+    loose = {'categories': ['a', 'b'], 'values': {'a': ['x', 'y'], 'b': ['p', 'q']},
+             'constraints': []}
+    broken = dict(loose, constraints=[['a', 'x', 'same', 'nowhere']])
+    records = [dict(zebra_puzzle().to_dict(), name='zebra'), loose, broken]
+    results = sorted(run_puzzles(records, max_workers=2, chunk_size=1), key=lambda r: r.index)
+
+    assert [r.status for r in results] == ['unique', 'multiple', 'error']
+    assert results[0].name == 'zebra' and results[0].nodes > 0
+    assert results[0].solution['pet'][4] == 'zebra'
+
+@pytest.fixture(scope='module')
+def pool():
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=2) as executor:
+        yield executor, manager.Event()
+
+def test_split_and_portfolio_agree_with_single_search(pool):
+    executor, stop_event = pool
+    puzzle, expected = generate_puzzle(8, seed=3)
+    record = puzzle.to_dict()
+
+    split = solve_split(record, executor, 8, stop_event, max_iterations=10_000)
+    assert split.status == 'unique' and split.solution == expected
+
+    raced = solve_portfolio(record, executor, stop_event, ('mrv_degree', 'input'),
+                            max_iterations=10_000)
+    assert raced.status == 'unique' and raced.ordering in ('mrv_degree', 'input')
+
+def test_split_respects_timeout(pool):
+    executor, stop_event = pool
+    puzzle, _ = generate_puzzle(8, seed=3)
+    # Without constraints every assignment is a solution, so enumerating never ends
+    record = dict(puzzle.to_dict(), constraints=[])
+
+    start = time.perf_counter()
+    result = solve_split(record, executor, 8, stop_event, max_iterations=10**9,
+                         all_solutions=True, timeout=0.5)
+    assert result.status == 'timeout'
+    assert time.perf_counter() - start < 10
@@ -0,0 +1,55 @@
+import struct
+import pytest
+import sympy as sp
+from einstein_solver.curvature import compute_curvature
+from einstein_solver.result_file import (
+    FORMAT_VERSION, MAGIC, ResultFile, ResultFormatError, dumps, load_results, save_results
+)
+from einstein_solver.utils import MetricData
+
+t, r, theta, phi, M = sp.symbols('t r theta phi M')
+
+def test_round_trip_keeps_only_independent_components(tmp_path):
+    f = 1 - 2*M/r
+    curvature = compute_curvature(sp.diag(-f, 1/f, r**2, r**2*sp.sin(theta)**2),
+                                  (t, r, theta, phi), simplify=False)
+    results = {
+        'metric': curvature.metric,
+        'christoffel_symbols': curvature.christoffels,
+        'riemann': curvature.riemann,
+        'ricci_scalar': curvature.ricci_scalar,
+        'invariants': {'kretschmann': 48*M**2/r**6, 'weyl_squared': sp.Integer(0)}
+    }
+    metric_data = MetricData([['-1', '0'], ['0', '1']], 2, ['t', 'x'])
+    path = tmp_path / 'schwarzschild.efr'
+    save_results(path, results, metric_data)
+
+    saved = load_results(path)
+    assert saved.stages == tuple(results) and saved.metric_data == metric_data
+    assert saved.component('riemann', (1, 0, 1, 0)) == curvature.riemann[1, 0, 1, 0]
+    assert saved.component('riemann', (0, 1, 1, 0)) == -curvature.riemann[1, 0, 1, 0]
+    assert saved._nodes.count(None) > 0
+    for name, value in results.items():
+        assert saved.stage(name) == value
+
+    riemann = dict(saved.nonzero('riemann'))
+    assert len(riemann) == 6 < sum(1 for c in sp.flatten(curvature.riemann) if c != 0)
+    assert all(a < b and c < d and (a, b) <= (c, d) for a, b, c, d in riemann)
+    assert dict(saved.nonzero('invariants')) == {'kretschmann': 48*M**2/r**6}
+
+def test_uncommon_expressions_and_versioning():
+    x = sp.Symbol('x', positive=True)
+    g = sp.Function('g')
+    expr = sp.Float('1.25', 30) * sp.pi * x**sp.Rational(-3, 7) + sp.I * g(x) \
+        + sp.exp(-x) + sp.Derivative(g(x), x) - 10**40
+    data = dumps({'value': expr, 'matrix': sp.Matrix([[x, 1], [2, x]])})
+    loaded = ResultFile(data)
+    assert loaded.stage('value') == expr
+    assert loaded.stage('value').free_symbols == {x}
+    assert loaded.component('matrix', (1, 0)) == 2
+
+    newer = MAGIC + struct.pack('<H', FORMAT_VERSION + 1) + data[6:]
+    with pytest.raises(ResultFormatError):
+        ResultFile(newer)
+    with pytest.raises(ResultFormatError):
+        ResultFile(b'not a results file')
@@ -0,0 +1,46 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from einstein_solver import results_analysis
+from einstein_solver.results_analysis import ResultsAnalyzer
+from einstein_solver.utils import MetricData
+
+SCHWARZSCHILD = MetricData(
+    components=[['-(1-\\frac{2M}{r})', '0', '0', '0'],
+                ['0', '\\frac{1}{1-\\frac{2M}{r}}', '0', '0'],
+                ['0', '0', 'r^2', '0'],
+                ['0', '0', '0', 'r^2\\sin^2\\theta']],
+    dimension=4,
+    coordinates=['t', 'r', '\\theta', '\\phi']
+)
+
+def test_results_analyzer_classifies_schwarzschild():
+    analyzer = ResultsAnalyzer(SCHWARZSCHILD, parameters={'M': 1.0},
+                               ranges={'\\theta': (0, 3.2), '\\phi': (0, 6.3)})
+    counts = analyzer.signature_counts()
+    assert max(counts, key=counts.get) == (1, 3, 0)
+
+    points = {(p['coordinate'], round(p['value'], 3)): p['kind']
+              for p in analyzer.singular_points()}
+    assert points[('r', 0.0)] == 'curvature'
+    assert points[('r', 2.0)] == 'coordinate'
+    assert points[('theta', 3.142)] == 'coordinate'
+
+    report = analyzer.get_full_analysis()
+    assert "Lorentzian (-,+,+,+)" in report
+    assert "Static in t" in report
+    assert set(analyzer.timings) == {'signature', 'symmetries', 'singularities'}
+
+def test_results_analyzer_still_importable_from_analyzer():
+    from einstein_solver.analyzer import ResultsAnalyzer as reexported
+    assert reexported is ResultsAnalyzer
+
+def test_symbolic_signature_is_limited_off_the_main_thread(monkeypatch):
+    monkeypatch.setattr(results_analysis, 'SYMBOLIC_BUDGET', 0.5)
+    symbols = [[f"a_{{{min(i, j)}{max(i, j)}}}" for j in range(4)] for i in range(4)]
+    analyzer = ResultsAnalyzer(MetricData(components=symbols, dimension=4,
+                                          coordinates=['t', 'x', 'y', 'z']), samples=16)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        report = executor.submit(analyzer.analyze_signature, True).result()
+    assert "Symbolic eigenvalues: gave up after 0.5 s" in report
+    assert time.perf_counter() - start < 10
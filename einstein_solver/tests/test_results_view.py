@@ -0,0 +1,45 @@
+import io
+import sympy as sp
+from PyQt6.QtCore import QModelIndex, Qt
+from einstein_solver.curvature import compute_curvature
+from einstein_solver.results_view import ResultsModel, render, write_results
+
+t, r, theta, phi, M = sp.symbols('t r theta phi M')
+
+def schwarzschild():
+    f = 1 - 2*M/r
+    return compute_curvature(sp.diag(-f, 1/f, r**2, r**2*sp.sin(theta)**2),
+                             (t, r, theta, phi), simplify=True)
+
+def test_model_hides_zeros_and_renders_on_demand():
+    curvature = schwarzschild()
+    model = ResultsModel()
+    model.set_stage('christoffel_symbols', "Christoffel Symbols", curvature.christoffels)
+    model.set_stage('ricci_scalar', "Ricci Scalar", curvature.ricci_scalar)
+
+    nonzero = sum(1 for c in sp.flatten(curvature.christoffels) if c != 0)
+    stage = model.index(0, 0)
+    assert model.rowCount() == 2
+    assert model.rowCount(stage) == nonzero < 64
+    assert model.data(model.index(0, 1)) == f"{nonzero} nonzero of 64"
+    assert not model._strings
+
+    child = model.index(0, 1, stage)
+    assert model.parent(child).row() == 0
+    assert model.data(model.index(0, 0, stage)).startswith('christoffel_symbols[')
+    assert model.data(child) == str(model.expression(child))
+    assert len(model._strings) == 1
+    assert model.data(model.index(0, 1, model.index(1, 0))) == '0'
+
+    model.set_stage('christoffel_symbols', "Christoffel Symbols", sp.MutableDenseNDimArray.zeros(2, 2))
+    assert model.rowCount() == 2 and model.rowCount(model.index(0, 0)) == 0
+
+def test_streaming_export_and_formats():
+    curvature = schwarzschild()
+    stream = io.StringIO()
+    count = write_results([('ricci_scalar', curvature.ricci_scalar),
+                           ('christoffel_symbols', curvature.christoffels)], stream)
+    lines = stream.getvalue().splitlines()
+    assert count == len(lines) and lines[0] == 'ricci_scalar = 0'
+    assert '\\frac' in render(curvature.christoffels[1, 1, 1], 'LaTeX')
+    assert '─' in render(curvature.christoffels[1, 1, 1], 'Pretty')
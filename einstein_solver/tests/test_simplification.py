@@ -0,0 +1,76 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+import sympy as sp
+from einstein_solver.compression import CompressedResults
+from einstein_solver.curvature import compute_curvature
+from einstein_solver.engine import solve_metric
+from einstein_solver.simplification import simplify_results, simplify_with_budget
+from einstein_solver.utils import MetricData
+
+t, r, theta, phi, M, a = sp.symbols('t r theta phi M a')
+
+def kerr_metric():
+    sigma = r**2 + a**2*sp.cos(theta)**2
+    delta = r**2 - 2*M*r + a**2
+    return sp.Matrix([
+        [-(1 - 2*M*r/sigma), 0, 0, -2*M*a*r*sp.sin(theta)**2/sigma],
+        [0, sigma/delta, 0, 0],
+        [0, 0, sigma, 0],
+        [-2*M*a*r*sp.sin(theta)**2/sigma, 0, 0,
+         (r**2 + a**2 + 2*M*a**2*r*sp.sin(theta)**2/sigma)*sp.sin(theta)**2]
+    ])
+
+def test_strategies_keep_smaller_form():
+    expr = sp.sin(theta)**2 + sp.cos(theta)**2 + (r**2 - 1)/(r - 1)
+    result, winner, timed_out = simplify_with_budget(expr, budget=5)
+    assert sp.count_ops(result) < sp.count_ops(expr)
+    assert sp.simplify(result - expr) == 0
+    assert winner is not None and not timed_out
+
+def test_budget_off_the_main_thread_is_not_ignored():
+    expr = sp.sin(theta)**2 + sp.cos(theta)**2 + (r**2 - 1)/(r - 1)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        result, winner, timed_out = executor.submit(simplify_with_budget, expr, 5).result()
+        assert (result, winner, timed_out) == (expr, None, True)
+
+        simplified, stats = executor.submit(
+            simplify_results, {'ricci_scalar': expr}, 5, max_workers=1
+        ).result()
+    assert sp.count_ops(simplified['ricci_scalar']) < sp.count_ops(expr)
+    assert stats.timed_out == 0
+
+def test_simplify_results_matches_full_simplify():
+    curvature = compute_curvature(
+        sp.diag(-(1 - 2*M/r), 1/(1 - 2*M/r), r**2, r**2*sp.sin(theta)**2),
+        (t, r, theta, phi), simplify=False
+    )
+    results = {'christoffel_symbols': curvature.christoffels,
+               'ricci_scalar': curvature.ricci_scalar}
+    simplified, stats = simplify_results(results, budget=5, max_workers=1)
+    assert simplified['ricci_scalar'] == 0
+    assert stats.ops_after <= stats.ops_before
+    assert simplified['christoffel_symbols'].shape == (4, 4, 4)
+
+def test_solve_with_budget_simplifies_finished_stages():
+    metric = MetricData(
+        components=[['-(1-\\frac{2M}{r})', '0', '0', '0'], ['0', '\\frac{1}{1-\\frac{2M}{r}}', '0', '0'],
+                    ['0', '0', 'r^2', '0'], ['0', '0', '0', 'r^2\\sin^2(\\theta)']],
+        dimension=4, coordinates=['t', 'r', '\\theta', '\\phi']
+    )
+    results = solve_metric(metric, simplify_budget=5, simplify_workers=2)
+    assert results['ricci_scalar'] == 0
+    assert all(component == 0 for component in sp.flatten(results['einstein_tensor']))
+
+def test_compressed_kerr_round_trip():
+    curvature = compute_curvature(kerr_metric(), (t, r, theta, phi), simplify=False)
+    results = {'christoffel_symbols': curvature.christoffels, 'ricci': curvature.ricci}
+    compressed = CompressedResults.from_results(results)
+
+    plain_ops = sum(sp.count_ops(c) for value in results.values() for c in sp.flatten(value))
+    assert compressed.operation_count() < plain_ops / 2
+    plain_chars = sum(len(str(c)) for value in results.values() for c in sp.flatten(value))
+    assert sum(len(line) for line in compressed.lines()) < plain_chars / 10
+
+    restored = pickle.loads(pickle.dumps(compressed))
+    assert restored.stage('christoffel_symbols') == results['christoffel_symbols']
+    assert restored.component('ricci', (1, 1)) == results['ricci'][1, 1]
@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Seconds allowed for importing the GUI module once Qt itself is loaded
+IMPORT_BUDGET = 0.5
+# Loaded in the background after the window is shown, never at import
+DEFERRED_MODULES = ('sympy', 'numpy', 'einsteinpy', 'latex2sympy2', 'torch', 'aiohttp', 'mpmath')
+
+SCRIPT = """
+import json, sys, time
+import PyQt6.QtWidgets, PyQt6.QtGui
+start = time.perf_counter()
+import einstein_solver.gui
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % (DEFERRED_MODULES,)
+
+def test_gui_import_stays_within_budget():
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    root = Path(__file__).resolve().parents[2]
+    # Best of three runs, so a busy machine does not fail the check
+    runs = [
+        json.loads(subprocess.run([sys.executable, '-c', SCRIPT], cwd=root, env=env,
+                                  capture_output=True, text=True, check=True).stdout)
+        for _ in range(3)
+    ]
+    assert runs[0]['loaded'] == []
+    assert min(run['elapsed'] for run in runs) < IMPORT_BUDGET
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+import sympy as sp
+import torch
+from einstein_solver.curvature import compute_curvature
+from einstein_solver.numeric import GridEvaluator
+from einstein_solver.torch_curvature import TorchCurvature
+
+t, x, y = sp.symbols('t x y')
+
+def test_matches_symbolic_kernel():
+    metric = sp.Matrix([[-1, x, 0], [x, 1, 0], [0, 0, x**2 + t]])
+    symbolic = compute_curvature(metric, (t, x, y), simplify=False)
+    evaluator = GridEvaluator({
+        'christoffels': symbolic.christoffels,
+        'ricci': symbolic.ricci,
+        'ricci_scalar': symbolic.ricci_scalar
+    }, (t, x, y))
+
+    points = np.random.default_rng(0).uniform(0.5, 1.5, size=(64, 3))
+    expected = evaluator(*points.T)
+    result = TorchCurvature.from_sympy(metric, (t, x, y), batch_size=16).compute(points)
+
+    np.testing.assert_allclose(result.christoffels, expected['christoffels'], atol=1e-12)
+    np.testing.assert_allclose(result.ricci, expected['ricci'], atol=1e-10)
+    np.testing.assert_allclose(result.ricci_scalar, expected['ricci_scalar'], atol=1e-10)
+    assert result.points_per_second > 0
+
+def test_metric_callable():
+    def sphere(point):
+        theta = point[0]
+        return torch.stack([
+            torch.stack([torch.ones_like(theta), torch.zeros_like(theta)]),
+            torch.stack([torch.zeros_like(theta), torch.sin(theta) ** 2])
+        ])
+
+    result = TorchCurvature(sphere, 2).compute(np.array([[0.7, 0.0], [1.2, 1.0]]))
+    np.testing.assert_allclose(result.ricci_scalar, [2.0, 2.0])
+
+def test_thread_count_is_restored_after_compute():
+    metric = sp.Matrix([[-1, 0], [0, x**2]])
+    before = torch.get_num_threads()
+    curvature = TorchCurvature.from_sympy(metric, (t, x), threads=before + 1)
+    assert torch.get_num_threads() == before
+    curvature.compute(np.array([[0.0, 1.0]]))
+    assert torch.get_num_threads() == before
@@ -0,0 +1,25 @@
+import queue
+import pytest
+from einstein_solver.worker import _solve_in_process
+
+def test_solver_process_streams_stages_in_order():
+    events = queue.Queue()
+    metric = {
+        'components': [['r^2', '0'], ['0', 'r^2\\sin^2\\theta']],
+        'coordinates': ['\\theta', '\\phi']
+    }
+    _solve_in_process(events, metric, None, None)
+
+    received = []
+    while not events.empty():
+        received.append(events.get())
+    stages = [event[1] for event in received if event[0] == 'stage']
+    assert stages == ['metric', 'inverse', 'christoffel_symbols', 'riemann',
+                      'ricci', 'ricci_scalar', 'einstein_tensor', 'invariants']
+    assert received[-1][0] == 'finished'
+    assert received[-1][2].kernel is not None
+
+def test_solver_process_reports_errors():
+    events = queue.Queue()
+    _solve_in_process(events, {'components': [['\\frac{']], 'coordinates': ['x']}, None, None)
+    assert events.get()[0] == 'error'
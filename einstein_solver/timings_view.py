@@ -0,0 +1,46 @@
+from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List
+
+# Solves kept in the panel, newest first
+HISTORY_SIZE = 10
+
+@dataclass
+class SolveTiming:
+    solve_id: str
+    status: str
+    wall: float
+    # Seconds per solver stage, in the order the stages ran
+    stages: Dict[str, float] = field(default_factory=dict)
+
+class TimingsPanel(QTableWidget):
+    """The last few solves, one row each, broken down by stage"""
+    def __init__(self, size: int = HISTORY_SIZE, parent=None):
+        super().__init__(parent)
+        self.history: Deque[SolveTiming] = deque(maxlen=size)
+        self.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.verticalHeader().setVisible(False)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.refresh()
+
+    def add_solve(self, timing: SolveTiming) -> None:
+        self.history.appendleft(timing)
+        self.refresh()
+
+    def stage_columns(self) -> List[str]:
+        """Stages seen in any kept solve, in first-run order"""
+        return list(dict.fromkeys(stage for timing in reversed(self.history)
+                                  for stage in timing.stages))
+
+    def refresh(self) -> None:
+        stages = self.stage_columns()
+        self.setColumnCount(3 + len(stages))
+        self.setHorizontalHeaderLabels(["Solve", "Status", "Wall (s)"] + stages)
+        self.setRowCount(len(self.history))
+        for row, timing in enumerate(self.history):
+            values = [timing.solve_id, timing.status, f"{timing.wall:.3f}"]
+            values += [f"{timing.stages[stage]:.3f}" if stage in timing.stages else ""
+                       for stage in stages]
+            for column, text in enumerate(values):
+                self.setItem(row, column, QTableWidgetItem(text))
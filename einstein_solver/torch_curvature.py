@@ -0,0 +1,154 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional, Sequence, Union
+import numpy as np
+import sympy as sp
+import torch
+from torch.func import jacfwd, vmap
+
+DEFAULT_BATCH_SIZE = 16384
+
+# Maps one point of shape (n,) to the metric at that point, shape (n, n)
+MetricFunction = Callable[[torch.Tensor], torch.Tensor]
+
+@dataclass
+class TorchCurvatureResult:
+    """Curvature sampled at a batch of points, using the einsteinpy index conventions
+
+    Arrays have the point index first: ``christoffels[p, i, j, k]`` is
+    Gamma^i_{jk}, ``riemann[p, a, b, c, d]`` is R^a_{bcd} and ``ricci[p, b, d]``
+    is R^a_{bad}.
+    """
+    metric: np.ndarray
+    christoffels: np.ndarray
+    riemann: np.ndarray
+    ricci: np.ndarray
+    ricci_scalar: np.ndarray
+    einstein: np.ndarray
+    elapsed: float
+    points_per_second: float
+
+def metric_function_from_sympy(metric: sp.Matrix, coords: Sequence[sp.Symbol],
+                               parameters: Optional[Mapping[Union[str, sp.Symbol], float]] = None,
+                               dtype: torch.dtype = torch.float64) -> MetricFunction:
+    """Lambdify a symbolic metric into a differentiable torch function of one point"""
+    metric = sp.Matrix(metric)
+    substitutions = {
+        (sp.Symbol(k) if isinstance(k, str) else k): v for k, v in (parameters or {}).items()
+    }
+    if substitutions:
+        metric = metric.subs(substitutions)
+    unknown = metric.free_symbols - set(coords)
+    if unknown:
+        names = ', '.join(sorted(str(s) for s in unknown))
+        raise ValueError(f"Metric depends on symbols without values: {names}")
+
+    n = metric.rows
+    entries = sp.lambdify(tuple(coords), list(metric), modules='torch')
+
+    def metric_fn(x: torch.Tensor) -> torch.Tensor:
+        values = entries(*x.unbind(-1))
+        # Constant entries come back as Python numbers
+        values = [
+            v if isinstance(v, torch.Tensor) else torch.tensor(float(v), dtype=dtype)
+            for v in values
+        ]
+        values = [v.expand(x.shape[:-1]) if v.dim() < x.dim() - 1 else v for v in values]
+        return torch.stack(values, dim=-1).reshape(x.shape[:-1] + (n, n))
+
+    return metric_fn
+
+class TorchCurvature:
+    """Numeric curvature from a metric callable using automatic differentiation
+
+    Metric derivatives come from forward-mode autograd (``jacfwd``) and points
+    are batched with ``vmap``, so no symbolic differentiation is needed.
+    ``threads`` sets torch's intra-op thread count while ``compute`` runs;
+    the process-wide setting is restored afterwards.
+    """
+    def __init__(self, metric_fn: MetricFunction, dimension: int,
+                 batch_size: int = DEFAULT_BATCH_SIZE, threads: Optional[int] = None,
+                 dtype: torch.dtype = torch.float64):
+        self.metric_fn = metric_fn
+        self.dimension = dimension
+        self.batch_size = batch_size
+        self.dtype = dtype
+        self.threads = threads
+        self._christoffel_and_derivative = vmap(self._christoffel_with_jacobian)
+        self._metric = vmap(metric_fn)
+
+    @classmethod
+    def from_sympy(cls, metric: sp.Matrix, coords: Sequence[sp.Symbol],
+                   parameters: Optional[Mapping[Union[str, sp.Symbol], float]] = None,
+                   **kwargs) -> 'TorchCurvature':
+        """Build from a symbolic metric, e.g. to cross-check symbolic results"""
+        dtype = kwargs.get('dtype', torch.float64)
+        return cls(metric_function_from_sympy(metric, coords, parameters, dtype),
+                   len(coords), **kwargs)
+
+    def _christoffels(self, x: torch.Tensor) -> torch.Tensor:
+        g = self.metric_fn(x)
+        # dg[i, j, k] = d_k g_ij
+        dg = jacfwd(self.metric_fn)(x)
+        inverse = torch.linalg.inv(g)
+        # Gamma_{l jk} = 1/2 (d_k g_lj + d_j g_lk - d_l g_jk)
+        first_kind = 0.5 * (dg + dg.transpose(1, 2) - dg.permute(2, 0, 1))
+        return torch.einsum('il,ljk->ijk', inverse, first_kind)
+
+    def _christoffel_with_jacobian(self, x: torch.Tensor):
+        # dgamma[i, j, k, m] = d_m Gamma^i_{jk}; the value itself comes back as aux
+        dgamma, gamma = jacfwd(lambda y: (self._christoffels(y),) * 2, has_aux=True)(x)
+        return gamma, dgamma
+
+    def _compute_batch(self, points: torch.Tensor) -> Dict[str, torch.Tensor]:
+        g = self._metric(points)
+        gamma, dgamma = self._christoffel_and_derivative(points)
+        # R^a_{bcd} = d_c Gamma^a_{bd} - d_d Gamma^a_{bc}
+        #             + Gamma^a_{ce} Gamma^e_{bd} - Gamma^a_{de} Gamma^e_{bc}
+        riemann = (dgamma.permute(0, 1, 2, 4, 3) - dgamma
+                   + torch.einsum('pace,pebd->pabcd', gamma, gamma)
+                   - torch.einsum('pade,pebc->pabcd', gamma, gamma))
+        ricci = torch.einsum('pabad->pbd', riemann)
+        scalar = torch.einsum('pbd,pbd->p', torch.linalg.inv(g), ricci)
+        einstein = ricci - 0.5 * g * scalar[:, None, None]
+        return {
+            'metric': g,
+            'christoffels': gamma,
+            'riemann': riemann,
+            'ricci': ricci,
+            'ricci_scalar': scalar,
+            'einstein': einstein
+        }
+
+    def compute(self, points: Union[np.ndarray, torch.Tensor]) -> TorchCurvatureResult:
+        """Evaluate curvature at points of shape (N, dimension), in batches"""
+        points = torch.as_tensor(points, dtype=self.dtype)
+        if points.dim() != 2 or points.shape[1] != self.dimension:
+            raise ValueError(f"Points must have shape (N, {self.dimension})")
+
+        previous_threads = torch.get_num_threads()
+        if self.threads is not None:
+            torch.set_num_threads(self.threads)
+        start = time.perf_counter()
+        batches = []
+        try:
+            with torch.no_grad():
+                for offset in range(0, points.shape[0], self.batch_size):
+                    batches.append(self._compute_batch(points[offset:offset + self.batch_size]))
+        finally:
+            torch.set_num_threads(previous_threads)
+        elapsed = time.perf_counter() - start
+
+        def gather(name: str) -> np.ndarray:
+            return torch.cat([batch[name] for batch in batches]).numpy()
+
+        return TorchCurvatureResult(
+            metric=gather('metric'),
+            christoffels=gather('christoffels'),
+            riemann=gather('riemann'),
+            ricci=gather('ricci'),
+            ricci_scalar=gather('ricci_scalar'),
+            einstein=gather('einstein'),
+            elapsed=elapsed,
+            points_per_second=points.shape[0] / elapsed if elapsed > 0 else float('inf')
+        )
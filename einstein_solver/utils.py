@@ -1,11 +1,19 @@
 from dataclasses import dataclass
-from typing import List, Optional
-import sympy as sp
-from latex2sympy2 import latex2sympy
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, List, Optional
 import os
 import logging
+import signal
+import threading
+import time
 from pathlib import Path
 
+from .cache import DEFAULT_RESPONSE_TTL
+
+if TYPE_CHECKING:
+    import sympy as sp
+    from .parsing import ParseResult
+
 @dataclass
 class MetricData:
     """Data class for storing metric tensor information"""
@@ -13,22 +21,46 @@ class MetricData:
     dimension: int
     coordinates: List[str]
     
-    def to_matrix(self) -> sp.Matrix:
-        """Convert components to sympy Matrix"""
-        metric = []
-        for i in range(self.dimension):
-            row = []
-            for j in range(self.dimension):
-                try:
-                    if self.components[i][j] == "0":
-                        row.append(sp.Integer(0))
-                    else:
-                        expr = latex2sympy(self.components[i][j])
-                        row.append(expr)
-                except:
-                    row.append(sp.Integer(0))
-            metric.append(row)
-        return sp.Matrix(metric)
+    def to_matrix(self) -> 'sp.Matrix':
+        """Convert components to sympy Matrix, raising MetricParseError on bad input"""
+        from .parsing import MetricParseError
+
+        result = self.parse()
+        if not result.ok:
+            raise MetricParseError(result.errors)
+        if result.asymmetric:
+            logging.getLogger(__name__).warning(
+                "Metric components are not symmetric at %s", result.asymmetric
+            )
+        return result.matrix
+    
+    def parse(self, max_workers: Optional[int] = None) -> 'ParseResult':
+        """Parse components, reporting errors and asymmetric pairs"""
+        # Imported on first use so the GUI opens without loading sympy and latex2sympy
+        from .parsing import parse_metric
+
+        return parse_metric(self.components, self.dimension, max_workers)
+    
+    def to_dict(self) -> dict:
+        """Convert metric data to dictionary"""
+        return {
+            'components': self.components,
+            'dimension': self.dimension,
+            'coordinates': self.coordinates
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MetricData':
+        """Create metric data from a dictionary, inferring the dimension if missing"""
+        components = [[str(c).strip() or "0" for c in row] for row in data['components']]
+        coordinates = data['coordinates']
+        if isinstance(coordinates, str):
+            coordinates = [c.strip() for c in coordinates.split(',')]
+        return cls(
+            components=components,
+            dimension=int(data.get('dimension', len(components))),
+            coordinates=list(coordinates)
+        )
 
 @dataclass
 class APIConfig:
@@ -37,6 +69,18 @@ class APIConfig:
     api_url: str = "https://api.example.com/v1"
     timeout: int = 30
     max_retries: int = 3
+    # Pooled connections and requests in flight at once
+    max_concurrent: int = 4
+    # Seconds a cached analysis stays valid
+    cache_ttl: float = DEFAULT_RESPONSE_TTL
+    # Ask the endpoint to stream analyses as they are generated
+    stream: bool = True
+    # Client-side token bucket shared by all requests to this API; rate is per second, 0 disables
+    rate_limit: float = 2.0
+    rate_burst: int = 4
+    # Retry backoff: base * 2 ** (attempt - 1) seconds, capped and jittered
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
     
     def __post_init__(self):
         """Load API key from environment if not provided"""
@@ -62,15 +106,80 @@ class APIConfig:
         return {
             'api_url': self.api_url,
             'timeout': self.timeout,
-            'max_retries': self.max_retries
+            'max_retries': self.max_retries,
+            'max_concurrent': self.max_concurrent,
+            'cache_ttl': self.cache_ttl,
+            'stream': self.stream,
+            'rate_limit': self.rate_limit,
+            'rate_burst': self.rate_burst,
+            'backoff_base': self.backoff_base,
+            'backoff_max': self.backoff_max
         }
 
-def setup_logging():
+class TimeLimitExceeded(BaseException):
+    """Raised when a time_limit block runs out of time"""
+    # BaseException so sympy's broad ``except Exception`` blocks cannot swallow it
+
+def time_limit_enforced() -> bool:
+    """Whether ``time_limit`` can interrupt code running in the calling thread"""
+    return hasattr(signal, 'SIGALRM') and threading.current_thread() is threading.main_thread()
+
+@contextmanager
+def time_limit(seconds: Optional[float]) -> Iterator[None]:
+    """Raise TimeLimitExceeded if the block runs longer than ``seconds``
+
+    Uses SIGALRM, so the limit is only enforced on POSIX in the main thread;
+    elsewhere the block runs unlimited. An enclosing limit that expires
+    sooner keeps priority.
+    """
+    if not seconds or not time_limit_enforced():
+        yield
+        return
+
+    outer_remaining = signal.getitimer(signal.ITIMER_REAL)[0]
+    if outer_remaining and outer_remaining <= seconds:
+        yield
+        return
+
+    def _raise(signum, frame):
+        raise TimeLimitExceeded()
+
+    start = time.monotonic()
+    previous = signal.signal(signal.SIGALRM, _raise)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        if outer_remaining:
+            left = outer_remaining - (time.monotonic() - start)
+            signal.setitimer(signal.ITIMER_REAL, max(left, 1e-3))
+
+def setup_logging(log_dir: Path = Path('logs'), debug: Optional[bool] = None) -> Path:
+    """Log to ``log_dir/einstein_solver.log`` and record solve timings as JSON lines
+
+    ``debug`` defaults to ``Settings.debug_mode``; it lowers the log level
+    to DEBUG. Returns the timing log path.
+    """
+    from . import instrumentation
+
+    if debug is None:
+        debug = debug_mode()
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
     logging.basicConfig(
-        level=logging.INFO,
+        level=logging.DEBUG if debug else logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
-            logging.FileHandler(Path('logs/einstein_solver.log')),
+            logging.FileHandler(log_dir / 'einstein_solver.log'),
             logging.StreamHandler()
         ]
-    )
\ No newline at end of file
+    )
+    return instrumentation.configure(log_dir)
+
+def debug_mode() -> bool:
+    """Whether ``debug_mode`` is on in the settings file"""
+    from .config.settings import Settings
+
+    return bool(Settings().config.get('debug_mode', False))
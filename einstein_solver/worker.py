@@ -0,0 +1,125 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+import multiprocessing
+import queue
+import time
+from pathlib import Path
+from typing import Optional
+
+from . import instrumentation
+from .cache import DEFAULT_CACHE_PATH
+from .utils import MetricData
+
+# Minimum seconds between progress events sent from the solver process
+PROGRESS_INTERVAL = 0.1
+
+def _solve_in_process(events, metric: dict, solver, cache_path: Optional[str],
+                      solve_id: Optional[str] = None, log_dir: Optional[str] = None,
+                      profile: bool = False):
+    """Entry point of the solver process; reports back through the events queue"""
+    from .cache import ResultCache
+    from .engine import IncrementalSolver
+
+    if log_dir is not None:
+        # A spawned process starts without the parent's logging setup
+        instrumentation.configure(Path(log_dir))
+    try:
+        if solver is None:
+            solver = IncrementalSolver()
+        if cache_path is not None:
+            solver.cache = ResultCache(Path(cache_path))
+
+        last_progress = [0.0]
+
+        def on_stage(stage, value):
+            events.put(('stage', stage, value))
+
+        def on_progress(stage, done, total):
+            now = time.monotonic()
+            if done == total or now - last_progress[0] >= PROGRESS_INTERVAL:
+                last_progress[0] = now
+                events.put(('progress', stage, done, total))
+
+        with instrumentation.solve_context(solve_id, profile):
+            results = solver.solve(MetricData.from_dict(metric), on_stage, on_progress)
+        events.put(('finished', results, solver))
+    except Exception as e:
+        events.put(('error', str(e)))
+
+class SolverWorker(QThread):
+    """Runs a solve in a separate process so the UI stays responsive and can cancel it
+
+    Timing records from the solver process carry ``solve_id``; with
+    ``profile`` the solve is also profiled (see ``instrumentation.solve_context``).
+    """
+    stage_ready = pyqtSignal(str, object)
+    progress = pyqtSignal(str, int, int)
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, metric_data: MetricData, solver=None,
+                 cache_path: Optional[Path] = DEFAULT_CACHE_PATH, profile: bool = False):
+        super().__init__()
+        self.metric_data = metric_data
+        self.solve_id = instrumentation.new_correlation_id()
+        self.profile = profile
+        # IncrementalSolver state to continue from; replaced by the updated one when done
+        self.solver = solver
+        self.cache_path = cache_path
+        self._should_stop = False
+
+    def stop(self):
+        """Cancel the solve, killing the solver process"""
+        self._should_stop = True
+
+    def run(self):
+        """Start the solver process and relay its events as signals"""
+        # spawn avoids forking a process that has Qt state
+        context = multiprocessing.get_context('spawn')
+        events = context.Queue()
+        log_dir = instrumentation.log_dir()
+        process = context.Process(
+            target=_solve_in_process,
+            args=(events, self.metric_data.to_dict(), self.solver,
+                  str(self.cache_path) if self.cache_path is not None else None,
+                  self.solve_id, str(log_dir) if log_dir is not None else None, self.profile),
+            daemon=True
+        )
+        process.start()
+        try:
+            while True:
+                if self._should_stop:
+                    process.terminate()
+                    return
+                try:
+                    event = events.get(timeout=0.1)
+                except queue.Empty:
+                    if process.is_alive():
+                        continue
+                    try:
+                        # The last events may have arrived just after the get timed out
+                        event = events.get_nowait()
+                    except queue.Empty:
+                        self.error.emit("Solver process exited unexpectedly")
+                        return
+
+                kind = event[0]
+                if kind == 'stage':
+                    self.stage_ready.emit(event[1], event[2])
+                elif kind == 'progress':
+                    self.progress.emit(event[1], event[2], event[3])
+                elif kind == 'finished':
+                    self.solver = event[2]
+                    self.finished.emit(event[1])
+                    return
+                elif kind == 'error':
+                    self.error.emit(event[1])
+                    return
+        except Exception as e:
+            if not self._should_stop:
+                self.error.emit(str(e))
+        finally:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            events.close()
@@ -18,6 +18,9 @@ setup(
     entry_points={
         'console_scripts': [
             'einstein-solver=einstein_solver.main:main',
+            'einstein-solver-batch=einstein_solver.batch:main',
+            'einstein-solver-puzzles=einstein_solver.puzzle_batch:main',
+            'einstein-solver-bench=einstein_solver.benchmarks:main',
         ],
     },
     python_requires='>=3.8',